@@ -0,0 +1,283 @@
+"""
+SkillBridge application factory.
+
+create_app() builds the Flask app without touching Firebase or any SDK client:
+blueprints are imported and registered, benchmark data is loaded and the
+heavy modules listed in WARMUP_MODULES are imported (imports are fork-safe, so
+a preloading server pays for them once in the master), and with WARMUP_MODELS
+the skill-matching embedding model and the resource retriever are loaded. Firestore and Gemini
+clients are created lazily in each worker process on first use, or right away
+in the worker with init_worker().
+
+Every step is timed; the profile is printed at startup and served from
+GET /api/health/startup together with the worker's first-request latency.
+Request latency per blueprint and outbound-call latency per dependency are
+served in the Prometheus text format from GET /api/metrics (utils/metrics.py).
+Individual requests can be profiled on demand; see routes/profiler_routes.py.
+Each request is traced as a span tree and slow ones are logged (utils/tracing.py).
+"""
+
+import os
+import hmac
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+
+from app.config import Config
+from utils import metrics, tracing
+
+# (module, blueprint attribute, url prefix, label)
+BLUEPRINTS = [
+    ("routes.auth_routes",       "auth_bp",       "/api/auth",         "Auth"),
+    ("routes.profile_routes",    "profile_bp",    "/api/profile",      "Profile"),
+    ("routes.dashboard_routes",  "dashboard_bp",  "/api/dashboard",    "Dashboard"),
+    ("routes.assessment_routes", "assessment_bp", "/api/assessment",   "Assessment"),
+    ("routes.gap_routes",        "gap_bp",        "/api/gap-analysis", "Gap Analysis"),
+    ("routes.swot_routes",       "swot_bp",       "/api/swot",         "SWOT"),
+    ("routes.career_routes",     "career_bp",     "/api/career-match", "Career Match"),
+    ("routes.roadmap_routes",    "roadmap_bp",    "/api/roadmap",      "Roadmap"),
+    ("routes.analytics_routes",  "analytics_bp",  "/api/analytics",    "Cohort Analytics"),
+    ("routes.profiler_routes",   "profiler_bp",   "/api/profiler",     "Profiler"),
+]
+
+
+class StartupProfile:
+    """Import / initialisation timings of one process, in milliseconds."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.steps = []
+        self.first_request = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, kind: str, name: str):
+        """Time a block; exceptions are recorded and re-raised."""
+        start = time.perf_counter()
+        entry = {'kind': kind, 'name': name, 'status': 'ok'}
+        try:
+            yield entry
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+            raise
+        finally:
+            entry['ms'] = round((time.perf_counter() - start) * 1000, 1)
+            with self._lock:
+                self.steps.append(entry)
+
+    def record_first_request(self, path: str, ms: float):
+        with self._lock:
+            if self.first_request is None:
+                self.first_request = {'path': path, 'ms': round(ms, 1), 'pid': os.getpid()}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            steps = list(self.steps)
+        totals = {}
+        for s in steps:
+            totals[s['kind']] = round(totals.get(s['kind'], 0) + s['ms'], 1)
+        return {
+            'pid': self.pid,
+            'workerPid': os.getpid(),
+            'startedAt': self.started_at,
+            'totals': totals,
+            'steps': steps,
+            'firstRequest': self.first_request,
+        }
+
+    def print_summary(self):
+        for s in self.steps:
+            mark = '✓' if s['status'] == 'ok' else '⚠ '
+            print(f"{mark} {s['kind']:<9} {s['name']:<28} {s['ms']:>8.1f} ms")
+
+
+# ── Steps ─────────────────────────────────────────────────────────────────────
+def _register_blueprints(app, profile):
+    for module_path, bp_name, url_prefix, label in BLUEPRINTS:
+        try:
+            with profile.step('blueprint', module_path):
+                mod = importlib.import_module(module_path)
+                app.register_blueprint(getattr(mod, bp_name), url_prefix=url_prefix)
+        except Exception as e:
+            print(f"⚠  Could not register {label}: {e}")
+
+
+def warm_up(modules: list, profile: StartupProfile):
+    """Import heavy modules now instead of inside the first request that needs them."""
+    for name in modules:
+        try:
+            with profile.step('warmup', name):
+                importlib.import_module(name)
+        except ImportError as e:
+            print(f"⚠  Warm-up skipped {name}: {e}")
+        except Exception as e:
+            print(f"⚠  Warm-up failed for {name}: {e}")
+
+
+def warm_models(profile: StartupProfile):
+    """
+    Load the embedding model behind skill canonicalisation and build the learning-resource
+    retriever (corpus tags canonicalised, index opened) instead of in the first request.
+    """
+    try:
+        from services.skill_vector_builder import get_canonicalizer
+        canonicalizer = get_canonicalizer()
+        if canonicalizer.semantic:
+            with profile.step('model', 'skill index'):
+                canonicalizer.warm()
+    except Exception as e:
+        print(f"⚠  Model warm-up failed: {e}")
+    try:
+        with profile.step('model', 'resource retriever'):
+            from services.rag_retriever import get_retriever
+            get_retriever().warm()
+    except Exception as e:
+        print(f"⚠  Resource retriever warm-up failed: {e}")
+
+
+def init_worker(app):
+    """
+    Create per-process clients (Firestore) in a freshly forked worker, e.g. from a
+    gunicorn ``post_fork`` hook. Safe to skip: everything is created on first use.
+    """
+    profile = app.extensions['startup_profile']
+    try:
+        with profile.step('init', 'firestore'):
+            from utils.firebase_config import get_db
+            get_db()
+    except Exception as e:
+        print(f"⚠  Firestore init failed: {e}")
+
+
+# ── Factory ───────────────────────────────────────────────────────────────────
+def create_app(config_object=Config) -> Flask:
+    profile = StartupProfile()
+
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.extensions['startup_profile'] = profile
+
+    from utils.firebase_config import set_credentials_path
+    set_credentials_path(app.config["FIREBASE_CREDENTIALS"])
+
+    # ── Extensions ────────────────────────────────────────────────────────────
+    jwt = JWTManager(app)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        from services.token_revocation import revocation_store
+        return revocation_store.is_revoked(jwt_payload.get("jti"))
+
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": app.config["CORS_ORIGINS"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+        }
+    })
+
+    # ── Error handlers ────────────────────────────────────────────────────────
+    @app.errorhandler(400)
+    def bad_request(e):
+        return jsonify({"error": "Bad request", "message": str(e)}), 400
+
+    @app.errorhandler(401)
+    def unauthorized(e):
+        return jsonify({"error": "Unauthorized", "message": "Authentication required"}), 401
+
+    @app.errorhandler(404)
+    def not_found(e):
+        return jsonify({"error": "Not found", "message": "Resource not found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(e):
+        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+
+    # ── Health check ──────────────────────────────────────────────────────────
+    @app.route("/api/health", methods=["GET"])
+    def health_check():
+        from services import llm_service
+        try:
+            from routes.assessment_routes import grader_health
+            grader = grader_health()
+        except Exception as e:
+            grader = {"error": str(e)}
+        return jsonify({
+            "status": "healthy",
+            "service": "SkillBridge API",
+            "version": "2.0.0",
+            "modules": ["auth", "profile", "dashboard", "assessment", "gap", "swot", "career", "roadmap", "analytics"],
+            "llmCache": llm_service.cache_stats(),
+            "grader": grader,
+        }), 200
+
+    @app.route("/api/health/startup", methods=["GET"])
+    def startup_profile():
+        return jsonify(profile.to_dict()), 200
+
+    @app.route("/api/metrics", methods=["GET"])
+    def metrics_endpoint():
+        token = app.config["METRICS_TOKEN"]
+        if token:
+            sent = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(sent.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+                return jsonify({"error": "Unauthorized"}), 401
+        elif not (app.debug or app.config["METRICS_PUBLIC"]):
+            return jsonify({"error": "Not found", "message": "Resource not found"}), 404
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    # ── Blueprints, data, warm-up ─────────────────────────────────────────────
+    _register_blueprints(app, profile)
+
+    try:
+        with profile.step('data', 'benchmark registry'):
+            from services.data_registry import registry
+            registry.load()
+    except Exception as e:
+        print(f"⚠  Could not load benchmark data: {e}")
+
+    warm_up(app.config["WARMUP_MODULES"], profile)
+
+    if app.config["WARMUP_MODELS"]:
+        warm_models(profile)
+
+    if app.config["WARMUP_FIRESTORE"]:
+        init_worker(app)
+
+    # ── Request logging / latency / tracing ──────────────────────────────────
+    @app.before_request
+    def log_request():
+        request.environ['skillbridge.start'] = time.perf_counter()
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        request.environ['skillbridge.trace'] = tracing.start_trace(
+            f"{request.method} {rule}", path=request.path)
+        app.logger.info(f"{request.method} {request.path}")
+
+    @app.after_request
+    def record_latency(response):
+        start = request.environ.get('skillbridge.start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        blueprint = request.blueprint or ('app' if request.url_rule else 'unmatched')
+        metrics.observe_request(blueprint, request.method, response.status_code, elapsed)
+        trace = request.environ.get('skillbridge.trace')
+        if trace is not None:
+            trace.attrs['status'] = response.status_code
+        if profile.first_request is None:
+            profile.record_first_request(request.path, elapsed * 1000)
+        return response
+
+    @app.teardown_request
+    def finish_trace(exc):
+        tracing.finish_trace(request.environ.pop('skillbridge.trace', None))
+
+    profile.print_summary()
+    return app
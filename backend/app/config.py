@@ -0,0 +1,52 @@
+"""
+Application configuration, read from the environment (.env is loaded by run.py).
+"""
+
+import os
+from datetime import timedelta
+
+_BASE = os.path.dirname(os.path.dirname(__file__))
+
+
+def _list(name: str, default: str = '') -> list:
+    return [item.strip() for item in os.getenv(name, default).split(',') if item.strip()]
+
+
+class Config:
+    SECRET_KEY = os.getenv("SECRET_KEY", "skillbridge-secret-key")
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "skillbridge-jwt-secret")
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+
+    CORS_ORIGINS = _list("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,http://localhost:5000")
+
+    # Firebase service account — absolute so it works from any working directory.
+    FIREBASE_CREDENTIALS = os.getenv(
+        "FIREBASE_CREDENTIALS", os.path.join(_BASE, "firebase", "serviceAccountKey.json"))
+
+    # Heavy modules imported at startup instead of inside the first request that needs them.
+    # Imports are fork-safe, so this also works with a preloading (pre-fork) server.
+    WARMUP_MODULES = _list("WARMUP_MODULES", "google.generativeai,fitz,numpy")
+
+    # Load the sentence-transformers model and build the skill index (when SKILL_SEMANTIC_MATCHING
+    # is on) and the learning-resource retriever at startup instead of in the first requests.
+    WARMUP_MODELS = os.getenv("WARMUP_MODELS", "1") == "1"
+
+    # Create the Firestore client when a worker starts rather than on its first request.
+    # Only do this in the worker (post-fork), never in a preloading master.
+    WARMUP_FIRESTORE = os.getenv("WARMUP_FIRESTORE", "0") == "1"
+
+    # When set, GET /api/metrics requires "Authorization: Bearer <METRICS_TOKEN>". Without a token
+    # the endpoint is only served in debug mode, or to anyone when METRICS_PUBLIC=1 (e.g. when the
+    # metrics port is reachable only from the scraper's network); otherwise it answers 404.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0") == "1"
+
+    # Accounts (JWT identities) allowed to read admin-only endpoints such as /api/analytics.
+    ADMIN_EMAILS = [email.lower() for email in _list("ADMIN_EMAILS")]
+
+    # Request profiler: requests sent with "X-Profile-Token: <PROFILER_TOKEN>", plus a random
+    # PROFILER_SAMPLE_RATE fraction (0..1) of all requests, are profiled. The same token is
+    # required to read /api/profiler; without one the endpoints are disabled.
+    PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
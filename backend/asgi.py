@@ -0,0 +1,246 @@
+"""
+SkillBridge API Server — ASGI entry point
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Serves the endpoints whose time goes into waiting on Gemini or GitHub as native
+async handlers. LLM calls are awaited, GitHub is fetched over an
+httpx.AsyncClient, and the short Firestore calls run in a thread pool. So one
+process can keep hundreds of slow requests in flight without holding a worker
+per request. Every other URL is served by the unchanged Flask app, which is
+mounted underneath. URLs, payloads, error bodies and JWT behaviour (flask-jwt-extended's
+own verification, including the revocation check) are the same in both modes,
+and native routes are recorded in /api/metrics under the same blueprint labels
+and traced like Flask requests (utils/tracing.py).
+
+`run:app` remains the WSGI entry point.
+"""
+
+import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    from fastapi.middleware.wsgi import WSGIMiddleware
+
+from app import create_app
+from models import repo_model
+from routes import roadmap_routes
+from routes.dashboard_routes import (BULK_DEADLINE, BULK_MAX_REPOS, BulkImportError, bulk_results,
+                                     normalize_repo_urls, parse_bulk_request, user_repos_error)
+from services import analysis_pipeline
+from services.repo_scraper import alist_user_repos, ascrape_github_repo
+from services.token_revocation import revocation_store
+from utils import metrics, tracing
+
+IO_THREADS = int(os.getenv('ASGI_IO_THREADS', '64'))   # Firestore / CPU-bound work off the event loop
+
+flask_app = create_app()
+
+
+# ── Auth ──────────────────────────────────────────────────────────────────────
+class AuthError(Exception):
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.body = body
+
+
+def _verify_jwt(authorization: str) -> str:
+    """
+    Verify a bearer token exactly as @jwt_required() does: flask-jwt-extended runs
+    in a bare request context and its own error handlers produce the response.
+    """
+    headers = {'Authorization': authorization} if authorization else {}
+    with flask_app.test_request_context(headers=headers):
+        try:
+            verify_jwt_in_request()
+        except Exception as e:
+            resp = flask_app.make_response(flask_app.handle_user_exception(e))
+            raise AuthError(resp.status_code, resp.get_json())
+        return get_jwt_identity()
+
+
+async def current_user(request: Request) -> str:
+    return _verify_jwt(request.headers.get('Authorization'))
+
+
+# ── App ───────────────────────────────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix='asgi-io'))
+    await asyncio.to_thread(revocation_store.start)   # initial load, off the event loop
+    yield
+    from services.repo_scraper import get_client
+    await get_client().aclose()
+
+
+app = FastAPI(title='SkillBridge API', version='2.0.0', lifespan=lifespan,
+              docs_url=None, redoc_url=None, openapi_url=None)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=flask_app.config['CORS_ORIGINS'],
+    allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+    allow_headers=['Content-Type', 'Authorization'],
+)
+
+
+_flask_urls = flask_app.url_map.bind('')
+
+
+def _blueprint(route: APIRoute) -> str:
+    """Blueprint of the Flask route with the same URL, so both modes share metric labels."""
+    try:
+        endpoint, _ = _flask_urls.match(route.path, next(iter(route.methods)))
+    except Exception:
+        return 'app'
+    return endpoint.split('.')[0] if '.' in endpoint else 'app'
+
+
+@app.middleware('http')
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    trace = tracing.start_trace(f'{request.method} {request.url.path}', path=request.url.path)
+    try:
+        response = await call_next(request)
+    except Exception:
+        tracing.finish_trace(trace, status=500)
+        raise
+    route = request.scope.get('route')
+    if isinstance(route, APIRoute):     # mounted Flask requests are recorded by Flask itself
+        metrics.observe_request(_blueprint(route), request.method, response.status_code,
+                                time.perf_counter() - start)
+        trace.name = f'{request.method} {route.path}'
+        tracing.finish_trace(trace, status=response.status_code)
+    else:
+        tracing.finish_trace(trace, discard=True)     # the mounted Flask app traces its own
+    return response
+
+
+@app.exception_handler(AuthError)
+async def auth_error(request: Request, exc: AuthError):
+    return JSONResponse(exc.body, status_code=exc.status_code)
+
+
+def _error(message: str, e: Exception, status_code: int = 500) -> JSONResponse:
+    return JSONResponse({'error': message, 'details': str(e)}, status_code=status_code)
+
+
+async def _json_body(request: Request) -> dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+# ── Analysis stages (gap analysis, career match, SWOT, roadmap) ───────────────
+STAGE_ROUTES = [
+    ('/api/gap-analysis', 'gap_analysis', 'Gap analysis failed'),
+    ('/api/career-match', 'career_match', 'Career match failed'),
+    ('/api/swot',         'swot',         'SWOT generation failed'),
+    ('/api/roadmap',      'roadmap',      'Roadmap generation failed'),
+]
+
+
+def _stage_endpoint(stage: str, failure: str):
+    async def endpoint(request: Request, email: str = Depends(current_user)):
+        try:
+            result = await analysis_pipeline.arun(email, stage, refresh=request.query_params.get('refresh') == '1')
+            if result is None:
+                return JSONResponse({'error': 'User not found'}, status_code=404)
+            return result
+        except Exception as e:
+            return _error(failure, e)
+
+    endpoint.__name__ = f'get_{stage}'
+    return endpoint
+
+
+for _path, _stage, _failure in STAGE_ROUTES:
+    app.add_api_route(_path, _stage_endpoint(_stage, _failure), methods=['GET'])
+
+
+@app.get('/api/roadmap/stream')
+async def stream_roadmap(request: Request, email: str = Depends(current_user)):
+    """Roadmap as Server-Sent Events (see routes.roadmap_routes.stream_roadmap)."""
+    try:
+        stage_plan = await analysis_pipeline.aplan(email, 'roadmap',
+                                                   refresh=request.query_params.get('refresh') == '1')
+        if stage_plan is None:
+            return JSONResponse({'error': 'User not found'}, status_code=404)
+    except Exception as e:
+        return _error('Roadmap generation failed', e)
+
+    return StreamingResponse(roadmap_routes.aroadmap_events(email, stage_plan), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# ── GitHub import ─────────────────────────────────────────────────────────────
+@app.post('/api/dashboard/repo')
+async def scrape_repo(request: Request, email: str = Depends(current_user)):
+    """Scrape a GitHub repo and save it. Body: { url }"""
+    try:
+        data = await _json_body(request)
+        url = (data.get('url') or '').strip()
+        if not url or 'github.com' not in url:
+            return JSONResponse({'error': 'A valid GitHub URL is required'}, status_code=400)
+
+        result = await ascrape_github_repo(url)
+        await asyncio.to_thread(repo_model.upsert_repos, email, [result])
+        return {'message': 'Repo scraped', 'repo': result}
+    except Exception as e:
+        return _error('Failed to scrape repo', e)
+
+
+@app.post('/api/dashboard/repos/bulk')
+async def bulk_import_repos(request: Request, email: str = Depends(current_user)):
+    """
+    Scrape many GitHub repos at once and save them in a single batch.
+    Body: { username } or { urls: [..] }
+    Returns per-repo status: ok | failed | timeout.
+    """
+    try:
+        started = time.monotonic()
+        username, urls = parse_bulk_request(await _json_body(request))
+
+        if username:
+            try:
+                urls = await alist_user_repos(username, limit=BULK_MAX_REPOS)
+            except Exception as e:
+                raise user_repos_error(e)
+        urls = normalize_repo_urls(urls)
+
+        tasks = {asyncio.ensure_future(ascrape_github_repo(u, True)): u for u in urls}
+        remaining = max(0.0, BULK_DEADLINE - (time.monotonic() - started))
+        done, not_done = await asyncio.wait(tasks, timeout=remaining)
+        for task in not_done:
+            task.cancel()
+
+        scraped, body = bulk_results({
+            url: (task.exception() or task.result()) if task in done else None
+            for task, url in tasks.items()
+        })
+        await asyncio.to_thread(repo_model.upsert_repos, email, scraped)
+        return body
+    except BulkImportError as e:
+        return JSONResponse(e.body, status_code=e.status_code)
+    except Exception as e:
+        return _error('Bulk import failed', e)
+
+
+# ── Everything else: the Flask app ────────────────────────────────────────────
+app.mount('/', WSGIMiddleware(flask_app))
@@ -0,0 +1,306 @@
+"""
+Macro load test — replays the SkillBridge user journey against the real app.
+
+    cd backend
+    python -m benchmarks.load_test --users 200 --concurrency 20 --llm-latency 0.8
+
+The app is built by run.py and served by a threaded Werkzeug server on a local
+port. Firestore, Gemini and GitHub are replaced by the stand-ins in
+benchmarks/stubs.py, so no credentials or network access are needed. Each
+virtual user walks the journey
+
+    signup → profile/setup → dashboard/skills → dashboard/repo → assessment
+    (generate + submit) → gap-analysis → swot → career-match → roadmap
+
+and every request is timed on the client. The report gives throughput and
+p50/p95/p99 per route; the full result is written as JSON (default
+instance/benchmarks/<timestamp>.json) and ``--compare`` prints the change
+against an earlier result file.
+
+Notes: the in-memory Firestore has no network latency, so Firestore-bound
+routes look faster than in production; LLM and GitHub latency are set with
+--llm-latency / --github-latency. Semantic skill matching is off unless
+--semantic is passed (it loads a sentence-transformers model).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(_BASE, 'instance', 'benchmarks')
+
+CAREERS = ['Full Stack Developer', 'Backend Developer', 'Data Scientist', 'ML Engineer', 'DevOps Engineer']
+SKILLS = ['Python', 'JavaScript', 'React', 'SQL', 'Docker', 'Git', 'Java', 'Node.js', 'AWS', 'Linux',
+          'Machine Learning', 'Pandas', 'Kubernetes', 'TypeScript', 'MongoDB', 'Flask']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+
+
+# ── Statistics ────────────────────────────────────────────────────────────────
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of an unsorted list (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Client-side latencies and status codes per route, shared by all virtual users."""
+
+    def __init__(self):
+        self.routes = {}
+        self.journeys = 0
+        self.failed_journeys = 0
+        self._lock = threading.Lock()
+
+    def record(self, route: str, ms: float, status):
+        with self._lock:
+            r = self.routes.setdefault(route, {'ms': [], 'statuses': {}})
+            r['ms'].append(ms)
+            r['statuses'][str(status)] = r['statuses'].get(str(status), 0) + 1
+
+    def journey_done(self, ok: bool):
+        with self._lock:
+            self.journeys += 1
+            if not ok:
+                self.failed_journeys += 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        routes = {}
+        for name, r in self.routes.items():
+            ms = r['ms']
+            errors = sum(n for status, n in r['statuses'].items() if not status.startswith(('2', '3')))
+            routes[name] = {
+                'requests': len(ms),
+                'errors': errors,
+                'statuses': r['statuses'],
+                'rps': round(len(ms) / wall_seconds, 2) if wall_seconds else 0,
+                'p50': round(percentile(ms, 50), 1),
+                'p95': round(percentile(ms, 95), 1),
+                'p99': round(percentile(ms, 99), 1),
+                'max': round(max(ms), 1) if ms else 0,
+                'mean': round(sum(ms) / len(ms), 1) if ms else 0,
+            }
+        total = sum(r['requests'] for r in routes.values())
+        return {
+            'wallSeconds': round(wall_seconds, 2),
+            'requests': total,
+            'errors': sum(r['errors'] for r in routes.values()),
+            'requestsPerSecond': round(total / wall_seconds, 2) if wall_seconds else 0,
+            'journeys': self.journeys,
+            'failedJourneys': self.failed_journeys,
+            'journeysPerSecond': round(self.journeys / wall_seconds, 3) if wall_seconds else 0,
+            'routes': routes,
+        }
+
+
+# ── Journey ───────────────────────────────────────────────────────────────────
+class JourneyFailed(Exception):
+    pass
+
+
+class VirtualUser:
+    """One user walking the journey over its own HTTP connection."""
+
+    def __init__(self, base_url: str, n: int, recorder: Recorder, run_id: str, timeout: float = 120):
+        import httpx
+        self.client = httpx.Client(base_url=base_url, timeout=timeout)
+        self.recorder = recorder
+        self.email = f'bench-{run_id}-{n}@example.com'
+        self.github_user = f'bench-user-{n}'
+        self.rng = random.Random(n)
+        self.headers = {}
+
+    def call(self, method: str, path: str, route: str = None, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = self.client.request(method, path, headers=self.headers, **kwargs)
+        except Exception as e:
+            self.recorder.record(route or f'{method} {path}', (time.perf_counter() - start) * 1000,
+                                 type(e).__name__)
+            raise JourneyFailed(f'{method} {path}: {e}')
+        self.recorder.record(route or f'{method} {path}', (time.perf_counter() - start) * 1000, resp.status_code)
+        if resp.status_code >= 400:
+            raise JourneyFailed(f'{method} {path}: HTTP {resp.status_code}')
+        return resp.json() if resp.headers.get('content-type', '').startswith('application/json') else resp.text
+
+    def run(self):
+        data = self.call('POST', '/api/auth/signup', json={
+            'email': self.email, 'password': 'Benchmark1', 'full_name': 'Benchmark User'})
+        self.headers = {'Authorization': f"Bearer {data['access_token']}"}
+
+        self.call('POST', '/api/profile/setup', json={
+            'college': 'Benchmark Institute', 'branch': 'Computer Science', 'year': '3',
+            'careerInterest': self.rng.choice(CAREERS), 'targetCompany': 'Acme', 'bio': 'Load test user'})
+        self.call('POST', '/api/dashboard/skills', json={'skills': [
+            {'name': s, 'level': self.rng.choice(LEVELS), 'category': 'technical'}
+            for s in self.rng.sample(SKILLS, 6)]})
+        self.call('POST', '/api/dashboard/repo', json={'url': f'https://github.com/{self.github_user}/project-1'})
+
+        assessment = self.call('POST', '/api/assessment/generate', json={'skill': 'Python'})
+        answers = {}
+        for q in assessment['questions']:
+            if q.get('type') == 'mcq':
+                answers[str(q['id'])] = self.rng.randrange(len(q.get('options') or [0]))
+            else:
+                answers[str(q['id'])] = f"def {q.get('entryPoint', 'solution')}(*args):\n    return 0"
+        self.call('POST', '/api/assessment/submit', json={
+            'assessmentId': assessment['assessmentId'], 'answers': answers, 'terminated': False})
+
+        self.call('GET', '/api/gap-analysis')
+        self.call('GET', '/api/swot')
+        self.call('GET', '/api/career-match')
+        self.call('GET', '/api/roadmap')
+
+    def close(self):
+        self.client.close()
+
+
+def run_journeys(base_url: str, users: int, concurrency: int, recorder: Recorder, run_id: str,
+                 first: int = 0) -> float:
+    """Run ``users`` journeys on ``concurrency`` threads; returns the wall time in seconds."""
+    def journey(n):
+        user = VirtualUser(base_url, n, recorder, run_id)
+        try:
+            user.run()
+            recorder.journey_done(True)
+        except JourneyFailed as e:
+            recorder.journey_done(False)
+            print(f"⚠  journey {n} failed: {e}")
+        finally:
+            user.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='vuser') as pool:
+        list(pool.map(journey, range(first, first + users)))
+    return time.perf_counter() - start
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+def start_server(args, workdir: str):
+    """Install the stand-ins, build the app from run.py and serve it; returns (base_url, model, server)."""
+    from benchmarks import stubs
+
+    github = stubs.GitHubStub(latency=args.github_latency).start()
+    os.environ['GITHUB_API_URL'] = github.url
+    os.environ['GITHUB_CACHE_DIR'] = os.path.join(workdir, 'github_cache')
+    os.environ['JOB_QUEUE_DB'] = os.path.join(workdir, 'jobs.sqlite3')
+    os.environ['TRACE_SLOW_LOG'] = os.path.join(workdir, 'slow_requests.jsonl')
+    os.environ.setdefault('SKILL_SEMANTIC_MATCHING', '1' if args.semantic else '0')
+    os.environ.setdefault('WARMUP_MODULES', '')
+    # The in-memory Firestore lives in this process, so grading runs here rather than in
+    # grader_worker.py; the code being graded is the harness's own, so the sandbox is optional.
+    os.environ.setdefault('GRADER_IN_PROCESS', '1')
+    os.environ.setdefault('GRADER_SANDBOX', 'none')
+
+    stubs.use_local_firestore()
+    model = stubs.use_fake_llm(args.llm_latency, args.llm_jitter)
+
+    import run
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, run.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name='benchmark-server', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', model, server
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+def print_report(result: dict, baseline: dict = None):
+    s = result['summary']
+    print(f"\n{s['journeys']} journeys ({s['failedJourneys']} failed), {s['requests']} requests "
+          f"({s['errors']} errors) in {s['wallSeconds']}s — "
+          f"{s['requestsPerSecond']} req/s, {s['journeysPerSecond']} journeys/s\n")
+    header = f"{'route':<34} {'reqs':>6} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header + '   (ms)')
+    base_routes = (baseline or {}).get('summary', {}).get('routes', {})
+    for name, r in s['routes'].items():
+        line = (f"{name:<34} {r['requests']:>6} {r['errors']:>5} {r['rps']:>7.2f} "
+                f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f}")
+        if baseline:
+            b = base_routes.get(name)
+            line += (f" {r['p50'] - b['p50']:>+8.1f} {r['p95'] - b['p95']:>+8.1f}" if b else f" {'new':>8} {'':>8}")
+        print(line)
+    if baseline:
+        b = baseline['summary']
+        print(f"\nthroughput {s['requestsPerSecond']} req/s vs {b['requestsPerSecond']} req/s "
+              f"({baseline.get('startedAt', 'baseline')})")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_BASE, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load_test',
+                                     description='Replay the user journey against the app with local stand-ins.')
+    parser.add_argument('--users', type=int, default=50, help='journeys to run (one new user each)')
+    parser.add_argument('--concurrency', type=int, default=10, help='journeys in flight at once')
+    parser.add_argument('--warmup', type=int, default=1, help='unrecorded journeys run first')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='seconds per fake Gemini call')
+    parser.add_argument('--llm-jitter', type=float, default=0.2, help='+/- fraction of --llm-latency')
+    parser.add_argument('--github-latency', type=float, default=0.05, help='seconds per GitHub stub request')
+    parser.add_argument('--semantic', action='store_true', help='enable semantic skill matching')
+    parser.add_argument('--out', help='result file (default: instance/benchmarks/<timestamp>.json)')
+    parser.add_argument('--compare', metavar='JSON', help='earlier result file to compare against')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    started_at = datetime.utcnow()
+    run_id = started_at.strftime('%Y%m%d%H%M%S')
+    with tempfile.TemporaryDirectory(prefix='skillbridge-bench-') as workdir:
+        base_url, model, server = start_server(args, workdir)
+        try:
+            if args.warmup:
+                run_journeys(base_url, args.warmup, 1, Recorder(), run_id, first=-args.warmup)
+            recorder = Recorder()
+            calls_before = model.calls
+            wall = run_journeys(base_url, args.users, args.concurrency, recorder, run_id)
+        finally:
+            server.shutdown()
+
+    result = {
+        'startedAt': started_at.isoformat(),
+        'gitCommit': _git_commit(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'config': vars(args),
+        'llmCalls': model.calls - calls_before,
+        'summary': recorder.summary(wall),
+    }
+    print_report(result, baseline)
+
+    out = args.out or os.path.join(RESULTS_DIR, f'{run_id}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✓ Results written to {out}")
+    return 0 if result['summary']['failedJourneys'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Local stand-ins for the external services, for load tests.
+
+* Firestore — utils.local_firestore.LocalFirestore installed as the process's client.
+* Gemini    — FakeModel replaces llm_service.get_model(): it sleeps for a
+              configurable latency and answers with canned JSON/text matching
+              the prompt (SWOT, roadmap, question batch, resume, free text),
+              so the real prompt building, caching, parsing and metrics run.
+* GitHub    — GitHubStub, a threaded HTTP server for the REST endpoints
+              services.repo_scraper calls; point GITHUB_API_URL at stub.url
+              before repo_scraper is imported.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ── Firestore ─────────────────────────────────────────────────────────────────
+def use_local_firestore():
+    """Make utils.firebase_config.get_db() return a fresh in-memory Firestore."""
+    from utils import firebase_config
+    from utils.local_firestore import LocalFirestore
+    db = LocalFirestore()
+    firebase_config._db, firebase_config._db_pid = db, os.getpid()
+    return db
+
+
+# ── Gemini ────────────────────────────────────────────────────────────────────
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _swot() -> dict:
+    return {
+        'strengths': ['Solid programming fundamentals', 'Hands-on projects', 'Quick learner', 'Team player'],
+        'weaknesses': ['Limited cloud experience', 'Few production deployments', 'Testing habits', 'System design'],
+        'opportunities': ['Growing demand for the role', 'Open-source contributions', 'Internships', 'Certifications'],
+        'threats': ['Competitive entry-level market', 'Fast-moving tooling', 'Automation', 'Experience filters'],
+        'llmAnalysis': 'A promising profile with clear gaps in deployment and cloud skills.',
+    }
+
+
+def _roadmap(gaps: list) -> list:
+    skills = gaps or ['Fundamentals']
+    return [{
+        'week': week,
+        'theme': f'Week {week} focus',
+        'skillsFocus': [skills[(week - 1) % len(skills)]],
+        'tasks': ['Finish one course module', 'Build a small project'],
+        'resources': ['Official documentation'],
+        'milestone': f'Milestone {week} completed',
+    } for week in range(1, 13)]
+
+
+class FakeModel:
+    """
+    Quacks like google.generativeai.GenerativeModel for generate_content(_async),
+    streaming included.
+
+    Args:
+        latency:      seconds per call (streams spread it over their chunks)
+        jitter:       +/- fraction of latency, uniformly random
+        stream_chunks: chunks per streamed response
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, stream_chunks: int = 6):
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_chunks = max(1, stream_chunks)
+        self._ids = itertools.count(1)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _answer(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if 'SWOT analysis' in prompt:
+            return json.dumps(_swot())
+        if 'learning roadmap' in prompt:
+            match = re.search(r'Top Skill Gaps: (.*)', prompt)
+            gaps = [g.strip() for g in match.group(1).split(',') if g.strip()] if match else []
+            return json.dumps(_roadmap(gaps))
+        if 'assessment questions' in prompt:
+            return json.dumps(self._questions(prompt))
+        if 'resume parser' in prompt:
+            return json.dumps({'skills': ['Python', 'SQL', 'Git'], 'achievements': ['Built a web app'],
+                               'experience': ['Software intern'], 'publications': [],
+                               'summary': 'Computer science student. Interested in backend development.'})
+        return 'You already have a good base. Close the top two gaps with one focused project each.'
+
+    def _questions(self, prompt: str) -> list:
+        match = re.search(r'exactly (\d+) multiple choice questions and (\d+) coding', prompt)
+        mcq, code = (int(match.group(1)), int(match.group(2))) if match else (10, 4)
+        questions = []
+        for _ in range(mcq):
+            n = next(self._ids)
+            questions.append({'type': 'mcq', 'question': f'Benchmark question {n}: which option is correct?',
+                              'options': ['A', 'B', 'C', 'D'], 'correct': n % 4})
+        for _ in range(code):
+            n = next(self._ids)
+            questions.append({
+                'type': 'code', 'question': f'Benchmark task {n}: return {n} times x.', 'language': 'python',
+                'starterCode': 'def solution(x):\n    pass', 'entryPoint': 'solution',
+                'tests': [{'args': [1], 'expected': n}, {'args': [2], 'expected': 2 * n},
+                          {'args': [0], 'expected': 0}],
+                'solution': f'def solution(x):\n    return {n} * x',
+            })
+        return questions
+
+    def _chunks(self, text: str) -> list:
+        size = max(1, -(-len(text) // self.stream_chunks))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        text = self._answer(prompt)
+        if not stream:
+            time.sleep(self._delay())
+            return _Response(text)
+        return self._stream(text)
+
+    def _stream(self, text: str):
+        chunks = self._chunks(text)
+        pause = self._delay() / len(chunks)
+        for chunk in chunks:
+            time.sleep(pause)
+            yield _Response(chunk)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        text = self._answer(prompt)
+        if not stream:
+            await asyncio.sleep(self._delay())
+            return _Response(text)
+        return self._astream(text)
+
+    async def _astream(self, text: str):
+        chunks = self._chunks(text)
+        pause = self._delay() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(pause)
+            yield _Response(chunk)
+
+
+def use_fake_llm(latency: float = 0.5, jitter: float = 0.2) -> FakeModel:
+    """Route every llm_service call to a FakeModel."""
+    from services import llm_service
+    model = FakeModel(latency, jitter)
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    llm_service.get_model = lambda model_name=llm_service.DEFAULT_MODEL: model
+    return model
+
+
+# ── GitHub ────────────────────────────────────────────────────────────────────
+class _GitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    LANGUAGES = ['Python', 'JavaScript', 'TypeScript', 'Go', 'Java', 'Shell']
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        path = self.path.split('?', 1)[0]
+        parts = [p for p in path.split('/') if p]
+        if parts[:1] == ['repos'] and len(parts) == 3:
+            body = self._repo(parts[1], parts[2])
+        elif parts[:1] == ['repos'] and len(parts) == 4 and parts[3] == 'languages':
+            rng = random.Random(f'{parts[1]}/{parts[2]}')
+            body = {lang: rng.randint(1000, 90000) for lang in rng.sample(self.LANGUAGES, 3)}
+        elif parts[:1] == ['users'] and len(parts) == 3 and parts[2] == 'repos':
+            body = [{'html_url': f'https://github.com/{parts[1]}/project-{i}', 'fork': False,
+                     'name': f'project-{i}'} for i in range(1, 6)]
+        elif parts == ['rate_limit']:
+            body = {'resources': {'core': {'limit': 5000, 'remaining': 5000}}}
+        else:
+            return self._send(404, {'message': 'Not Found'})
+        self._send(200, body)
+
+    def _repo(self, owner: str, repo: str) -> dict:
+        return {'full_name': f'{owner}/{repo}', 'description': f'{repo} by {owner}', 'stargazers_count': 42,
+                'language': 'Python', 'pushed_at': '2026-01-01T00:00:00Z', 'topics': ['flask', 'api']}
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-RateLimit-Remaining', '5000')
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class GitHubStub:
+    """The GitHub REST endpoints used by services.repo_scraper, served on 127.0.0.1."""
+
+    def __init__(self, latency: float = 0.05):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _GitHubHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def start(self) -> 'GitHubStub':
+        threading.Thread(target=self.server.serve_forever, name='github-stub', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,48 @@
+"""
+SkillBridge grading worker — runs the code answers of submitted assessments.
+
+    python grader_worker.py
+
+The web workers only enqueue grading jobs in the shared SQLite job queue
+(services/job_queue.py); this process claims them with GRADING_QUEUE_WORKERS
+threads and runs every test case in the grader sandbox (services/code_grader.py).
+It also runs the question-bank refill jobs (QUESTION_REFILL_WORKERS threads), whose
+generated code questions are kept only if their reference solution passes.
+Run it on the same host as the web server (the queue is a local file), as its
+own unprivileged user, and with bubblewrap installed.
+"""
+
+import sys
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.config import Config
+from utils.firebase_config import set_credentials_path
+from services import code_grader
+from models.assessment import question_bank, REFILL_WORKERS
+from routes.assessment_routes import grading_queue, GRADING_WORKERS
+
+
+def main() -> int:
+    if not code_grader.sandbox_available():
+        print("⚠  No grader sandbox: install bubblewrap (and setpriv when running as root), "
+              "or set GRADER_SANDBOX=none for trusted local use")
+        return 1
+    set_credentials_path(Config.FIREBASE_CREDENTIALS)
+
+    queue = grading_queue(GRADING_WORKERS)
+    queue.start()
+    question_bank.start_refill_workers(REFILL_WORKERS)
+    print(f"✓ Grading worker: {GRADING_WORKERS} grading + {REFILL_WORKERS} refill threads, "
+          f"sandbox={code_grader.SANDBOX}, queue={queue.db_path}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Assessment question bank — a pool of validated questions per skill.
+
+    question_bank/{skillKey}                   {skill, updatedAt}
+    question_bank/{skillKey}/questions/{id}    one question (immutable once stored)
+
+An assessment samples 5 MCQ + 2 code questions from the skill's pool, which is
+cached in-process, so generating one costs no LLM call. When a pool drops below
+its low watermark, a background job tops it up with one batched Gemini call.
+Refill jobs run in the grader process (grader_worker.py), since generated code
+questions are only stored once their reference solution passes its own tests in
+the grader sandbox; web workers only enqueue them.
+Question ids are content hashes, so regenerated duplicates are dropped.
+User assessment documents store question ids only; answers are graded against
+the bank. Cold skills generate one batch of MCQs synchronously and borrow the
+static fallback code questions until the refill has stocked the pool; the
+static FALLBACK_QUESTIONS are used if that fails. Each process asks Gemini for
+a skill at most once per QUESTION_REFILL_INTERVAL, so a pool that cannot reach
+its watermark does not trigger a call on every assessment.
+"""
+
+import os
+import re
+import random
+import hashlib
+import threading
+from datetime import datetime
+
+from services import llm_service
+from services.skill_vector_builder import canonicalize
+from utils import metrics
+from utils.firebase_config import get_db
+from utils.ttl_cache import TTLCache
+
+BANK_COLLECTION = 'question_bank'
+QUESTIONS_SUBCOLLECTION = 'questions'
+
+SAMPLE_COUNTS = {'mcq': 5, 'code': 2}
+POOL_TARGET = {'mcq': int(os.getenv('QUESTION_POOL_MCQ', '40')),
+               'code': int(os.getenv('QUESTION_POOL_CODE', '12'))}
+LOW_WATERMARK = {'mcq': int(os.getenv('QUESTION_POOL_MCQ_LOW', '15')),
+                 'code': int(os.getenv('QUESTION_POOL_CODE_LOW', '5'))}
+BATCH_SIZE = {'mcq': 10, 'code': 4}                   # questions per Gemini refill call
+POOL_CACHE_TTL = float(os.getenv('QUESTION_POOL_CACHE_TTL', '300'))
+REFILL_INTERVAL = float(os.getenv('QUESTION_REFILL_INTERVAL', '600'))    # min seconds between Gemini calls per skill
+REFILL_WORKERS = int(os.getenv('QUESTION_REFILL_WORKERS', '1'))
+
+CODE_LANGUAGES = {'python', 'java', 'javascript', 'c++'}
+PRIVATE_FIELDS = ('correct', 'solution', 'tests')     # never sent to the client
+
+
+FALLBACK_QUESTIONS = [
+    {"id": "fallback-1", "type": "mcq", "question": "Which data structure uses LIFO?",
+     "options": ["Queue", "Stack", "Tree", "Graph"], "correct": 1},
+    {"id": "fallback-2", "type": "mcq", "question": "What is the time complexity of binary search?",
+     "options": ["O(n)", "O(log n)", "O(n²)", "O(1)"], "correct": 1},
+    {"id": "fallback-3", "type": "mcq", "question": "Which keyword is used to create a class in Python?",
+     "options": ["def", "class", "struct", "type"], "correct": 1},
+    {"id": "fallback-4", "type": "mcq", "question": "What does REST stand for?",
+     "options": ["Representational State Transfer", "Remote Endpoint State Tool",
+                 "Real-time Event System Transfer", "Resource Exchange State Transfer"], "correct": 0},
+    {"id": "fallback-5", "type": "mcq", "question": "Which of these is NOT a Python data type?",
+     "options": ["list", "tuple", "array", "dict"], "correct": 2},
+    {"id": "fallback-6", "type": "code", "question": "Write a function to reverse a string without using built-in reverse.",
+     "language": "python", "starterCode": "def reverse_string(s: str) -> str:\n    # Your code here\n    pass",
+     "entryPoint": "reverse_string",
+     "tests": [{"args": ["hello"], "expected": "olleh"}, {"args": [""], "expected": ""},
+               {"args": ["ab c"], "expected": "c ba"}]},
+    {"id": "fallback-7", "type": "code", "question": "Implement a function to check if a number is prime.",
+     "language": "python", "starterCode": "def is_prime(n: int) -> bool:\n    # Your code here\n    pass",
+     "entryPoint": "is_prime",
+     "tests": [{"args": [2], "expected": True}, {"args": [1], "expected": False},
+               {"args": [97], "expected": True}, {"args": [91], "expected": False}]},
+]
+_FALLBACK_BY_ID = {q['id']: q for q in FALLBACK_QUESTIONS}
+_FALLBACK_CODE = [q for q in FALLBACK_QUESTIONS if q['type'] == 'code']
+
+
+def skill_key(skill: str) -> str:
+    """Canonical skill → document id ('C++' → 'c++', 'HTML/CSS' → 'html-css')."""
+    name = canonicalize([skill])[0] if skill.strip() else 'python'
+    return re.sub(r'[^a-z0-9+#]+', '-', name.lower()).strip('-') or 'general'
+
+
+def question_id(key: str, question: dict) -> str:
+    text = re.sub(r'\s+', ' ', question['question'].strip().lower())
+    digest = hashlib.sha1(f"{question['type']}|{text}".encode('utf-8')).hexdigest()
+    return f"{key}-{digest[:12]}"
+
+
+def public_view(question: dict) -> dict:
+    return {k: v for k, v in question.items() if k not in PRIVATE_FIELDS}
+
+
+# ── Validation ───────────────────────────────────────────────────────────────
+def validate_question(q) -> dict:
+    """Normalised copy of a generated question, or None if it is malformed."""
+    if not isinstance(q, dict) or not isinstance(q.get('question'), str) or len(q['question'].strip()) < 10:
+        return None
+    if q.get('type') == 'mcq':
+        options = q.get('options')
+        correct = q.get('correct')
+        if not (isinstance(options, list) and len(options) == 4 and all(isinstance(o, str) and o.strip() for o in options)):
+            return None
+        if len({o.strip().lower() for o in options}) != 4:
+            return None
+        if isinstance(correct, bool) or not isinstance(correct, int) or not 0 <= correct < 4:
+            return None
+        return {'type': 'mcq', 'question': q['question'].strip(), 'options': [o.strip() for o in options],
+                'correct': correct}
+    if q.get('type') == 'code':
+        language = str(q.get('language', 'python')).lower()
+        entry = q.get('entryPoint')
+        tests = q.get('tests')
+        if language not in CODE_LANGUAGES or not isinstance(q.get('starterCode'), str):
+            return None
+        if not (isinstance(entry, str) and entry.isidentifier()):
+            return None
+        if not (isinstance(tests, list) and len(tests) >= 2 and
+                all(isinstance(t, dict) and isinstance(t.get('args'), list) and 'expected' in t for t in tests)):
+            return None
+        out = {'type': 'code', 'question': q['question'].strip(), 'language': language,
+               'starterCode': q['starterCode'], 'entryPoint': entry,
+               'tests': [{'args': t['args'], 'expected': t['expected']} for t in tests]}
+        if isinstance(q.get('solution'), str):
+            out['solution'] = q['solution']
+        return out
+    return None
+
+
+# ── Generation ───────────────────────────────────────────────────────────────
+def _batch_prompt(skill: str, mcq: int, code: int) -> str:
+    language = skill.lower() if skill.lower() in CODE_LANGUAGES else 'python'
+    return f"""Generate technical assessment questions for skill: "{skill}".
+
+Create exactly {mcq} multiple choice questions and {code} coding questions, all
+different from each other and appropriate for intermediate level.
+
+Return ONLY a valid JSON array with this structure:
+[
+  {{
+    "type": "mcq",
+    "question": "What is ...?",
+    "options": ["A", "B", "C", "D"],
+    "correct": 0
+  }},
+  {{
+    "type": "code",
+    "question": "Write a function that ...",
+    "language": "{language}",
+    "starterCode": "def solution(x):\\n    pass",
+    "entryPoint": "solution",
+    "tests": [{{"args": [1], "expected": 2}}, {{"args": [5], "expected": 10}}, {{"args": [0], "expected": 0}}],
+    "solution": "def solution(x):\\n    return 2 * x"
+  }}
+]
+Coding questions need at least 3 tests with JSON arguments/results and a reference solution.
+JSON only, no markdown."""
+
+
+def generate_batch(skill: str, mcq: int = BATCH_SIZE['mcq'], code: int = BATCH_SIZE['code']) -> list:
+    """
+    One Gemini call → validated questions. Invalid ones are dropped, as are code
+    questions whose reference solution fails its own tests in the grader sandbox
+    (so only call it with code > 0 from the grader process).
+    """
+    from services.code_grader import check_reference_solution
+    raw = llm_service.generate_json(_batch_prompt(skill, mcq, code), use_cache=False, site='question_batch')
+    if not isinstance(raw, list):
+        raise ValueError('question batch is not a JSON array')
+    questions = [q for q in (validate_question(r) for r in raw) if q is not None]
+    return [q for q in questions if q['type'] != 'code' or check_reference_solution(q)]
+
+
+# ── Bank ─────────────────────────────────────────────────────────────────────
+class QuestionBank:
+    """Question pools per skill, cached in-process and refilled in the background."""
+
+    def __init__(self, db_factory=get_db, cache_ttl: float = POOL_CACHE_TTL):
+        self._db = db_factory
+        self._pools = TTLCache(max_entries=512, ttl=cache_ttl)
+        self._refill_queue = None
+        self._refill_lock = threading.Lock()
+        self._requested = TTLCache(max_entries=4096, ttl=REFILL_INTERVAL)   # skill key → last Gemini request
+
+    def _questions(self, key: str):
+        return self._db().collection(BANK_COLLECTION).document(key).collection(QUESTIONS_SUBCOLLECTION)
+
+    def pool(self, key: str) -> dict:
+        """{'mcq': [...], 'code': [...]} for a skill key (cached)."""
+        cached = self._pools.get(key)
+        if cached is not None:
+            return cached
+        pool = {'mcq': [], 'code': []}
+        with metrics.track('firestore', 'query'):
+            snaps = list(self._questions(key).stream())
+        for snap in snaps:
+            q = snap.to_dict()
+            if q.get('type') in pool:
+                pool[q['type']].append(dict(q, id=snap.id))
+        self._pools.set(key, pool)
+        return pool
+
+    def add(self, skill: str, key: str, questions: list) -> int:
+        """Store validated questions; returns how many were new to this process's view of the pool."""
+        if not questions:
+            return 0
+        db = self._db()
+        known = {q['id'] for qs in self.pool(key).values() for q in qs}
+        batch = db.batch()
+        now = datetime.utcnow().isoformat()
+        added = 0
+        for q in questions:
+            qid = question_id(key, q)
+            if qid in known:
+                continue
+            known.add(qid)
+            batch.set(self._questions(key).document(qid), dict(q, skill=skill, createdAt=now))
+            added += 1
+        batch.set(db.collection(BANK_COLLECTION).document(key), {'skill': skill, 'updatedAt': now}, merge=True)
+        with metrics.track('firestore', 'batch_commit'):
+            batch.commit()
+        self._pools.pop(key)
+        return added
+
+    def needs_refill(self, key: str) -> bool:
+        pool = self.pool(key)
+        return any(len(pool[t]) < LOW_WATERMARK[t] for t in LOW_WATERMARK)
+
+    # ── Background refill ────────────────────────────────────────────────────
+    def _new_refill_queue(self, workers: int):
+        from services.job_queue import JobQueue
+        return JobQueue(
+            'question_refill', self._refill_job,
+            workers=workers,
+            max_depth=int(os.getenv('QUESTION_REFILL_MAX_DEPTH', '100')),
+        )
+
+    def _get_refill_queue(self):
+        if self._refill_queue is None:
+            with self._refill_lock:
+                if self._refill_queue is None:
+                    from services.code_grader import IN_PROCESS
+                    self._refill_queue = self._new_refill_queue(REFILL_WORKERS if IN_PROCESS else 0)
+        return self._refill_queue
+
+    def start_refill_workers(self, workers: int = REFILL_WORKERS):
+        """Run refill jobs in this process — the grader process, where reference solutions are executed."""
+        with self._refill_lock:
+            self._refill_queue = self._new_refill_queue(workers)
+        self._refill_queue.start()
+        return self._refill_queue
+
+    def _throttled(self, key: str) -> bool:
+        """True if this process already asked Gemini for this skill within REFILL_INTERVAL."""
+        if self._requested.get(key) is not None:
+            return True
+        self._requested.set(key, True)
+        return False
+
+    def request_refill(self, skill: str, key: str):
+        """Queue a top-up for a skill unless one is pending (any process) or was recently requested."""
+        if not llm_service.is_configured() or self._throttled(f'refill:{key}'):
+            return
+        queue = self._get_refill_queue()
+        try:
+            if not queue.has_pending(key):
+                queue.submit({'skill': skill}, owner=key)
+        except Exception as e:
+            print(f"⚠  Could not queue question refill for {skill}: {e}")
+
+    def _refill_job(self, job) -> dict:
+        skill, key = job.payload['skill'], job.owner
+        self._pools.pop(key)
+        pool = self.pool(key)
+        added = 0
+        # Keep calling until both types reach their target, within a few calls.
+        for _ in range(4):
+            missing = {t: max(0, POOL_TARGET[t] - len(pool[t])) for t in POOL_TARGET}
+            if not any(missing.values()):
+                break
+            job.report(f"generating ({len(pool['mcq'])} mcq / {len(pool['code'])} code)")
+            batch = generate_batch(skill, min(missing['mcq'], BATCH_SIZE['mcq']),
+                                   min(missing['code'], BATCH_SIZE['code']))
+            added += self.add(skill, key, batch)
+            pool = self.pool(key)
+        return {'added': added, 'mcq': len(pool['mcq']), 'code': len(pool['code'])}
+
+    # ── Assessments ──────────────────────────────────────────────────────────
+    def sample(self, skill: str, rng=random) -> tuple:
+        """
+        A randomised 5 MCQ + 2 code set for a skill.
+
+        Returns:
+            (skill_key, questions) — questions include answers; use public_view() for clients
+        """
+        key = skill_key(skill)
+        pool = self.pool(key)
+        if len(pool['mcq']) < SAMPLE_COUNTS['mcq'] and llm_service.is_configured() \
+                and not self._throttled(f'cold:{key}'):
+            # Cold skill: generate MCQs now so this attempt is skill-specific. Code questions
+            # need their reference solution run, which the background refill does.
+            try:
+                self.add(skill, key, generate_batch(skill, code=0))
+                pool = self.pool(key)
+            except Exception as e:
+                print(f"Question generation failed for {skill}: {e}")
+        if self.needs_refill(key):
+            self.request_refill(skill, key)
+
+        if len(pool['mcq']) < SAMPLE_COUNTS['mcq']:
+            return key, [dict(q) for q in FALLBACK_QUESTIONS]
+        code_pool = pool['code'] if len(pool['code']) >= SAMPLE_COUNTS['code'] else _FALLBACK_CODE
+        questions = rng.sample(pool['mcq'], SAMPLE_COUNTS['mcq'])
+        questions.extend(dict(q) for q in rng.sample(code_pool, SAMPLE_COUNTS['code']))
+        return key, questions
+
+    def get_questions(self, key: str, ids: list) -> list:
+        """Questions by id in the given order; unknown ids are skipped."""
+        by_id = {q['id']: q for qs in self.pool(key).values() for q in qs}
+        missing = [i for i in ids if i not in by_id and i not in _FALLBACK_BY_ID]
+        if missing:
+            refs = [self._questions(key).document(i) for i in missing]
+            with metrics.track('firestore', 'get_all'):
+                snaps = list(self._db().get_all(refs))
+            for snap in snaps:
+                if snap.exists:
+                    by_id[snap.id] = dict(snap.to_dict(), id=snap.id)
+        by_id.update(_FALLBACK_BY_ID)
+        return [by_id[i] for i in ids if i in by_id]
+
+
+question_bank = QuestionBank()
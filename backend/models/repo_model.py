@@ -0,0 +1,147 @@
+"""
+Scraped GitHub repos, one document per repo in `users/{email}/repos/{owner:repo}`.
+
+Upserts are idempotent (the document id is the lower-cased owner/repo) and only
+touch the repos being written, so concurrent imports cannot drop each other's
+results. The user document keeps a compact `dashboard.repoSummary`
+({count, languages, lastScrapedAt}) maintained with Increment / ArrayUnion
+transforms instead of the full list. Reads are paginated, most recent push first.
+A partial result from a failed scrape never replaces a repo that was stored
+from a successful one.
+"""
+
+import os
+from datetime import datetime
+
+from models import user_model
+from utils import metrics
+from utils.ttl_cache import TTLCache
+from utils.firebase_config import get_db, Increment, ArrayUnion, DELETE_FIELD
+
+REPOS_SUBCOLLECTION = 'repos'
+DEFAULT_PAGE_SIZE = int(os.getenv('REPOS_PAGE_SIZE', '20'))
+MAX_PAGE_SIZE = 100
+
+# Users whose legacy `dashboard.repos` array is known to be gone, so it is checked once per process
+_migrated = TTLCache(max_entries=100000, ttl=0)
+
+
+def repo_id(repo: dict) -> str:
+    """'Owner/Repo' (or its URL) → 'owner:repo' — document ids cannot contain '/'."""
+    name = repo.get('name') or repo.get('url', '').split('github.com/')[-1]
+    return name.strip().strip('/').lower().replace('/', ':')
+
+
+def repos_ref(email: str):
+    return user_model.user_ref(email).collection(REPOS_SUBCOLLECTION)
+
+
+def upsert_repos(email: str, repos: list) -> int:
+    """
+    Insert or replace repos in one batch and update the summary on the user document.
+
+    Args:
+        email: owner of the repos
+        repos: scraped repo dicts; on duplicate ids the first one wins. Partial results
+               (``partial: True``) are only stored if the repo is new or was partial too.
+
+    Returns:
+        number of repos that were not stored before
+    """
+    by_id = {}
+    for repo in repos:
+        rid = repo_id(repo)
+        if rid:
+            by_id.setdefault(rid, repo)
+    if not by_id:
+        return 0
+
+    db = get_db()
+    collection = repos_ref(email)
+    refs = {rid: collection.document(rid) for rid in by_id}
+    languages = sorted({r['language'] for r in by_id.values() if r.get('language') not in (None, '', 'Unknown')})
+
+    for attempt in range(2):
+        with metrics.track('firestore', 'get_all'):
+            existing = {snap.id: bool((snap.to_dict() or {}).get('partial'))
+                        for snap in db.get_all(list(refs.values()), field_paths=['name', 'partial'])
+                        if snap.exists}
+        batch = db.batch()
+        for rid, repo in by_id.items():
+            # create() for new repos so a concurrent import of the same repo fails the
+            # batch (and we recount) instead of being counted twice
+            if rid in existing:
+                if repo.get('partial') and not existing[rid]:
+                    continue        # failed re-scrape: keep the good stored copy
+                batch.set(refs[rid], repo)
+            else:
+                batch.create(refs[rid], repo)
+
+        added = len(by_id) - len(existing)
+        summary = {'lastScrapedAt': datetime.utcnow().isoformat()}
+        if added:
+            summary['count'] = Increment(added)
+        if languages:
+            summary['languages'] = ArrayUnion(languages)
+        batch.set(user_model.user_ref(email), {'dashboard': {'repoSummary': summary}}, merge=True)
+
+        try:
+            with metrics.track('firestore', 'batch_commit'):
+                batch.commit()
+        except Exception as e:
+            if type(e).__name__ == 'AlreadyExists' and attempt == 0:
+                continue
+            raise
+        user_model.invalidate(email)
+        return added
+
+
+def list_repos(email: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+    """
+    One page of repos ordered by lastCommit, newest first.
+
+    Args:
+        cursor: id of the last repo on the previous page (the ``nextCursor`` it returned)
+
+    Returns:
+        (repos, next_cursor) — next_cursor is None on the last page
+
+    Raises:
+        ValueError: unknown cursor
+    """
+    limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+    collection = repos_ref(email)
+    query = collection.order_by('lastCommit', direction='DESCENDING').limit(limit + 1)
+    if cursor:
+        with metrics.track('firestore', 'get'):
+            after = collection.document(cursor).get()
+        if not after.exists:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        query = query.start_after(after)
+
+    with metrics.track('firestore', 'query'):
+        docs = list(query.stream())
+    page = docs[:limit]
+    next_cursor = page[-1].id if len(docs) > limit else None
+    return [dict(doc.to_dict(), id=doc.id) for doc in page], next_cursor
+
+
+def migrate_legacy(email: str, data: dict = None) -> int:
+    """
+    Move a pre-subcollection `dashboard.repos` array into the subcollection, at most
+    once per user per process. Returns repos moved.
+
+    Args:
+        data: the user document if the caller already read it (with `dashboard`), to skip the read
+    """
+    if _migrated.get(email):
+        return 0
+    if data is None:
+        data = user_model.get_user(email, ['dashboard.repos'])
+    legacy = (data or {}).get('dashboard', {}).get('repos')
+    moved = 0
+    if legacy is not None:
+        moved = upsert_repos(email, [r for r in legacy if isinstance(r, dict)])
+        user_model.update_user(email, {'dashboard.repos': DELETE_FIELD})
+    _migrated.set(email, True)
+    return moved
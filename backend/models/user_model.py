@@ -0,0 +1,152 @@
+"""
+Data access for `users/{email}` documents.
+
+User documents carry everything (profile, dashboard.repos, the parsed resume,
+roadmap, SWOT, …), so callers pass the field paths they actually use and only
+those are read from Firestore (a server-side field mask). Reads are memoised
+for the duration of a Flask request: a second read of the same user is served
+from the first one whenever its mask already covers the requested fields.
+Every read returns the caller's own copy, so mutating it cannot change what
+later readers in the request see. Writes through this module invalidate that memo.
+
+The public identity fields (PUBLIC_FIELDS) are also cached per worker for
+USER_CACHE_TTL seconds by get_public_user(); writes through this module drop
+the entry, other workers pick up changes when it expires. Every Firestore call
+is timed (dependency "firestore" in /api/metrics).
+
+    data = get_user(email, ['profile', 'dashboard.skills'])   # None if no such user
+    set_user(email, {'gap_analysis': result})                  # merge write
+"""
+
+import os
+import copy
+
+from flask import g, has_request_context
+
+from utils import metrics
+from utils.firebase_config import get_db
+from utils.ttl_cache import TTLCache
+
+USERS_COLLECTION = 'users'
+ALL_FIELDS = None   # fields=None reads the whole document
+PUBLIC_FIELDS = ['id', 'email', 'full_name', 'created_at']
+# The `dashboard` map as served to clients — not legacy `dashboard.repos` or fields added later.
+DASHBOARD_FIELDS = ['dashboard.skills', 'dashboard.skillsUpdatedAt', 'dashboard.resume', 'dashboard.repoSummary']
+
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '30'))
+_public_cache = TTLCache(max_entries=int(os.getenv('USER_CACHE_SIZE', '4096')), ttl=USER_CACHE_TTL)
+
+
+def users():
+    return get_db().collection(USERS_COLLECTION)
+
+
+def user_ref(email: str):
+    return users().document(email)
+
+
+# ── Field-mask helpers ──────────────────────────────────────────────────────
+def _covers(mask, fields) -> bool:
+    """True if a read with ``mask`` returned every path in ``fields``."""
+    if mask is ALL_FIELDS:
+        return True
+    if fields is ALL_FIELDS:
+        return False
+    return all(any(f == m or f.startswith(m + '.') for m in mask) for f in fields)
+
+
+def _project(data: dict, fields) -> dict:
+    """The part of ``data`` a read with ``fields`` would have returned."""
+    if fields is ALL_FIELDS:
+        return data
+    out = {}
+    for path in fields:
+        parts = path.split('.')
+        node = data
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                break
+            node = node[part]
+        else:
+            target = out
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = node
+    return out
+
+
+# ── Per-request memo ────────────────────────────────────────────────────────
+def _memo() -> dict:
+    """{email: [(mask, data or None), ...]} for the current request, or None outside one."""
+    if not has_request_context():
+        return None
+    if 'user_docs' not in g:
+        g.user_docs = {}
+    return g.user_docs
+
+
+def invalidate(email: str):
+    _public_cache.pop(email)
+    memo = _memo()
+    if memo is not None:
+        memo.pop(email, None)
+
+
+# ── Reads ───────────────────────────────────────────────────────────────────
+def get_user(email: str, fields=ALL_FIELDS):
+    """
+    Read a user document, projected to ``fields``.
+
+    Args:
+        email:  document id
+        fields: dotted field paths to read, or None for the whole document
+
+    Returns:
+        a new dict with just those fields (missing ones are absent), or None if the user does not exist
+    """
+    fields = list(fields) if fields is not ALL_FIELDS else ALL_FIELDS
+    memo = _memo()
+    if memo is not None:
+        for mask, data in memo.get(email, []):
+            if data is None:
+                return None
+            if _covers(mask, fields):
+                return copy.deepcopy(_project(data, fields))
+
+    with metrics.track('firestore', 'get'):
+        snap = user_ref(email).get(field_paths=fields)
+    data = (snap.to_dict() or {}) if snap.exists else None
+    if memo is not None:
+        memo.setdefault(email, []).append((fields, data))
+        return copy.deepcopy(data)
+    return data
+
+
+def get_public_user(email: str):
+    """PUBLIC_FIELDS of a user from the short-TTL per-worker cache; None if the user does not exist."""
+    cached = _public_cache.get(email)
+    if cached is not None:
+        return dict(cached)
+    data = get_user(email, PUBLIC_FIELDS)
+    if data is not None:
+        _public_cache.set(email, dict(data))
+    return data
+
+
+def user_exists(email: str) -> bool:
+    return get_user(email, ['email']) is not None
+
+
+# ── Writes ──────────────────────────────────────────────────────────────────
+def set_user(email: str, data: dict, merge: bool = True):
+    """Write (merge by default) top-level fields of a user document."""
+    with metrics.track('firestore', 'set'):
+        user_ref(email).set(data, merge=merge)
+    invalidate(email)
+
+
+def update_user(email: str, updates: dict):
+    """Update dotted field paths of an existing user document."""
+    with metrics.track('firestore', 'update'):
+        user_ref(email).update(updates)
+    invalidate(email)
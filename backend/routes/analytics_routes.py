@@ -0,0 +1,76 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+import os, json
+
+from services.cohort_analytics import SUMMARY_COLLECTION, DIMENSIONS, MIN_GROUP_SIZE
+from utils import metrics
+
+def _get_db():
+    from utils.firebase_config import get_db
+    return get_db()
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# When set, summaries are served from the file written by `cohort_analytics --out`.
+SUMMARY_FILE = os.getenv('COHORT_SUMMARY_FILE', '')
+
+
+@analytics_bp.before_request
+@jwt_required()
+def require_admin():
+    """Cohort data is for administrators (Config.ADMIN_EMAILS) only."""
+    if (get_jwt_identity() or '').lower() not in current_app.config['ADMIN_EMAILS']:
+        return jsonify({'error': 'Forbidden', 'message': 'Administrator access required'}), 403
+
+
+def _k_anonymous(summary: dict) -> dict:
+    """Drop groups below the k-anonymity floor (summaries written with a lower threshold)."""
+    groups = [g for g in summary.get('groups', []) if g.get('users', 0) >= MIN_GROUP_SIZE]
+    return dict(summary, groups=groups)
+
+
+def _load_summaries() -> dict:
+    if SUMMARY_FILE:
+        with open(SUMMARY_FILE) as f:
+            summaries = json.load(f)
+    else:
+        db = _get_db()
+        with metrics.track('firestore', 'query'):
+            summaries = {doc.id: doc.to_dict() for doc in db.collection(SUMMARY_COLLECTION).stream()}
+    return {dim: _k_anonymous(summary) for dim, summary in summaries.items()}
+
+
+@analytics_bp.route('/cohorts', methods=['GET'])
+@jwt_required()
+def get_cohorts():
+    """Precomputed cohort summaries for every dimension (college, branch, careerInterest, overall)."""
+    try:
+        summaries = _load_summaries()
+        if not summaries:
+            return jsonify({'error': 'No cohort summaries yet — run services.cohort_analytics'}), 404
+        return jsonify({'summaries': summaries}), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch cohort summaries', 'details': str(e)}), 500
+
+
+@analytics_bp.route('/cohorts/<dimension>', methods=['GET'])
+@jwt_required()
+def get_cohort_dimension(dimension):
+    """Summaries for one dimension. Optional ?key= returns a single group."""
+    try:
+        if dimension not in DIMENSIONS + ('overall',):
+            return jsonify({'error': f'Unknown dimension: {dimension}'}), 400
+
+        summary = _load_summaries().get(dimension)
+        if not summary:
+            return jsonify({'error': 'No cohort summaries yet — run services.cohort_analytics'}), 404
+
+        key = request.args.get('key')
+        if key:
+            group = next((g for g in summary.get('groups', []) if g.get('key') == key), None)
+            if group is None:
+                return jsonify({'error': 'Group not found'}), 404
+            return jsonify(group), 200
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch cohort summaries', 'details': str(e)}), 500
@@ -2,110 +2,150 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import os
-import json
+import threading
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
+from models import user_model
+from utils import metrics
+from models.assessment import question_bank, public_view
 
 assessment_bp = Blueprint('assessment', __name__)
 
+RESULT_FIELDS = ('score', 'totalMcq', 'mcqPercentage', 'codeScore', 'codeTotal', 'codePercentage',
+                 'codeUngraded', 'codeResults', 'overallPercentage', 'gradingStatus', 'terminated',
+                 'submittedAt', 'gradedAt')
 
-def _generate_questions_with_gemini(skill: str) -> list:
-    """Use Gemini to generate 5 MCQ + 2 code questions for a given skill."""
-    gemini_key = os.getenv('GEMINI_API_KEY', '')
-    if not gemini_key:
-        raise RuntimeError('GEMINI_API_KEY not set')
-
-    import google.generativeai as genai
-    genai.configure(api_key=gemini_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-
-    prompt = f"""Generate a technical assessment for skill: "{skill}".
-
-Create exactly 7 questions:
-- Questions 1-5: Multiple Choice Questions (MCQ)
-- Questions 6-7: Coding/Subjective questions
-
-Return ONLY a valid JSON array with this structure:
-[
-  {{
-    "id": 1,
-    "type": "mcq",
-    "question": "What is ...?",
-    "options": ["A", "B", "C", "D"],
-    "correct": 0
-  }},
-  ...
-  {{
-    "id": 6,
-    "type": "code",
-    "question": "Write a function that ...",
-    "language": "{skill.lower() if skill.lower() in ['python','java','javascript','c++'] else 'python'}",
-    "starterCode": "def solution():\\n    pass"
-  }}
-]
-
-Make questions appropriate for intermediate level. JSON only, no markdown."""
-
-    response = model.generate_content(prompt)
-    text = response.text.strip()
-    if text.startswith('```'):
-        text = text.split('```')[1]
-        if text.startswith('json'):
-            text = text[4:]
-    return json.loads(text.strip())
-
-
-FALLBACK_QUESTIONS = [
-    {"id": 1, "type": "mcq", "question": "Which data structure uses LIFO?",
-     "options": ["Queue", "Stack", "Tree", "Graph"], "correct": 1},
-    {"id": 2, "type": "mcq", "question": "What is the time complexity of binary search?",
-     "options": ["O(n)", "O(log n)", "O(n²)", "O(1)"], "correct": 1},
-    {"id": 3, "type": "mcq", "question": "Which keyword is used to create a class in Python?",
-     "options": ["def", "class", "struct", "type"], "correct": 1},
-    {"id": 4, "type": "mcq", "question": "What does REST stand for?",
-     "options": ["Representational State Transfer", "Remote Endpoint State Tool",
-                 "Real-time Event System Transfer", "Resource Exchange State Transfer"], "correct": 0},
-    {"id": 5, "type": "mcq", "question": "Which of these is NOT a Python data type?",
-     "options": ["list", "tuple", "array", "dict"], "correct": 2},
-    {"id": 6, "type": "code", "question": "Write a function to reverse a string without using built-in reverse.",
-     "language": "python", "starterCode": "def reverse_string(s: str) -> str:\n    # Your code here\n    pass"},
-    {"id": 7, "type": "code", "question": "Implement a function to check if a number is prime.",
-     "language": "python", "starterCode": "def is_prime(n: int) -> bool:\n    # Your code here\n    pass"},
-]
+# A queued grading job not finished after this long is reported as 'stale' (no grader running?).
+GRADING_STALE_SECONDS = float(os.getenv('GRADING_STALE_SECONDS', '600'))
+
+
+def _assessment_ref(email: str, assessment_id: str):
+    return user_model.user_ref(email).collection('assessments').document(assessment_id)
+
+
+def _load_questions(assessment: dict) -> list:
+    if 'questionIds' in assessment:
+        return question_bank.get_questions(assessment.get('skillKey', ''), assessment['questionIds'])
+    return assessment.get('questions', [])   # stored before the question bank
+
+
+# ── Background code grading ───────────────────────────────────────────────────
+# Grading jobs are run by the dedicated grader process (grader_worker.py); web workers
+# only enqueue them. GRADER_IN_PROCESS=1 also runs them here, for local development.
+GRADING_WORKERS = int(os.getenv('GRADING_QUEUE_WORKERS', '4'))
+
+_grading_queue = None
+_grading_queue_lock = threading.Lock()
+
+
+def _grade_assessment_job(job):
+    """Job handler: run the code answers of a submitted assessment and store the scores."""
+    from services.code_grader import grade_code_questions
+    doc_ref = _assessment_ref(job.owner, job.payload['assessmentId'])
+    with metrics.track('firestore', 'get'):
+        assessment = doc_ref.get().to_dict() or {}
+    questions = _load_questions(assessment)
+
+    job.report('running tests')
+    try:
+        graded = grade_code_questions(questions, assessment.get('answers', {}))
+    except Exception:
+        if job.last_attempt:
+            with metrics.track('firestore', 'update'):
+                doc_ref.update({'gradingStatus': 'failed', 'gradedAt': datetime.utcnow().isoformat()})
+        raise
+
+    # Each MCQ is worth one point; each code question one point split across its tests.
+    # Code questions that could not be executed ('unsupported') are left out of the score.
+    scored = [r for r in graded['results'].values() if r['status'] != 'unsupported']
+    code_points = sum(r['passed'] / r['total'] for r in scored if r['total'])
+    total_mcq = assessment.get('totalMcq', 0)
+    points = total_mcq + len(scored)
+    overall = round((assessment.get('score', 0) + code_points) / points * 100) if points else 0
+
+    job.report('saving')
+    with metrics.track('firestore', 'update'):
+        doc_ref.update({
+            'codeResults': graded['results'],
+            'codeScore': graded['passed'],
+            'codeTotal': graded['total'],
+            'codePercentage': graded['percentage'],
+            'codeUngraded': graded['ungraded'],
+            'overallPercentage': overall,
+            'gradingStatus': 'done',
+            'gradedAt': datetime.utcnow().isoformat(),
+        })
+    return {'codeScore': graded['passed'], 'codeTotal': graded['total'], 'codeUngraded': graded['ungraded'],
+            'overallPercentage': overall}
+
+
+def grading_queue(workers: int = 0):
+    """The shared grading queue, processed by ``workers`` threads of this process."""
+    from services.job_queue import JobQueue
+    return JobQueue(
+        'grading', _grade_assessment_job,
+        workers=workers,
+        max_depth=int(os.getenv('GRADING_QUEUE_MAX_DEPTH', '2000')),
+        max_attempts=int(os.getenv('GRADING_JOB_MAX_ATTEMPTS', '2')),
+    )
+
+
+def _get_grading_queue():
+    global _grading_queue
+    if _grading_queue is None:
+        with _grading_queue_lock:
+            if _grading_queue is None:
+                from services.code_grader import IN_PROCESS
+                _grading_queue = grading_queue(GRADING_WORKERS if IN_PROCESS else 0)
+    return _grading_queue
+
+
+def grader_health() -> dict:
+    """Grading queue depth and live grader threads (any process on this host), for /api/health."""
+    return _get_grading_queue().stats()
+
+
+def _pending_status(assessment: dict) -> str:
+    """'failed' or 'stale' for a grading job that will not (or did not yet) finish, else 'queued'."""
+    job_id = assessment.get('gradingJobId')
+    job = _get_grading_queue().get(job_id) if job_id else None
+    if job is not None and job['status'] == 'failed':
+        return 'failed'
+    try:
+        queued_at = datetime.fromisoformat(assessment.get('gradingQueuedAt') or assessment.get('submittedAt'))
+    except (TypeError, ValueError):
+        return 'queued'
+    if (datetime.utcnow() - queued_at).total_seconds() > GRADING_STALE_SECONDS:
+        return 'stale'
+    return 'queued'
 
 
 @assessment_bp.route('/generate', methods=['POST'])
 @jwt_required()
 def generate_assessment():
-    """Generate 5 MCQ + 2 code questions for a skill. Body: { skill }"""
+    """Sample 5 MCQ + 2 code questions for a skill from the question bank. Body: { skill }"""
     try:
         email = get_jwt_identity()
         data = request.get_json() or {}
         skill = data.get('skill', 'Python').strip()
 
-        try:
-            questions = _generate_questions_with_gemini(skill)
-        except Exception as e:
-            print(f"Gemini generation failed: {e}, using fallback questions")
-            questions = FALLBACK_QUESTIONS
+        skill_key, questions = question_bank.sample(skill)
 
-        # Store assessment in Firestore
-        db = _get_db()
+        # Store the assessment in Firestore — question ids only; bodies stay in the bank
         assessment_id = f"{email}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
-        db.collection('users').document(email).collection('assessments').document(assessment_id).set({
-            'skill': skill,
-            'questions': questions,
-            'createdAt': datetime.utcnow().isoformat(),
-            'terminated': False,
-            'submitted': False,
-        })
+        with metrics.track('firestore', 'set'):
+            _assessment_ref(email, assessment_id).set({
+                'skill': skill,
+                'skillKey': skill_key,
+                'questionIds': [q['id'] for q in questions],
+                'createdAt': datetime.utcnow().isoformat(),
+                'terminated': False,
+                'submitted': False,
+            })
 
         return jsonify({
             'assessmentId': assessment_id,
             'skill': skill,
-            'questions': questions,
+            'questions': [public_view(q) for q in questions],
         }), 200
 
     except Exception as e:
@@ -126,15 +166,14 @@ def submit_assessment():
         if not assessment_id:
             return jsonify({'error': 'assessmentId is required'}), 400
 
-        db = _get_db()
-        doc_ref = db.collection('users').document(email).collection('assessments').document(assessment_id)
-        doc = doc_ref.get()
+        doc_ref = _assessment_ref(email, assessment_id)
+        with metrics.track('firestore', 'get'):
+            doc = doc_ref.get()
 
         if not doc.exists:
             return jsonify({'error': 'Assessment not found'}), 404
 
-        assessment = doc.to_dict()
-        questions = assessment.get('questions', [])
+        questions = _load_questions(doc.to_dict())
 
         # Grade MCQs
         score = 0
@@ -148,16 +187,34 @@ def submit_assessment():
                     score += 1
 
         mcq_percentage = round((score / total_mcq) * 100) if total_mcq else 0
+        has_code = any(q.get('type') == 'code' for q in questions)
 
-        doc_ref.update({
-            'answers': answers,
-            'score': score,
-            'totalMcq': total_mcq,
-            'mcqPercentage': mcq_percentage,
-            'terminated': terminated,
-            'submitted': True,
-            'submittedAt': datetime.utcnow().isoformat(),
-        })
+        # Code answers are run in the grader sandbox by a background job.
+        grading_status = 'queued' if has_code and not terminated else 'done'
+        with metrics.track('firestore', 'update'):
+            doc_ref.update({
+                'answers': answers,
+                'score': score,
+                'totalMcq': total_mcq,
+                'mcqPercentage': mcq_percentage,
+                'overallPercentage': mcq_percentage,
+                'gradingStatus': grading_status,
+                'terminated': terminated,
+                'submitted': True,
+                'submittedAt': datetime.utcnow().isoformat(),
+            })
+
+        job_id = None
+        if grading_status == 'queued':
+            from services.job_queue import QueueFull
+            try:
+                job_id = _get_grading_queue().submit({'assessmentId': assessment_id}, owner=email)
+                grading = {'gradingJobId': job_id, 'gradingQueuedAt': datetime.utcnow().isoformat()}
+            except QueueFull:
+                grading_status = 'queue_full'
+                grading = {'gradingStatus': grading_status}
+            with metrics.track('firestore', 'update'):
+                doc_ref.update(grading)
 
         return jsonify({
             'message': 'Assessment submitted',
@@ -165,7 +222,36 @@ def submit_assessment():
             'totalMcq': total_mcq,
             'mcqPercentage': mcq_percentage,
             'terminated': terminated,
+            'gradingStatus': grading_status,
+            'gradingJobId': job_id,
+            'resultUrl': f'/api/assessment/{assessment_id}/result',
         }), 200
 
     except Exception as e:
         return jsonify({'error': 'Failed to submit assessment', 'details': str(e)}), 500
+
+
+@assessment_bp.route('/<assessment_id>/result', methods=['GET'])
+@jwt_required()
+def get_assessment_result(assessment_id):
+    """
+    Scores of a submitted assessment; code scores appear once gradingStatus is 'done'.
+    A queued job that failed or has waited longer than GRADING_STALE_SECONDS is
+    reported as 'failed' / 'stale', so clients can stop polling.
+    """
+    try:
+        email = get_jwt_identity()
+        with metrics.track('firestore', 'get'):
+            doc = _assessment_ref(email, assessment_id).get(
+                field_paths=['submitted', 'gradingJobId', 'gradingQueuedAt', *RESULT_FIELDS])
+        if not doc.exists or not (doc.to_dict() or {}).get('submitted'):
+            return jsonify({'error': 'Assessment not found'}), 404
+
+        assessment = doc.to_dict()
+        result = {field: assessment.get(field) for field in RESULT_FIELDS}
+        if result['gradingStatus'] == 'queued':
+            result['gradingStatus'] = _pending_status(assessment)
+        result['assessmentId'] = assessment_id
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch assessment result', 'details': str(e)}), 500
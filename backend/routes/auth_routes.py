@@ -1,25 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     create_access_token, create_refresh_token,
-    jwt_required, get_jwt_identity
+    jwt_required, get_jwt_identity, get_jwt, decode_token
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import re
 
-# Firestore client — initialised via firebase_admin in app.py / main entry point.
-# Import it lazily so the module doesn't crash if firebase_admin isn't set up yet.
-def _get_db():
-    try:
-        from firebase_admin import firestore
-        return firestore.client()
-    except Exception as e:
-        raise RuntimeError(
-            "Firestore is not initialised. "
-            "Make sure firebase_admin.initialize_app() has been called "
-            "with valid credentials before using auth routes. "
-            f"Original error: {e}"
-        )
+from models import user_model
+from services.token_revocation import revocation_store
+
+LOGIN_FIELDS = user_model.PUBLIC_FIELDS + ['password_hash']   # field mask for the login read
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -49,6 +40,11 @@ def _user_doc_to_dict(doc_data: dict) -> dict:
         'created_at': doc_data.get('created_at'),
     }
 
+
+def _access_token(email: str, user: dict) -> str:
+    """Access token carrying the public profile as a 'user' claim, so /verify needs no read."""
+    return create_access_token(identity=email, additional_claims={'user': _user_doc_to_dict(user)})
+
 # ─── Routes ────────────────────────────────────────────────────────────────────
 
 @auth_bp.route('/signup', methods=['POST'])
@@ -77,12 +73,8 @@ def signup():
         if len(full_name) < 2:
             return jsonify({'error': 'Full name must be at least 2 characters'}), 400
 
-        db = _get_db()
-        users_ref = db.collection('users')
-
-        # Check duplicate email
-        existing = users_ref.where('email', '==', email).limit(1).get()
-        if len(existing) > 0:
+        # Check duplicate email (the email is the document id)
+        if user_model.user_exists(email):
             return jsonify({'error': 'Email already registered'}), 409
 
         # Create user document
@@ -93,9 +85,9 @@ def signup():
             'password_hash': generate_password_hash(password),
             'created_at': datetime.utcnow().isoformat(),
         }
-        users_ref.document(email).set(user_data)
+        user_model.set_user(email, user_data, merge=False)
 
-        access_token = create_access_token(identity=email)
+        access_token = _access_token(email, user_data)
         refresh_token = create_refresh_token(identity=email)
 
         return jsonify({
@@ -124,17 +116,14 @@ def login():
         email = data['email'].lower().strip()
         password = data['password']
 
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        user_data = user_model.get_user(email, LOGIN_FIELDS)
+        if user_data is None:
             return jsonify({'error': 'Invalid email or password'}), 401
 
-        user_data = doc.to_dict()
         if not check_password_hash(user_data.get('password_hash', ''), password):
             return jsonify({'error': 'Invalid email or password'}), 401
 
-        access_token = create_access_token(identity=email)
+        access_token = _access_token(email, user_data)
         refresh_token = create_refresh_token(identity=email)
 
         return jsonify({
@@ -151,9 +140,24 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout (stateless — client should discard the token)."""
+    """
+    Revoke the access token (and the refresh token, if sent) until they expire.
+    Body (optional): { "refresh_token" }
+    """
     try:
-        # For a production blacklist, add the JTI to a Firestore 'token_blacklist' collection here.
+        claims = get_jwt()
+        email = get_jwt_identity()
+        revocation_store.revoke(claims['jti'], claims['exp'], 'access', email)
+
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                refresh_claims = decode_token(refresh_token)
+            except Exception:
+                refresh_claims = None     # already expired / revoked / malformed
+            if refresh_claims and refresh_claims.get('type') == 'refresh' and refresh_claims.get('sub') == email:
+                revocation_store.revoke(refresh_claims['jti'], refresh_claims['exp'], 'refresh', email)
+
         return jsonify({'message': 'Logout successful'}), 200
     except Exception as e:
         return jsonify({'error': 'Logout failed', 'details': str(e)}), 500
@@ -165,7 +169,11 @@ def refresh():
     """Issue a new access token using a valid refresh token."""
     try:
         current_user = get_jwt_identity()
-        new_access_token = create_access_token(identity=current_user)
+        user_data = user_model.get_public_user(current_user)
+        if user_data is None:
+            return jsonify({'error': 'User not found'}), 401
+
+        new_access_token = _access_token(current_user, user_data)
         return jsonify({'message': 'Token refreshed', 'access_token': new_access_token}), 200
     except Exception as e:
         return jsonify({'error': 'Token refresh failed', 'details': str(e)}), 500
@@ -174,16 +182,19 @@ def refresh():
 @auth_bp.route('/verify', methods=['GET'])
 @jwt_required()
 def verify_token():
-    """Verify the current JWT and return the user's public profile."""
+    """Verify the current JWT and return the user's public profile (from the token's claims)."""
     try:
-        email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
+        claims = get_jwt().get('user')
+        if claims:
+            return jsonify({'message': 'Token is valid', 'user': claims}), 200
 
-        if not doc.exists:
+        # Tokens issued before the profile claim was added
+        email = get_jwt_identity()
+        user_data = user_model.get_public_user(email)
+        if user_data is None:
             return jsonify({'error': 'User not found'}), 404
 
-        return jsonify({'message': 'Token is valid', 'user': _user_doc_to_dict(doc.to_dict())}), 200
+        return jsonify({'message': 'Token is valid', 'user': _user_doc_to_dict(user_data)}), 200
 
     except Exception as e:
         return jsonify({'error': 'Verification failed', 'details': str(e)}), 500
@@ -198,18 +209,14 @@ def change_password():
     """
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc_ref = db.collection('users').document(email)
-        doc = doc_ref.get()
-
-        if not doc.exists:
+        user_data = user_model.get_user(email, ['password_hash'])
+        if user_data is None:
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
         if not data or not all(k in data for k in ['current_password', 'new_password']):
             return jsonify({'error': 'Missing required fields'}), 400
 
-        user_data = doc.to_dict()
         if not check_password_hash(user_data.get('password_hash', ''), data['current_password']):
             return jsonify({'error': 'Current password is incorrect'}), 401
 
@@ -217,7 +224,7 @@ def change_password():
         if not is_valid:
             return jsonify({'error': message}), 400
 
-        doc_ref.update({'password_hash': generate_password_hash(data['new_password'])})
+        user_model.update_user(email, {'password_hash': generate_password_hash(data['new_password'])})
         return jsonify({'message': 'Password changed successfully'}), 200
 
     except Exception as e:
@@ -1,88 +1,152 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import os, json
+import os, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from services import llm_service
+from utils.scoring_utils import get_career_matcher
+from services.skill_vector_builder import canonicalize
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
-
-_DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+from services import analysis_pipeline
+from utils import tracing
 
 career_bp = Blueprint('career', __name__)
 
+# Guidance calls for the top careers run concurrently on a shared, bounded pool.
+GUIDANCE_WORKERS = int(os.getenv('CAREER_GUIDANCE_WORKERS', '6'))
+GUIDANCE_DEADLINE = float(os.getenv('CAREER_GUIDANCE_DEADLINE', '8'))   # seconds, for all calls
 
-def _compute_match(user_skills: list, required_skills: list) -> int:
-    if not required_skills:
-        return 0
-    user_set = {s.lower() for s in user_skills}
-    matched = sum(1 for s in required_skills if s.lower() in user_set)
-    return round((matched / len(required_skills)) * 100)
+_pool = None
+_pool_lock = threading.Lock()
 
 
-def _gemini_career_guidance(career_title, match_pct, user_skills, gaps):
-    key = os.getenv('GEMINI_API_KEY', '')
-    if not key:
-        return f"Strong match for {career_title}. Focus on closing skill gaps to reach {match_pct}%+ readiness."
-    try:
-        import google.generativeai as genai
-        genai.configure(api_key=key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""Career: {career_title} | Match: {match_pct}%
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=GUIDANCE_WORKERS,
+                                           thread_name_prefix='career-guidance')
+    return _pool
+
+
+def _guidance_prompt(career_title, match_pct, user_skills, gaps):
+    return f"""Career: {career_title} | Match: {match_pct}%
 User skills: {', '.join(user_skills[:10])}
 Missing skills: {', '.join(gaps[:5])}
 
 Write 2 sentences of personalized career guidance: why this role suits them and what one thing they should do next."""
-        resp = model.generate_content(prompt)
-        return resp.text.strip()
+
+
+def _no_llm_guidance(career_title, match_pct):
+    return f"Strong match for {career_title}. Focus on closing skill gaps to reach {match_pct}%+ readiness."
+
+
+def _gemini_career_guidance(career_title, match_pct, user_skills, gaps):
+    """(guidance, degraded) — degraded when the Gemini call failed (not when no key is set)."""
+    if not llm_service.is_configured():
+        return _no_llm_guidance(career_title, match_pct), False
+    try:
+        return llm_service.generate_text(_guidance_prompt(career_title, match_pct, user_skills, gaps),
+                                         site='career_guidance'), False
+    except Exception as e:
+        return _fallback_guidance(career_title), True
+
+
+async def _agemini_career_guidance(career_title, match_pct, user_skills, gaps):
+    if not llm_service.is_configured():
+        return _no_llm_guidance(career_title, match_pct), False
+    try:
+        return await llm_service.agenerate_text(_guidance_prompt(career_title, match_pct, user_skills, gaps),
+                                                site='career_guidance'), False
     except Exception as e:
-        return f"You show good alignment with {career_title}. Consider closing key skill gaps to boost your match score."
+        return _fallback_guidance(career_title), True
+
+
+def _fallback_guidance(career_title):
+    return f"You show good alignment with {career_title}. Consider closing key skill gaps to boost your match score."
+
+
+def _guidance_for_all(matches, user_skills):
+    """
+    Fetch guidance for every match concurrently, bounded by one overall deadline.
+    Returns True if any match got fallback guidance.
+    """
+    pool = _get_pool()
+    futures = {
+        tracing.submit(pool, _gemini_career_guidance, m['title'], m['matchPct'], user_skills, m['gaps']): m
+        for m in matches
+    }
+    done, not_done = wait(futures, timeout=GUIDANCE_DEADLINE)
+    for fut in not_done:
+        fut.cancel()
+    degraded = False
+    for fut, m in futures.items():
+        m['guidance'], fell_back = fut.result() if fut in done else (_fallback_guidance(m['title']), True)
+        degraded = degraded or fell_back
+    return degraded
+
+
+async def _aguidance_for_all(matches, user_skills):
+    """_guidance_for_all() on the event loop: the calls are tasks, not pool threads."""
+    tasks = {
+        asyncio.ensure_future(_agemini_career_guidance(m['title'], m['matchPct'], user_skills, m['gaps'])): m
+        for m in matches
+    }
+    if not tasks:
+        return False
+    done, not_done = await asyncio.wait(tasks, timeout=GUIDANCE_DEADLINE)
+    for task in not_done:
+        task.cancel()
+    degraded = False
+    for task, m in tasks.items():
+        m['guidance'], fell_back = task.result() if task in done else (_fallback_guidance(m['title']), True)
+        degraded = degraded or fell_back
+    return degraded
+
+
+def _top_matches(data):
+    skills_raw = data.get('dashboard', {}).get('skills', [])
+    user_skills = canonicalize([s.get('name', '') for s in skills_raw])
+
+    # Score against every career in one vectorised pass, keep the top 3
+    return get_career_matcher().top_k(user_skills, k=3), user_skills
+
+
+def _career_result(top3, degraded):
+    return {
+        'matches': top3,
+        'topCareer': top3[0]['title'] if top3 else 'Full Stack Developer',
+        'createdAt': datetime.utcnow().isoformat(),
+        analysis_pipeline.DEGRADED_FIELD: degraded,
+    }
+
+
+def build_career_match(data, upstream):
+    """Pipeline stage: top 3 careers for dashboard.skills, each with guidance."""
+    top3, user_skills = _top_matches(data)
+
+    # Add Gemini guidance to each
+    degraded = _guidance_for_all(top3, user_skills)
+    return _career_result(top3, degraded)
+
+
+async def abuild_career_match(data, upstream):
+    """Async build_career_match() for the ASGI server."""
+    top3, user_skills = await asyncio.to_thread(_top_matches, data)   # canonicalize may embed
+    degraded = await _aguidance_for_all(top3, user_skills)
+    return _career_result(top3, degraded)
 
 
 @career_bp.route('', methods=['GET'])
 @jwt_required()
 def get_career_match():
-    """Match user skills against career paths and return top 3 with guidance."""
+    """Top 3 career matches with guidance; rebuilt only when skills change (or ?refresh=1)."""
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        result = analysis_pipeline.run(email, 'career_match', refresh=request.args.get('refresh') == '1')
+        if result is None:
             return jsonify({'error': 'User not found'}), 404
-
-        data = doc.to_dict()
-        profile = data.get('profile', {})
-        skills_raw = data.get('dashboard', {}).get('skills', [])
-        user_skills = [s.get('name', '') for s in skills_raw]
-
-        with open(os.path.join(_DATA, 'career_paths.json')) as f:
-            careers = json.load(f)
-
-        matches = []
-        for career in careers:
-            required = career.get('requiredSkills', [])
-            pct = _compute_match(user_skills, required)
-            gaps = [s for s in required if s.lower() not in {u.lower() for u in user_skills}]
-            matches.append({**career, 'matchPct': pct, 'gaps': gaps})
-
-        # Sort by match percentage, return top 3
-        matches.sort(key=lambda x: x['matchPct'], reverse=True)
-        top3 = matches[:3]
-
-        # Add Gemini guidance to each
-        for m in top3:
-            m['guidance'] = _gemini_career_guidance(
-                m['title'], m['matchPct'], user_skills, m['gaps']
-            )
-
-        result = {
-            'matches': top3,
-            'topCareer': top3[0]['title'] if top3 else 'Full Stack Developer',
-            'createdAt': datetime.utcnow().isoformat(),
-        }
-
-        db.collection('users').document(email).set({'career_match': result}, merge=True)
         return jsonify(result), 200
 
     except Exception as e:
@@ -2,13 +2,136 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
+from models import user_model, repo_model
+from utils import tracing
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# ── Bulk GitHub import ────────────────────────────────────────────────────────
+BULK_MAX_REPOS = int(os.getenv('BULK_IMPORT_MAX_REPOS', '30'))
+BULK_WORKERS = int(os.getenv('BULK_IMPORT_WORKERS', '8'))
+BULK_DEADLINE = float(os.getenv('BULK_IMPORT_DEADLINE', '25'))   # seconds, whole batch
+
+_bulk_pool = None
+_bulk_pool_lock = threading.Lock()
+
+
+def _get_bulk_pool() -> ThreadPoolExecutor:
+    global _bulk_pool
+    if _bulk_pool is None:
+        with _bulk_pool_lock:
+            if _bulk_pool is None:
+                _bulk_pool = ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix='repo-import')
+    return _bulk_pool
+
+
+class BulkImportError(Exception):
+    """A bulk import request that cannot proceed; carries the response body and status."""
+
+    def __init__(self, body: dict, status_code: int):
+        super().__init__(body['error'])
+        self.body = body
+        self.status_code = status_code
+
+
+def parse_bulk_request(data: dict) -> tuple:
+    """(username, urls) from a bulk import body; exactly one of them is set."""
+    username = (data.get('username') or '').strip()
+    urls = data.get('urls') or []
+    if not username and (not isinstance(urls, list) or not urls):
+        raise BulkImportError({'error': 'Provide a GitHub username or a list of repo urls'}, 400)
+    return username, urls
+
+
+def user_repos_error(e: Exception) -> Exception:
+    """The BulkImportError for a failed user-repo listing, or ``e`` itself if unexpected."""
+    from services.repo_scraper import GitHubError, RateLimited
+    if isinstance(e, ValueError):
+        return BulkImportError({'error': str(e)}, 400)
+    if isinstance(e, RateLimited):
+        return BulkImportError({'error': str(e), 'retryAfter': max(0, int(e.reset_at - time.time()))}, 429)
+    if isinstance(e, GitHubError) and e.status_code == 404:
+        return BulkImportError({'error': 'GitHub user not found'}, 404)
+    if isinstance(e, GitHubError):
+        return BulkImportError({'error': 'GitHub API error', 'details': str(e)}, 502)
+    return e
+
+
+def normalize_repo_urls(urls: list) -> list:
+    """GitHub URLs only, without trailing slashes or duplicates, capped at BULK_MAX_REPOS."""
+    urls = [u.strip().rstrip('/') for u in urls if isinstance(u, str) and 'github.com' in u]
+    urls = list(dict.fromkeys(urls))[:BULK_MAX_REPOS]
+    if not urls:
+        raise BulkImportError({'error': 'No valid GitHub repo URLs found'}, 400)
+    return urls
+
+
+def bulk_results(outcomes: dict) -> tuple:
+    """
+    Per-repo statuses from {url: repo dict | Exception | None (timed out)}.
+
+    Returns:
+        (scraped repos, response body)
+    """
+    results, scraped = [], []
+    for url, outcome in outcomes.items():
+        if outcome is None:
+            results.append({'url': url, 'status': 'timeout'})
+        elif isinstance(outcome, BaseException):
+            results.append({'url': url, 'status': 'failed', 'error': str(outcome)})
+        else:
+            scraped.append(outcome)
+            results.append({'url': url, 'status': 'ok', 'repo': outcome})
+    return scraped, {
+        'message': f'Imported {len(scraped)} of {len(outcomes)} repos',
+        'imported': len(scraped),
+        'failed': sum(1 for r in results if r['status'] != 'ok'),
+        'results': results,
+    }
+
+# ── Background resume parsing ─────────────────────────────────────────────────
+_resume_queue = None
+_resume_queue_lock = threading.Lock()
+
+
+def _process_resume_job(job):
+    """Job handler: parse the uploaded PDF and write the result to dashboard.resume."""
+    from services.resume_parser import parse_resume
+    file_name = job.payload.get('fileName', 'resume.pdf')
+    # Gemini errors are retried; the last attempt settles for keyword extraction.
+    parsed = parse_resume(job.data, file_name, on_progress=job.report, fallback=job.last_attempt)
+
+    job.report('saving')
+    user_model.set_user(job.owner, {
+        'dashboard': {
+            'resume': {
+                'fileName': file_name,
+                'parsed': parsed,
+                'uploadedAt': job.payload.get('uploadedAt') or datetime.utcnow().isoformat(),
+            }
+        }
+    })
+    return {'parsed': parsed}
+
+
+def _get_resume_queue():
+    global _resume_queue
+    if _resume_queue is None:
+        with _resume_queue_lock:
+            if _resume_queue is None:
+                from services.job_queue import JobQueue
+                _resume_queue = JobQueue(
+                    'resume', _process_resume_job,
+                    workers=int(os.getenv('RESUME_QUEUE_WORKERS', '2')),
+                    max_depth=int(os.getenv('RESUME_QUEUE_MAX_DEPTH', '50')),
+                    max_attempts=int(os.getenv('RESUME_JOB_MAX_ATTEMPTS', '3')),
+                )
+    return _resume_queue
+
 
 @dashboard_bp.route('/skills', methods=['POST'])
 @jwt_required()
@@ -22,13 +145,12 @@ def save_skills():
         if not isinstance(skills, list):
             return jsonify({'error': 'skills must be a list'}), 400
 
-        db = _get_db()
-        db.collection('users').document(email).set({
+        user_model.set_user(email, {
             'dashboard': {
                 'skills': skills,
                 'skillsUpdatedAt': datetime.utcnow().isoformat(),
             }
-        }, merge=True)
+        })
 
         return jsonify({'message': 'Skills saved', 'count': len(skills)}), 200
     except Exception as e:
@@ -50,25 +172,83 @@ def scrape_repo():
         from services.repo_scraper import scrape_github_repo
         result = scrape_github_repo(url)
 
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-        existing = doc.to_dict() if doc.exists else {}
-        repos = existing.get('dashboard', {}).get('repos', [])
-        repos.insert(0, result)
-
-        db.collection('users').document(email).set({
-            'dashboard': {'repos': repos}
-        }, merge=True)
+        repo_model.upsert_repos(email, [result])
 
         return jsonify({'message': 'Repo scraped', 'repo': result}), 200
     except Exception as e:
         return jsonify({'error': 'Failed to scrape repo', 'details': str(e)}), 500
 
 
+@dashboard_bp.route('/repos/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_repos():
+    """
+    Scrape many GitHub repos at once and save them in a single batch.
+    Body: { username } or { urls: [..] }
+    Returns per-repo status: ok | failed | timeout.
+    """
+    try:
+        email = get_jwt_identity()
+        started = time.monotonic()
+        username, urls = parse_bulk_request(request.get_json() or {})
+
+        from services.repo_scraper import scrape_github_repo, list_user_repos
+        if username:
+            try:
+                urls = list_user_repos(username, limit=BULK_MAX_REPOS)
+            except Exception as e:
+                raise user_repos_error(e)
+        urls = normalize_repo_urls(urls)
+
+        pool = _get_bulk_pool()
+        futures = {tracing.submit(pool, scrape_github_repo, u, True): u for u in urls}
+        remaining = max(0.0, BULK_DEADLINE - (time.monotonic() - started))
+        done, not_done = wait(futures, timeout=remaining)
+        for fut in not_done:
+            fut.cancel()
+
+        scraped, body = bulk_results({
+            url: (fut.exception() or fut.result()) if fut in done else None
+            for fut, url in futures.items()
+        })
+        repo_model.upsert_repos(email, scraped)
+        return jsonify(body), 200
+    except BulkImportError as e:
+        return jsonify(e.body), e.status_code
+    except Exception as e:
+        return jsonify({'error': 'Bulk import failed', 'details': str(e)}), 500
+
+
+@dashboard_bp.route('/repos', methods=['GET'])
+@jwt_required()
+def list_repos():
+    """Saved repos, newest push first. Query: ?limit=20&cursor=<nextCursor from previous page>"""
+    try:
+        email = get_jwt_identity()
+        cursor = request.args.get('cursor')
+        try:
+            limit = int(request.args.get('limit', repo_model.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+
+        if not cursor:
+            repo_model.migrate_legacy(email)
+        try:
+            repos, next_cursor = repo_model.list_repos(email, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'repos': repos, 'nextCursor': next_cursor}), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch repos', 'details': str(e)}), 500
+
+
 @dashboard_bp.route('/resume', methods=['POST'])
 @jwt_required()
 def upload_resume():
-    """Parse an uploaded PDF resume. Multipart form with 'resume' field."""
+    """
+    Queue an uploaded PDF resume for background parsing. Multipart form with 'resume' field.
+    Returns 202 with a jobId; poll GET /resume/jobs/<jobId> for progress and the parsed result.
+    """
     try:
         email = get_jwt_identity()
 
@@ -80,38 +260,58 @@ def upload_resume():
             return jsonify({'error': 'Only PDF files are accepted'}), 400
 
         pdf_bytes = file.read()
-        from services.resume_parser import parse_resume
-        parsed = parse_resume(pdf_bytes, file.filename)
-
-        db = _get_db()
-        db.collection('users').document(email).set({
-            'dashboard': {
-                'resume': {
-                    'fileName': file.filename,
-                    'parsed': parsed,
-                    'uploadedAt': datetime.utcnow().isoformat(),
-                }
-            }
-        }, merge=True)
+        from services.job_queue import QueueFull
+        try:
+            job_id = _get_resume_queue().submit(
+                {'fileName': file.filename, 'uploadedAt': datetime.utcnow().isoformat()},
+                data=pdf_bytes, owner=email,
+            )
+        except QueueFull:
+            return jsonify({'error': 'Resume parser is busy, please try again shortly'}), 503
 
-        return jsonify({'message': 'Resume parsed', 'parsed': parsed}), 200
+        return jsonify({
+            'message': 'Resume queued for parsing',
+            'jobId': job_id,
+            'status': 'queued',
+            'statusUrl': f'/api/dashboard/resume/jobs/{job_id}',
+        }), 202
     except Exception as e:
         return jsonify({'error': 'Failed to parse resume', 'details': str(e)}), 500
 
 
+@dashboard_bp.route('/resume/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_resume_job(job_id):
+    """Poll a resume parsing job: { jobId, status, progress, attempts, parsed?, error? }"""
+    try:
+        email = get_jwt_identity()
+        job = _get_resume_queue().get(job_id)
+        if job is None or job.pop('owner') != email:
+            return jsonify({'error': 'Job not found'}), 404
+
+        result = job.pop('result') or {}
+        if job['status'] == 'done':
+            job['parsed'] = result.get('parsed')
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch job status', 'details': str(e)}), 500
+
+
 @dashboard_bp.route('', methods=['GET'])
 @jwt_required()
 def get_dashboard():
-    """Get the full dashboard data for the authenticated user."""
+    """Get the dashboard data for the authenticated user, with the first page of repos."""
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        fields = [*user_model.DASHBOARD_FIELDS, 'dashboard.repos']     # legacy repos, for migrate_legacy
+        data = user_model.get_user(email, fields)
+        if data is None:
             return jsonify({'dashboard': {}}), 200
+        if repo_model.migrate_legacy(email, data):
+            data = user_model.get_user(email, user_model.DASHBOARD_FIELDS)
 
-        data = doc.to_dict()
-        return jsonify({'dashboard': data.get('dashboard', {})}), 200
+        dashboard = data.get('dashboard', {})
+        dashboard['repos'], dashboard['reposNextCursor'] = repo_model.list_repos(email)
+        return jsonify({'dashboard': dashboard}), 200
     except Exception as e:
         return jsonify({'error': 'Failed to fetch dashboard', 'details': str(e)}), 500
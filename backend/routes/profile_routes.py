@@ -2,9 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
+from models import user_model
 
 profile_bp = Blueprint('profile', __name__)
 
@@ -30,8 +28,7 @@ def setup_profile():
             'updatedAt': datetime.utcnow().isoformat(),
         }
 
-        db = _get_db()
-        db.collection('users').document(email).set({'profile': profile}, merge=True)
+        user_model.set_user(email, {'profile': profile})
 
         return jsonify({'message': 'Profile saved', 'profile': profile}), 200
 
@@ -45,13 +42,10 @@ def get_profile():
     """Fetch the authenticated user's full profile."""
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        data = user_model.get_user(email, ['full_name', 'profile', *user_model.DASHBOARD_FIELDS])
+        if data is None:
             return jsonify({'error': 'User not found'}), 404
 
-        data = doc.to_dict()
         return jsonify({
             'email': email,
             'full_name': data.get('full_name', ''),
@@ -0,0 +1,79 @@
+from flask import Blueprint, Response, current_app, g, request, jsonify
+import hmac
+import random
+
+from utils.profiler import profiler
+
+profiler_bp = Blueprint('profiler', __name__)
+
+TOKEN_HEADER = 'X-Profile-Token'
+
+
+def _is_admin() -> bool:
+    token = current_app.config['PROFILER_TOKEN']
+    sent = request.headers.get(TOKEN_HEADER, '')
+    return bool(token) and hmac.compare_digest(sent.encode('utf-8'), token.encode('utf-8'))
+
+
+def _route() -> str:
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    return f'{request.method} {rule}'
+
+
+# ─── Request hooks (every route of the app) ────────────────────────────────────
+
+@profiler_bp.before_app_request
+def start_profile():
+    if request.blueprint == profiler_bp.name:
+        return      # reading the reports is not itself profiled
+    rate = current_app.config['PROFILER_SAMPLE_RATE']
+    if (TOKEN_HEADER in request.headers and _is_admin()) or (rate and random.random() < rate):
+        g.profile_session = profiler.begin(_route())
+
+
+@profiler_bp.teardown_app_request
+def stop_profile(exc):
+    session = g.pop('profile_session', None)
+    if session is not None:
+        profiler.end(session)
+
+
+# ─── Routes (admin token required) ─────────────────────────────────────────────
+
+@profiler_bp.before_request
+def require_admin():
+    if not _is_admin():
+        return jsonify({'error': 'Not found', 'message': 'Resource not found'}), 404
+
+
+@profiler_bp.route('', methods=['GET'])
+def get_summary():
+    """Profiled routes with request counts, average latency and the functions with the most own time."""
+    return jsonify({'routes': profiler.summary()}), 200
+
+
+@profiler_bp.route('/pstats', methods=['GET'])
+def download_pstats():
+    """Merged cProfile stats (.pstats). Optional ?route=GET /api/roadmap limits them to one route."""
+    data = profiler.pstats_bytes(request.args.get('route'))
+    if data is None:
+        return jsonify({'error': 'No profiles recorded'}), 404
+    return Response(data, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': 'attachment; filename=skillbridge.pstats'})
+
+
+@profiler_bp.route('/flamegraph', methods=['GET'])
+def download_flamegraph():
+    """Collapsed stacks for flamegraph.pl / speedscope. Optional ?route= as for /pstats."""
+    data = profiler.collapsed_stacks(request.args.get('route'))
+    if data is None:
+        return jsonify({'error': 'No profiles recorded'}), 404
+    return Response(data, mimetype='text/plain',
+                    headers={'Content-Disposition': 'attachment; filename=skillbridge.folded'})
+
+
+@profiler_bp.route('', methods=['DELETE'])
+def reset_profiles():
+    """Discard everything recorded so far."""
+    profiler.reset()
+    return jsonify({'message': 'Profiles cleared'}), 200
@@ -1,27 +1,41 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import os, json
+import json
+import asyncio
+from services import llm_service
+from services.rag_retriever import get_retriever, format_resource
+from utils.json_stream import JSONArrayStream
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
+from services import analysis_pipeline
 
 roadmap_bp = Blueprint('roadmap', __name__)
 
 
-def _gemini_roadmap(career, user_skills, gaps, name):
-    key = os.getenv('GEMINI_API_KEY', '')
-    if not key:
-        return _fallback_roadmap(career, gaps)
+def _gap_resources(gaps, k=2):
+    """
+    Retrieve vetted learning resources per gap; empty on any retrieval error.
+    Gap dicts carry their severity, which picks the resource level.
+    """
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""Create a personalised 12-week learning roadmap for {name or 'a student'}.
+        return get_retriever().for_gaps(gaps, k=k)
+    except Exception as e:
+        print(f"Resource retrieval failed: {e}")
+        return {}
+
+
+def _roadmap_prompt(career, user_skills, gaps, name):
+    resources = _gap_resources(gaps[:6])
+    resource_lines = '\n'.join(
+        f"- {skill}: " + '; '.join(format_resource(r) for r in items)
+        for skill, items in resources.items() if items
+    )
+    return f"""Create a personalised 12-week learning roadmap for {name or 'a student'}.
 Career Goal: {career}
 Current Skills: {', '.join(user_skills[:12])}
-Top Skill Gaps: {', '.join(gaps[:6])}
+Top Skill Gaps: {', '.join(g['skill'] for g in gaps[:6])}
+Recommended resources (use these in "resources" where they fit):
+{resource_lines or '- none'}
 
 Return ONLY valid JSON — an array of 12 week objects:
 [
@@ -36,66 +50,219 @@ Return ONLY valid JSON — an array of 12 week objects:
   ...12 items total
 ]
 JSON only, no markdown, no extra text."""
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        if text.startswith('```'):
-            text = text.split('```')[1]
-            if text.startswith('json'): text = text[4:]
-        weeks = json.loads(text.strip())
-        return weeks
+
+
+def _gemini_roadmap(career, user_skills, gaps, name):
+    """(weeks, degraded) — degraded when the Gemini call failed and the fallback roadmap was used."""
+    if not llm_service.is_configured():
+        return _fallback_roadmap(career, gaps), False
+    try:
+        weeks = llm_service.generate_json(_roadmap_prompt(career, user_skills, gaps, name), site='roadmap')
+        return weeks, False
+    except Exception as e:
+        return _fallback_roadmap(career, gaps), True
+
+
+async def _agemini_roadmap(career, user_skills, gaps, name):
+    # Prompt and fallback both query the resource retriever, which blocks
+    if not llm_service.is_configured():
+        return await asyncio.to_thread(_fallback_roadmap, career, gaps), False
+    try:
+        prompt = await asyncio.to_thread(_roadmap_prompt, career, user_skills, gaps, name)
+        return await llm_service.agenerate_json(prompt, site='roadmap'), False
     except Exception as e:
-        return _fallback_roadmap(career, gaps)
+        return await asyncio.to_thread(_fallback_roadmap, career, gaps), True
+
+
+def _stream_weeks(career, user_skills, gaps, name):
+    """
+    Yield (week, degraded) one by one as Gemini streams the weeks. If the stream
+    fails (or no key is set) the remaining weeks come from the fallback roadmap;
+    they are degraded only after a failure.
+    """
+    sent = 0
+    configured = llm_service.is_configured()
+    if configured:
+        parser = JSONArrayStream()
+        try:
+            for chunk in llm_service.stream_text(_roadmap_prompt(career, user_skills, gaps, name),
+                                                     site='roadmap_stream'):
+                for week in parser.feed(chunk):
+                    if isinstance(week, dict):
+                        sent += 1
+                        yield week, False
+            if sent:
+                return
+        except Exception as e:
+            print(f"Roadmap streaming failed after {sent} weeks: {e}")
+    for week in _fallback_roadmap(career, gaps)[sent:]:
+        yield week, configured
+
+
+async def _astream_weeks(career, user_skills, gaps, name):
+    """Async-iterator counterpart of _stream_weeks()."""
+    sent = 0
+    configured = llm_service.is_configured()
+    if configured:
+        parser = JSONArrayStream()
+        try:
+            prompt = await asyncio.to_thread(_roadmap_prompt, career, user_skills, gaps, name)
+            async for chunk in llm_service.astream_text(prompt, site='roadmap_stream'):
+                for week in parser.feed(chunk):
+                    if isinstance(week, dict):
+                        sent += 1
+                        yield week, False
+            if sent:
+                return
+        except Exception as e:
+            print(f"Roadmap streaming failed after {sent} weeks: {e}")
+    for week in (await asyncio.to_thread(_fallback_roadmap, career, gaps))[sent:]:
+        yield week, configured
 
 
 def _fallback_roadmap(career, gaps):
     themes = ['Foundation', 'Core Skills', 'Deep Dive', 'Project Building',
               'Advanced Topics', 'Real Projects', 'System Design', 'Portfolio',
               'Interview Prep', 'Mock Interviews', 'Final Projects', 'Launch Ready']
-    focal_skills = gaps[:2] if gaps else ['Core Skills', 'Problem Solving']
+    focal_gaps = gaps[:2]
+    focal_skills = [g['skill'] for g in focal_gaps] or ['Core Skills', 'Problem Solving']
+    pool = list(dict.fromkeys(
+        format_resource(r) for items in _gap_resources(focal_gaps, k=3).values() for r in items
+    ))
     return [
         {
             'week': i + 1,
             'theme': themes[i],
             'skillsFocus': focal_skills,
             'tasks': [f'Complete {themes[i]} module on Udemy/Coursera', f'Build a {themes[i].lower()} project'],
-            'resources': ['Udemy', 'LeetCode', 'GitHub'],
+            'resources': _rotate(pool, i, 3) or ['Udemy', 'LeetCode', 'GitHub'],
             'milestone': f'Complete {themes[i]} phase'
         }
         for i in range(12)
     ]
 
 
+def _rotate(items, week, n):
+    """n items starting at a week-dependent offset, so consecutive weeks vary."""
+    if not items:
+        return []
+    start = (week * n) % len(items)
+    return [items[(start + j) % len(items)] for j in range(min(n, len(items)))]
+
+
+def _roadmap_inputs(data, upstream):
+    """(career, user_skills, gaps, name) for the roadmap prompt; gaps are {skill, severity} dicts."""
+    profile = data.get('profile', {})
+    career = upstream.get('career_match', {}).get('topCareer') or profile.get('careerInterest', 'Full Stack Developer')
+    skills_raw = data.get('dashboard', {}).get('skills', [])
+    user_skills = [s.get('name', '') for s in skills_raw]
+    gaps = [{'skill': g['skill'], 'severity': g.get('severity')}
+            for g in upstream.get('gap_analysis', {}).get('gaps', [])]
+    return career, user_skills, gaps, data.get('full_name', '')
+
+
+def _roadmap_result(career, weeks, degraded):
+    return {
+        'career': career,
+        'weeks': weeks,
+        'totalWeeks': len(weeks),
+        'createdAt': datetime.utcnow().isoformat(),
+        analysis_pipeline.DEGRADED_FIELD: degraded,
+    }
+
+
+def build_roadmap(data, upstream):
+    """Pipeline stage: 12-week roadmap towards the top career match, focused on the gaps."""
+    career, user_skills, gaps, name = _roadmap_inputs(data, upstream)
+    return _roadmap_result(career, *_gemini_roadmap(career, user_skills, gaps, name))
+
+
+async def abuild_roadmap(data, upstream):
+    """Async build_roadmap() for the ASGI server."""
+    career, user_skills, gaps, name = _roadmap_inputs(data, upstream)
+    return _roadmap_result(career, *await _agemini_roadmap(career, user_skills, gaps, name))
+
+
 @roadmap_bp.route('', methods=['GET'])
 @jwt_required()
 def get_roadmap():
-    """Generate a 12-week personalised roadmap from all user data."""
+    """12-week personalised roadmap; rebuilt only when its inputs change (or ?refresh=1)."""
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        result = analysis_pipeline.run(email, 'roadmap', refresh=request.args.get('refresh') == '1')
+        if result is None:
             return jsonify({'error': 'User not found'}), 404
+        return jsonify(result), 200
 
-        data = doc.to_dict()
-        profile = data.get('profile', {})
-        career = data.get('career_match', {}).get('topCareer') or profile.get('careerInterest', 'Full Stack Developer')
-        skills_raw = data.get('dashboard', {}).get('skills', [])
-        user_skills = [s.get('name', '') for s in skills_raw]
-        gaps = [g['skill'] for g in data.get('gap_analysis', {}).get('gaps', [])]
-        name = data.get('full_name', '')
-
-        weeks = _gemini_roadmap(career, user_skills, gaps, name)
-
-        result = {
-            'career': career,
-            'weeks': weeks,
-            'totalWeeks': len(weeks),
-            'createdAt': datetime.utcnow().isoformat(),
-        }
+    except Exception as e:
+        return jsonify({'error': 'Roadmap generation failed', 'details': str(e)}), 500
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stored_events(stored):
+    yield _sse('meta', {'career': stored.get('career'), 'cached': True})
+    for week in stored.get('weeks', []):
+        yield _sse('week', week)
+    yield _sse('done', {k: stored.get(k) for k in ('career', 'totalWeeks', 'createdAt')})
 
-        db.collection('users').document(email).set({'roadmap': result}, merge=True)
-        return jsonify(result), 200
 
+async def aroadmap_events(email, stage_plan):
+    """The /stream event sequence for the ASGI server, streaming weeks without holding a thread."""
+    if stage_plan.result is not None:
+        for event in _stored_events(stage_plan.result):
+            yield event
+        return
+
+    career, user_skills, gaps, name = _roadmap_inputs(stage_plan.data, stage_plan.upstream)
+    yield _sse('meta', {'career': career, 'cached': False})
+    try:
+        weeks, degraded = [], False
+        async for week, week_degraded in _astream_weeks(career, user_skills, gaps, name):
+            weeks.append(week)
+            degraded = degraded or week_degraded
+            yield _sse('week', week)
+        result = await analysis_pipeline.asave(email, stage_plan, _roadmap_result(career, weeks, degraded))
+        yield _sse('done', {k: result[k] for k in ('career', 'totalWeeks', 'createdAt')})
+    except Exception as e:
+        yield _sse('error', {'error': 'Roadmap generation failed', 'details': str(e)})
+
+
+@roadmap_bp.route('/stream', methods=['GET'])
+@jwt_required()
+def stream_roadmap():
+    """
+    Roadmap as Server-Sent Events: `meta` {career, cached}, one `week` event per week
+    as soon as it has been generated, then `done` {career, totalWeeks, createdAt}
+    (or `error`). The assembled roadmap is persisted before `done`.
+    """
+    try:
+        email = get_jwt_identity()
+        stage_plan = analysis_pipeline.plan(email, 'roadmap', refresh=request.args.get('refresh') == '1')
+        if stage_plan is None:
+            return jsonify({'error': 'User not found'}), 404
     except Exception as e:
         return jsonify({'error': 'Roadmap generation failed', 'details': str(e)}), 500
+
+    def events():
+        if stage_plan.result is not None:
+            yield from _stored_events(stage_plan.result)
+            return
+
+        career, user_skills, gaps, name = _roadmap_inputs(stage_plan.data, stage_plan.upstream)
+        yield _sse('meta', {'career': career, 'cached': False})
+        try:
+            weeks, degraded = [], False
+            for week, week_degraded in _stream_weeks(career, user_skills, gaps, name):
+                weeks.append(week)
+                degraded = degraded or week_degraded
+                yield _sse('week', week)
+            result = analysis_pipeline.save(email, stage_plan, _roadmap_result(career, weeks, degraded))
+            yield _sse('done', {k: result[k] for k in ('career', 'totalWeeks', 'createdAt')})
+        except Exception as e:
+            yield _sse('error', {'error': 'Roadmap generation failed', 'details': str(e)})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
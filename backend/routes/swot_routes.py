@@ -1,32 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-import os, json
+from services import llm_service
+from services.data_registry import registry
 
-def _get_db():
-    from firebase_admin import firestore
-    return firestore.client()
-
-_DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+from services import analysis_pipeline
 
 swot_bp = Blueprint('swot', __name__)
 
 
-def _gemini_swot(profile, skill_names, gaps, strengths, career):
-    key = os.getenv('GEMINI_API_KEY', '')
-    if not key:
-        return {
-            'strengths': ['Strong technical foundation', 'Motivated learner'],
-            'weaknesses': ['Skill gaps in key areas', 'Limited industry experience'],
-            'opportunities': ['Growing tech industry', 'Online learning resources'],
-            'threats': ['Competitive job market', 'Rapid tech change'],
-            'llmAnalysis': 'Enable GEMINI_API_KEY for detailed AI SWOT analysis.'
-        }
-    try:
-        import google.generativeai as genai
-        genai.configure(api_key=key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""Generate a concise SWOT analysis for a student with this profile:
+def _swot_prompt(profile, skill_names, gaps, strengths, career):
+    return f"""Generate a concise SWOT analysis for a student with this profile:
 Career Goal: {career}
 Skills: {', '.join(skill_names[:15])}
 Skill Strengths: {', '.join([s['skill'] for s in strengths[:5]])}
@@ -43,48 +27,85 @@ Return ONLY valid JSON:
   "llmAnalysis": "2-3 sentence overall assessment"
 }}
 JSON only, no markdown."""
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        if text.startswith('```'):
-            text = text.split('```')[1]
-            if text.startswith('json'): text = text[4:]
-        return json.loads(text.strip())
+
+
+def _no_llm_swot(career):
+    return {
+        'strengths': ['Strong technical foundation', 'Motivated learner'],
+        'weaknesses': ['Skill gaps in key areas', 'Limited industry experience'],
+        'opportunities': registry.swot_opportunities(career)[:4] or ['Growing tech industry', 'Online learning resources'],
+        'threats': registry.swot_threats(career)[:4] or ['Competitive job market', 'Rapid tech change'],
+        'llmAnalysis': 'Enable GEMINI_API_KEY for detailed AI SWOT analysis.',
+    }
+
+
+def _fallback_swot(gaps, career, e):
+    return {
+        'strengths': ['Technical skills in progress', 'Academic background'],
+        'weaknesses': [f'Gaps in {gaps[0] if gaps else "core skills"}', 'Needs more projects'],
+        'opportunities': registry.swot_opportunities(career)[:4] or ['AI/ML industry growth', 'Remote work accessible'],
+        'threats': registry.swot_threats(career)[:4] or ['Competitive market', 'Rapid technology shifts'],
+        'llmAnalysis': f'SWOT generated with fallback data. AI error: {e}',
+        analysis_pipeline.DEGRADED_FIELD: True,
+    }
+
+
+def _gemini_swot(profile, skill_names, gaps, strengths, career):
+    if not llm_service.is_configured():
+        return _no_llm_swot(career)
+    try:
+        return llm_service.generate_json(_swot_prompt(profile, skill_names, gaps, strengths, career),
+                                         site='swot')
     except Exception as e:
-        return {
-            'strengths': ['Technical skills in progress', 'Academic background'],
-            'weaknesses': [f'Gaps in {gaps[0] if gaps else "core skills"}', 'Needs more projects'],
-            'opportunities': ['AI/ML industry growth', 'Remote work accessible'],
-            'threats': ['Competitive market', 'Rapid technology shifts'],
-            'llmAnalysis': f'SWOT generated with fallback data. AI error: {e}'
-        }
+        return _fallback_swot(gaps, career, e)
+
+
+async def _agemini_swot(profile, skill_names, gaps, strengths, career):
+    if not llm_service.is_configured():
+        return _no_llm_swot(career)
+    try:
+        return await llm_service.agenerate_json(_swot_prompt(profile, skill_names, gaps, strengths, career),
+                                                site='swot')
+    except Exception as e:
+        return _fallback_swot(gaps, career, e)
+
+
+def _swot_inputs(data, upstream):
+    """(profile, skill_names, gaps, strengths, career) for the SWOT prompt."""
+    profile = data.get('profile', {})
+    career = profile.get('careerInterest', 'Full Stack Developer')
+    skills_raw = data.get('dashboard', {}).get('skills', [])
+    skill_names = [s.get('name', '') for s in skills_raw]
+    gap_data = upstream.get('gap_analysis', {})
+    gaps = [g['skill'] for g in gap_data.get('gaps', [])]
+    strengths = gap_data.get('strengths', [])
+    return profile, skill_names, gaps, strengths, career
+
+
+def build_swot(data, upstream):
+    """Pipeline stage: SWOT from the profile, dashboard.skills and the gap analysis."""
+    swot = _gemini_swot(*_swot_inputs(data, upstream))
+    swot['createdAt'] = datetime.utcnow().isoformat()
+    return swot
+
+
+async def abuild_swot(data, upstream):
+    """Async build_swot() for the ASGI server."""
+    swot = await _agemini_swot(*_swot_inputs(data, upstream))
+    swot['createdAt'] = datetime.utcnow().isoformat()
+    return swot
 
 
 @swot_bp.route('', methods=['GET'])
 @jwt_required()
 def get_swot():
-    """Generate SWOT analysis from all user data."""
+    """SWOT analysis; rebuilt only when the profile, skills or gap analysis change (or ?refresh=1)."""
     try:
         email = get_jwt_identity()
-        db = _get_db()
-        doc = db.collection('users').document(email).get()
-
-        if not doc.exists:
+        result = analysis_pipeline.run(email, 'swot', refresh=request.args.get('refresh') == '1')
+        if result is None:
             return jsonify({'error': 'User not found'}), 404
-
-        data = doc.to_dict()
-        profile = data.get('profile', {})
-        career = profile.get('careerInterest', 'Full Stack Developer')
-        skills_raw = data.get('dashboard', {}).get('skills', [])
-        skill_names = [s.get('name', '') for s in skills_raw]
-        gap_data = data.get('gap_analysis', {})
-        gaps = [g['skill'] for g in gap_data.get('gaps', [])]
-        strengths = gap_data.get('strengths', [])
-
-        swot = _gemini_swot(profile, skill_names, gaps, strengths, career)
-        swot['createdAt'] = datetime.utcnow().isoformat()
-
-        db.collection('users').document(email).set({'swot': swot}, merge=True)
-        return jsonify(swot), 200
+        return jsonify(result), 200
 
     except Exception as e:
         return jsonify({'error': 'SWOT generation failed', 'details': str(e)}), 500
@@ -0,0 +1,293 @@
+"""
+Incremental analysis pipeline — gap analysis, career match, SWOT and roadmap as a
+small DAG of stages stored on the user document.
+
+Each stored result carries an ``inputFingerprint``: a hash of the user fields the
+stage reads, the digests of the data files it reads (benchmarks, career paths,
+learning resources) and the fingerprints of its upstream stages. A request for a stage
+reads the user document once (projected to the fields of that stage and
+everything upstream of it), walks the stages in dependency order and only
+rebuilds those whose fingerprint no longer matches. Changing skills (or editing
+a data file) therefore makes every downstream stage stale, and they are recomputed lazily the next
+time they are requested; an unchanged page reload costs a single read.
+
+A builder that had to fall back after a Gemini error or a missed deadline sets
+``degraded: True`` on its result. Degraded results are stored and returned, and
+count as fresh only for DEGRADED_RETRY_SECONDS after ``degradedAt``; the first
+request after that tries again. Running without a Gemini key is not a failure:
+those fallback results are not degraded, and whether a key is configured is part
+of the fingerprint, so they are rebuilt once when one is added.
+
+    SWOT    ← gap_analysis
+    roadmap ← gap_analysis, career_match
+
+Stage builders live next to their prompts in the route modules and are imported
+on first use. Each stage may also name an async builder (awaiting Gemini instead
+of blocking on it); the ASGI server (asgi.py) drives the DAG through aplan()/arun(),
+which run the Firestore calls in worker threads.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import importlib
+
+from models import user_model
+from services import llm_service
+from services.data_registry import registry
+
+FINGERPRINT_FIELD = 'inputFingerprint'
+DEGRADED_FIELD = 'degraded'
+DEGRADED_AT_FIELD = 'degradedAt'
+DEGRADED_RETRY_SECONDS = float(os.getenv('ANALYSIS_DEGRADED_RETRY_SECONDS', '300'))
+
+
+class Stage:
+    """
+    Args:
+        name:    stage name, also the user-document field its result is stored in
+        builder: 'module:function' called as function(data, upstream) → result dict
+        fields:  user-document field paths the builder reads
+        depends: upstream stage names whose results the builder receives
+        data:    data_registry file keys the builder reads (directly or via skill canonicalisation)
+        version: bump when the builder's output changes for the same inputs
+        async_builder: optional 'module:coroutine' with the same contract, used by abuild()
+    """
+
+    def __init__(self, name: str, builder: str, fields: list, depends=(), data=(), version: int = 1,
+                 async_builder: str = None):
+        self.name = name
+        self.builder = builder
+        self.async_builder = async_builder
+        self.fields = list(fields)
+        self.depends = list(depends)
+        self.data = list(data)
+        self.version = version
+        self._fn = None
+        self._afn = None
+
+    @staticmethod
+    def _resolve(target: str):
+        module, func = target.split(':')
+        return getattr(importlib.import_module(module), func)
+
+    def build(self, data: dict, upstream: dict) -> dict:
+        if self._fn is None:
+            self._fn = self._resolve(self.builder)
+        return self._fn(data, upstream)
+
+    async def abuild(self, data: dict, upstream: dict) -> dict:
+        """Await the async builder, or run the sync one in a worker thread if there is none."""
+        if self.async_builder is None:
+            return await asyncio.to_thread(self.build, data, upstream)
+        if self._afn is None:
+            self._afn = self._resolve(self.async_builder)
+        return await self._afn(data, upstream)
+
+
+STAGES = {stage.name: stage for stage in [
+    Stage('gap_analysis', 'routes.gap_routes:build_gap_analysis',
+          ['profile.careerInterest', 'dashboard.skills'],
+          data=['industry_skills', 'career_paths'],
+          async_builder='routes.gap_routes:abuild_gap_analysis'),
+    Stage('career_match', 'routes.career_routes:build_career_match',
+          ['dashboard.skills'],
+          data=['industry_skills', 'career_paths'],
+          async_builder='routes.career_routes:abuild_career_match'),
+    Stage('swot', 'routes.swot_routes:build_swot',
+          ['profile.college', 'profile.branch', 'profile.careerInterest', 'dashboard.skills'],
+          depends=['gap_analysis'],
+          data=['swot_benchmark'],
+          async_builder='routes.swot_routes:abuild_swot'),
+    Stage('roadmap', 'routes.roadmap_routes:build_roadmap',
+          ['full_name', 'profile.careerInterest', 'dashboard.skills'],
+          depends=['gap_analysis', 'career_match'],
+          data=['learning_resources'],
+          async_builder='routes.roadmap_routes:abuild_roadmap'),
+]}
+
+
+def closure(name: str) -> list:
+    """``name`` and everything upstream of it, dependencies first."""
+    order = []
+
+    def visit(n):
+        if n in order:
+            return
+        for dep in STAGES[n].depends:
+            visit(dep)
+        order.append(n)
+
+    visit(name)
+    return order
+
+
+def _value(data: dict, path: str):
+    node = data
+    for part in path.split('.'):
+        if not isinstance(node, dict):
+            return None
+        node = node.get(part)
+    return node
+
+
+def fingerprint(stage: Stage, data: dict, upstream_fingerprints: dict) -> str:
+    payload = {
+        'stage': stage.name,
+        'version': stage.version,
+        'inputs': {path: _value(data, path) for path in stage.fields},
+        'data': registry.digest(*stage.data) if stage.data else {},
+        'llm': llm_service.is_configured(),
+        'upstream': {dep: upstream_fingerprints[dep] for dep in stage.depends},
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _fresh(stored, fp: str) -> bool:
+    """True if a stored result matches its fingerprint and is not a degraded result due for a retry."""
+    if not isinstance(stored, dict) or stored.get(FINGERPRINT_FIELD) != fp:
+        return False
+    if not stored.get(DEGRADED_FIELD):
+        return True
+    return time.time() - (stored.get(DEGRADED_AT_FIELD) or 0) < DEGRADED_RETRY_SECONDS
+
+
+def _stamp(result: dict, fp: str) -> dict:
+    result[FINGERPRINT_FIELD] = fp
+    # Both written explicitly: a merge would keep an old degraded flag and timestamp.
+    result.setdefault(DEGRADED_FIELD, False)
+    result[DEGRADED_AT_FIELD] = time.time() if result[DEGRADED_FIELD] else None
+    return result
+
+
+def _read(email: str, order: list):
+    fields = {f for name in order for f in STAGES[name].fields} | set(order)
+    return user_model.get_user(email, sorted(fields))
+
+
+class Plan:
+    """
+    Outcome of walking the DAG up to (but not including) building the target stage.
+
+    ``result`` is the stored result when it is still fresh, otherwise None and the
+    caller builds it from ``data`` and ``upstream`` and hands it to save().
+    """
+
+    def __init__(self, stage, data, upstream, fingerprint, result):
+        self.stage = stage
+        self.data = data
+        self.upstream = upstream
+        self.fingerprint = fingerprint
+        self.result = result
+
+
+def _walk(data: dict, order: list, refresh: bool):
+    """
+    Walk ``order`` (target stage last) without doing any I/O: yields (stage, upstream)
+    for every stale upstream stage and expects its built result to be sent back.
+    Returns (Plan, updates to persist) when it reaches the target stage.
+    """
+    stage_name = order[-1]
+    results, fingerprints, updates = {}, {}, {}
+    for name in order:
+        stage = STAGES[name]
+        fp = fingerprints[name] = fingerprint(stage, data, fingerprints)
+        stored = data.get(name)
+        fresh = _fresh(stored, fp)
+        upstream = {dep: results[dep] for dep in stage.depends}
+        if name == stage_name:
+            return Plan(stage, data, upstream, fp, stored if fresh and not refresh else None), updates
+        if fresh:
+            results[name] = stored
+        else:
+            result = yield stage, upstream
+            results[name] = updates[name] = _stamp(result, fp)
+
+
+def plan(email: str, stage_name: str, refresh: bool = False):
+    """
+    Bring the upstream stages of ``stage_name`` up to date (persisting any that were
+    rebuilt) and report whether the stage itself needs rebuilding.
+
+    Args:
+        refresh: treat the stored ``stage_name`` result as stale even if its
+                 fingerprint matches (upstream stages are still reused when fresh)
+
+    Returns:
+        Plan, or None if the user does not exist
+    """
+    order = closure(stage_name)
+    data = _read(email, order)
+    if data is None:
+        return None
+
+    walk = _walk(data, order, refresh)
+    try:
+        step = next(walk)
+        while True:
+            stage, upstream = step
+            step = walk.send(stage.build(data, upstream))
+    except StopIteration as done:
+        stage_plan, updates = done.value
+    if updates:
+        user_model.set_user(email, updates)
+    return stage_plan
+
+
+async def aplan(email: str, stage_name: str, refresh: bool = False):
+    """plan() for the event loop: builders are awaited, Firestore calls run in threads."""
+    order = closure(stage_name)
+    data = await asyncio.to_thread(_read, email, order)
+    if data is None:
+        return None
+
+    walk = _walk(data, order, refresh)
+    try:
+        step = next(walk)
+        while True:
+            stage, upstream = step
+            step = walk.send(await stage.abuild(data, upstream))
+    except StopIteration as done:
+        stage_plan, updates = done.value
+    if updates:
+        await asyncio.to_thread(user_model.set_user, email, updates)
+    return stage_plan
+
+
+def save(email: str, stage_plan: Plan, result: dict) -> dict:
+    """Store a result built for ``stage_plan`` with its input fingerprint."""
+    _stamp(result, stage_plan.fingerprint)
+    user_model.set_user(email, {stage_plan.stage.name: result})
+    return result
+
+
+async def asave(email: str, stage_plan: Plan, result: dict) -> dict:
+    return await asyncio.to_thread(save, email, stage_plan, result)
+
+
+def run(email: str, stage_name: str, refresh: bool = False):
+    """
+    Result of ``stage_name`` for a user, rebuilding it and any stale upstream stage.
+
+    Returns:
+        the stage result dict, or None if the user does not exist
+    """
+    stage_plan = plan(email, stage_name, refresh)
+    if stage_plan is None:
+        return None
+    if stage_plan.result is not None:
+        return stage_plan.result
+    return save(email, stage_plan, stage_plan.stage.build(stage_plan.data, stage_plan.upstream))
+
+
+async def arun(email: str, stage_name: str, refresh: bool = False):
+    """Awaitable run()."""
+    stage_plan = await aplan(email, stage_name, refresh)
+    if stage_plan is None:
+        return None
+    if stage_plan.result is not None:
+        return stage_plan.result
+    return await asave(email, stage_plan, await stage_plan.stage.abuild(stage_plan.data, stage_plan.upstream))
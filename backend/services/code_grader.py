@@ -0,0 +1,273 @@
+"""
+Code-question grader — runs submissions against per-question test cases.
+
+Every test case runs in its own short-lived interpreter (`python -I`, minimal
+environment) that applies CPU-time, address-space, file-size, open-file and
+no-fork limits to itself before the submission runs (see
+services/grader_harness.py); a wall-clock timeout kills the whole process group.
+A process-wide bounded pool caps how many sandboxes run at once, so the test
+cases of one submission run in parallel and many submissions share the machine
+fairly.
+
+With GRADER_SANDBOX=bwrap (the default) the interpreter runs under bubblewrap:
+new user, pid, network, IPC and UTS namespaces (no network, no view of other
+processes), a read-only root holding only the system directories and the
+interpreter — not the application tree — and private /proc, /dev and /tmp.
+When the grader runs as root it first drops to GRADER_SANDBOX_UID with setpriv;
+otherwise run it as a dedicated unprivileged user. GRADER_PYTHON must be an
+interpreter that user can read. Without bubblewrap, code answers are reported
+as 'unsupported' unless GRADER_SANDBOX=none is set explicitly, which keeps only
+the resource limits and is meant for trusted local development.
+
+Assessment grading and the reference-solution checks of generated questions run
+in their own process (grader_worker.py), not in the web workers; GRADER_IN_PROCESS=1
+runs them in the web process too, for local development. Only Python submissions
+are executed; other languages are reported as 'unsupported' and left unscored.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import tracing
+
+HARNESS = os.path.join(os.path.dirname(__file__), 'grader_harness.py')
+
+MAX_PROCESSES = int(os.getenv('GRADER_MAX_PROCESSES', str(max(os.cpu_count() or 1, 2))))
+CPU_SECONDS = int(os.getenv('GRADER_CPU_SECONDS', '2'))
+WALL_SECONDS = float(os.getenv('GRADER_WALL_SECONDS', '5'))
+MEMORY_BYTES = int(os.getenv('GRADER_MEMORY_MB', '256')) * 1024 * 1024
+MAX_OUTPUT_BYTES = 64 * 1024
+SUPPORTED_LANGUAGES = {'python'}
+
+SANDBOX = os.getenv('GRADER_SANDBOX', 'bwrap')      # 'bwrap' or 'none'
+SANDBOX_UID = int(os.getenv('GRADER_SANDBOX_UID', '65534'))     # nobody; used when running as root
+GRADER_PYTHON = os.getenv('GRADER_PYTHON', os.path.realpath(sys.executable))
+BWRAP = shutil.which('bwrap')
+SETPRIV = shutil.which('setpriv')
+IN_PROCESS = os.getenv('GRADER_IN_PROCESS', '0') == '1'
+_ENV = {'PATH': '/usr/bin:/bin', 'PYTHONHASHSEED': '0'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Threads that each supervise one sandbox process — the cap on concurrent sandboxes."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=MAX_PROCESSES, thread_name_prefix='grader')
+    return _pool
+
+
+def sandbox_available() -> bool:
+    """True if submissions can be run: bubblewrap is installed, or the sandbox is explicitly off."""
+    if SANDBOX == 'none':
+        return True
+    return SANDBOX == 'bwrap' and BWRAP is not None and (os.geteuid() != 0 or SETPRIV is not None)
+
+
+_warned = False
+_harness = None
+
+
+def _harness_source() -> str:
+    global _harness
+    if _harness is None:
+        with open(HARNESS, encoding='utf-8') as f:
+            _harness = f.read()
+    return _harness
+
+
+def _warn_no_sandbox():
+    global _warned
+    if not _warned:
+        _warned = True
+        print("⚠  Code answers are not executed: bubblewrap (and setpriv when running as root) "
+              "not found; install them or set GRADER_SANDBOX=none for trusted local use")
+
+
+def _bwrap_command() -> list:
+    """bubblewrap command for one test: no network, no app tree, only read-only system dirs."""
+    python_root = os.path.dirname(os.path.dirname(GRADER_PYTHON))     # <prefix>/bin/python3 → <prefix>
+    command = [
+        BWRAP,
+        '--unshare-all', '--unshare-user', '--uid', str(SANDBOX_UID), '--gid', str(SANDBOX_UID),
+        '--die-with-parent', '--new-session', '--cap-drop', 'ALL',
+        '--ro-bind', '/usr', '/usr',
+        '--ro-bind-try', '/lib', '/lib',
+        '--ro-bind-try', '/lib64', '/lib64',
+        '--ro-bind-try', '/bin', '/bin',
+        '--ro-bind-try', '/etc/ld.so.cache', '/etc/ld.so.cache',
+    ]
+    if python_root != '/usr' and not python_root.startswith('/usr/'):
+        command += ['--ro-bind', python_root, python_root]
+    command += [
+        '--proc', '/proc', '--dev', '/dev', '--tmpfs', '/tmp', '--chdir', '/tmp',
+        '--clearenv',
+    ]
+    for name, value in _ENV.items():
+        command += ['--setenv', name, value]
+    command += ['--', GRADER_PYTHON, '-I', '-c', _harness_source()]     # nothing of the app tree is mounted
+    if os.geteuid() == 0:
+        command = [SETPRIV, f'--reuid={SANDBOX_UID}', f'--regid={SANDBOX_UID}', '--clear-groups',
+                   '--no-new-privs'] + command
+    return command
+
+
+def _command() -> list:
+    if SANDBOX == 'none':
+        return [GRADER_PYTHON, '-I', HARNESS]
+    return _bwrap_command()
+
+
+def _limits() -> dict:
+    return {
+        'cpuSeconds': CPU_SECONDS,
+        'memoryBytes': MEMORY_BYTES,
+        'fileBytes': 1024 * 1024,
+        'openFiles': 32,
+    }
+
+
+def _equal(actual, expected) -> bool:
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            return math.isclose(float(actual), float(expected), rel_tol=1e-6, abs_tol=1e-9)
+        except (TypeError, ValueError):
+            return False
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(actual) == len(expected) and all(_equal(a, e) for a, e in zip(actual, expected))
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return actual.keys() == expected.keys() and all(_equal(actual[k], expected[k]) for k in expected)
+    return type(actual) is type(expected) and actual == expected
+
+
+def run_test(code: str, entry_point: str, test: dict) -> dict:
+    """
+    Run one test case in a sandboxed interpreter.
+
+    Returns:
+        {status: passed | failed | error | timeout | cpu_limit | memory, ms, error?}
+    """
+    request = json.dumps({'code': code, 'entryPoint': entry_point,
+                          'args': test.get('args', []), 'limits': _limits()})
+    with tempfile.TemporaryDirectory(prefix='grader-') as workdir:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            _command(),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=workdir, env=dict(_ENV), start_new_session=True,
+        )
+        try:
+            stdout, _ = proc.communicate(request.encode('utf-8'), timeout=WALL_SECONDS)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            return {'status': 'timeout', 'ms': _elapsed(start), 'error': f'exceeded {WALL_SECONDS:g}s'}
+        ms = _elapsed(start)
+
+    # bubblewrap reports a child killed by a signal as 128 + signal number
+    if proc.returncode in (-signal.SIGXCPU, -signal.SIGKILL, 128 + signal.SIGXCPU, 128 + signal.SIGKILL):
+        return {'status': 'cpu_limit', 'ms': ms, 'error': f'exceeded {CPU_SECONDS}s of CPU time'}
+    try:
+        reply = json.loads(stdout[:MAX_OUTPUT_BYTES].decode('utf-8'))
+    except ValueError:
+        return {'status': 'error', 'ms': ms, 'error': f'sandbox exited with code {proc.returncode}'}
+
+    if reply.get('status') != 'ok':
+        return {'status': reply.get('status', 'error'), 'ms': ms, 'error': reply.get('error', '')}
+    if _equal(reply.get('result'), test.get('expected')):
+        return {'status': 'passed', 'ms': ms}
+    return {'status': 'failed', 'ms': ms, 'error': 'wrong answer'}
+
+
+def _kill(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.communicate()
+
+
+def _elapsed(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def grade_submission(question: dict, code: str) -> dict:
+    """
+    Run every test case of a code question in parallel.
+
+    Returns:
+        {status: graded | unanswered | unsupported, passed, total, tests: [...], error?}
+    """
+    tests = question.get('tests') or []
+    total = len(tests)
+    if not isinstance(code, str) or not code.strip() or code.strip() == (question.get('starterCode') or '').strip():
+        return {'status': 'unanswered', 'passed': 0, 'total': total, 'tests': []}
+    if question.get('language', 'python') not in SUPPORTED_LANGUAGES or not question.get('entryPoint') or not tests:
+        return {'status': 'unsupported', 'passed': 0, 'total': total, 'tests': []}
+    if not sandbox_available():
+        _warn_no_sandbox()
+        return {'status': 'unsupported', 'passed': 0, 'total': total, 'tests': [],
+                'error': 'no grader sandbox available (install bubblewrap)'}
+
+    pool = _get_pool()
+    futures = [tracing.submit(pool, run_test, code, question['entryPoint'], t) for t in tests]
+    results = []
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            results.append({'status': 'error', 'ms': 0, 'error': str(e)})
+    passed = sum(1 for r in results if r['status'] == 'passed')
+    return {'status': 'graded', 'passed': passed, 'total': total, 'tests': results}
+
+
+def grade_code_questions(questions: list, answers: dict) -> dict:
+    """
+    Grade all code questions of an assessment concurrently.
+
+    Unsupported questions (nothing could be executed) count towards neither passed nor total.
+
+    Returns:
+        {results: {questionId: grade_submission(...)}, passed, total, percentage, ungraded}
+    """
+    code_questions = [q for q in questions if q.get('type') == 'code']
+    with ThreadPoolExecutor(max_workers=max(len(code_questions), 1)) as ex:
+        futures = [tracing.submit(ex, grade_submission, q, answers.get(str(q['id']))) for q in code_questions]
+        graded = [f.result() for f in futures]
+    results = {str(q['id']): g for q, g in zip(code_questions, graded)}
+    scored = [g for g in graded if g['status'] != 'unsupported']
+    passed = sum(g['passed'] for g in scored)
+    total = sum(g['total'] for g in scored)
+    return {
+        'results': results,
+        'passed': passed,
+        'total': total,
+        'percentage': round(passed / total * 100) if total else 0,
+        'ungraded': len(graded) - len(scored),
+    }
+
+
+def check_reference_solution(question: dict) -> bool:
+    """
+    True if a generated code question's reference solution passes its own tests.
+    Questions that cannot be executed here are kept on their structural validation.
+    """
+    solution = question.get('solution')
+    if not solution or question.get('language', 'python') not in SUPPORTED_LANGUAGES:
+        return True     # nothing we can execute; keep the structural validation
+    graded = grade_submission(question, solution)
+    if graded['status'] == 'unsupported':
+        return True     # no sandbox on this host; grade_submission has already warned
+    return graded['status'] == 'graded' and graded['passed'] == graded['total']
@@ -0,0 +1,191 @@
+"""
+Offline cohort analytics — aggregate skill-gap statistics across all users.
+
+Streams the `users` collection page by page (document-id cursors, projected to
+the few fields we need) so memory stays constant, scores each page with the
+vectorised gap engine, and folds the results into per-college, per-branch and
+per-careerInterest summaries. Summaries are written to the `cohort_summaries`
+collection (served read-only to admins by /api/analytics/cohorts) or to a JSON file.
+Groups with fewer than MIN_GROUP_SIZE users are left out (k-anonymity), so no
+summary describes an individual user; --min-group-size can only raise that floor.
+
+Usage (from backend/):
+    python -m services.cohort_analytics                                   # live Firestore
+    python -m services.cohort_analytics --out summaries.json              # live → file
+    python -m services.cohort_analytics --local users.json --out s.json   # local stand-in
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from services import gap_engine
+
+SUMMARY_COLLECTION = 'cohort_summaries'
+DIMENSIONS = ('college', 'branch', 'careerInterest')
+USER_FIELDS = ['profile.college', 'profile.branch', 'profile.careerInterest', 'dashboard.skills']
+MATCH_BINS = [0, 20, 40, 60, 80, 101]          # overallMatch histogram edges
+MATCH_BIN_LABELS = ['0-19', '20-39', '40-59', '60-79', '80-100']
+DEFAULT_CAREER = 'Full Stack Developer'
+MIN_GROUP_SIZE = max(int(os.getenv('COHORT_MIN_GROUP_SIZE', '5')), 2)    # k-anonymity floor
+
+
+def stream_users(db, page_size: int = 200, fields=USER_FIELDS):
+    """Yield pages (lists) of user snapshots using document-id cursor pagination."""
+    query = db.collection('users').order_by('__name__').limit(page_size)
+    if fields:
+        query = query.select(fields)
+    last = None
+    while True:
+        page = list((query.start_after(last) if last is not None else query).stream())
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+class _GroupStats:
+    __slots__ = ('users', 'match_sum', 'match_hist', 'critical', 'partial', 'missing')
+
+    def __init__(self):
+        self.users = 0
+        self.match_sum = 0
+        self.match_hist = np.zeros(len(MATCH_BIN_LABELS), dtype=np.int64)
+        self.critical = 0
+        self.partial = 0
+        self.missing = Counter()
+
+    def to_dict(self, key: str, top_missing: int) -> dict:
+        return {
+            'key': key,
+            'users': self.users,
+            'avgOverallMatch': round(self.match_sum / self.users, 1) if self.users else 0,
+            'overallMatchHistogram': dict(zip(MATCH_BIN_LABELS, self.match_hist.tolist())),
+            'criticalGaps': self.critical,
+            'partialGaps': self.partial,
+            'avgGapsPerUser': round((self.critical + self.partial) / self.users, 2) if self.users else 0,
+            'topMissingSkills': [{'skill': s, 'users': n} for s, n in self.missing.most_common(top_missing)],
+        }
+
+
+class CohortAggregator:
+    """Accumulates gap statistics per dimension value; memory grows with groups, not users."""
+
+    def __init__(self):
+        self.groups = {dim: defaultdict(_GroupStats) for dim in DIMENSIONS + ('overall',)}
+        self.users_processed = 0
+
+    def add_page(self, snapshots: list):
+        by_role = defaultdict(list)
+        for snap in snapshots:
+            data = snap.to_dict() or {}
+            profile = data.get('profile', {})
+            role = profile.get('careerInterest') or DEFAULT_CAREER
+            skills = data.get('dashboard', {}).get('skills', [])
+            by_role[role].append((profile, gap_engine.skill_map(skills)))
+
+        for role, users in by_role.items():
+            benchmark = gap_engine.Benchmark.for_role(role)
+            scores = gap_engine.user_matrix([m for _, m in users], benchmark)
+            result = gap_engine.analyze(scores, benchmark.industry)
+            self._fold(role, users, benchmark, result)
+        self.users_processed += len(snapshots)
+
+    def _fold(self, role, users, benchmark, result):
+        critical = result['critical'].sum(axis=1)
+        partial = (result['gap'] & ~result['critical']).sum(axis=1)
+        bins = np.digitize(result['overall'], MATCH_BINS) - 1
+        gap_mask = result['gap']
+
+        for row, (profile, _) in enumerate(users):
+            missing = [benchmark.skills[c] for c in np.flatnonzero(gap_mask[row])]
+            keys = {
+                'college': profile.get('college') or 'Unknown',
+                'branch': profile.get('branch') or 'Unknown',
+                'careerInterest': role,
+                'overall': 'all',
+            }
+            for dim, key in keys.items():
+                stats = self.groups[dim][key]
+                stats.users += 1
+                stats.match_sum += int(result['overall'][row])
+                stats.match_hist[bins[row]] += 1
+                stats.critical += int(critical[row])
+                stats.partial += int(partial[row])
+                stats.missing.update(missing)
+
+    def summaries(self, min_group_size: int = MIN_GROUP_SIZE, top_missing: int = 10) -> dict:
+        """Summaries per dimension; groups smaller than max(min_group_size, MIN_GROUP_SIZE) are omitted."""
+        min_group_size = max(min_group_size, MIN_GROUP_SIZE)
+        generated_at = datetime.utcnow().isoformat()
+        out = {}
+        for dim, groups in self.groups.items():
+            rows = [stats.to_dict(key, top_missing) for key, stats in groups.items()
+                    if stats.users >= min_group_size]
+            rows.sort(key=lambda r: r['users'], reverse=True)
+            out[dim] = {
+                'dimension': dim,
+                'groups': rows,
+                'usersProcessed': self.users_processed,
+                'minGroupSize': min_group_size,
+                'generatedAt': generated_at,
+            }
+        return out
+
+
+def run(db, page_size: int = 200, min_group_size: int = MIN_GROUP_SIZE) -> dict:
+    aggregator = CohortAggregator()
+    for page in stream_users(db, page_size):
+        aggregator.add_page(page)
+    return aggregator.summaries(min_group_size=min_group_size)
+
+
+def write_summaries(db, summaries: dict, collection: str = SUMMARY_COLLECTION):
+    batch = db.batch()
+    for dim, summary in summaries.items():
+        batch.set(db.collection(collection).document(dim), summary)
+    batch.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute cohort skill-gap summaries.')
+    parser.add_argument('--local', metavar='JSON', help='read users from a local Firestore fixture instead of Firestore')
+    parser.add_argument('--out', metavar='JSON', help='write summaries to a file instead of the summary collection')
+    parser.add_argument('--collection', default=SUMMARY_COLLECTION, help='summary collection name')
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--min-group-size', type=int, default=MIN_GROUP_SIZE,
+                        help=f'omit groups with fewer users (anonymity threshold, at least {MIN_GROUP_SIZE})')
+    args = parser.parse_args(argv)
+    if args.local and not args.out:
+        parser.error('--local needs --out (the local stand-in is not persisted)')
+    if args.min_group_size < MIN_GROUP_SIZE:
+        parser.error(f'--min-group-size cannot be below the k-anonymity floor ({MIN_GROUP_SIZE})')
+
+    if args.local:
+        from utils.local_firestore import LocalFirestore
+        db = LocalFirestore.from_json(args.local)
+    else:
+        from utils.firebase_config import get_db
+        db = get_db()
+
+    summaries = run(db, page_size=args.page_size, min_group_size=args.min_group_size)
+    processed = summaries['overall']['usersProcessed']
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"✓ {processed} users summarised → {args.out}")
+    else:
+        write_summaries(db, summaries, args.collection)
+        print(f"✓ {processed} users summarised → {args.collection}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
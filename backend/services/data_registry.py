@@ -0,0 +1,156 @@
+"""
+In-memory registry of the benchmark data in backend/data.
+
+The JSON files are parsed once (at startup) into indexed lookups and reloaded
+automatically when a file's mtime changes, so analytics requests never touch
+the disk or the JSON parser. Each file's content digest is kept as well, so
+stored results can record which generation of the data they were built from.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+FILES = {
+    'industry_skills': 'industry_skills.json',
+    'career_paths': 'career_paths.json',
+    'swot_benchmark': 'swot_benchmark.json',
+    'learning_resources': 'learning_resources.json',
+}
+
+
+def fold(name: str) -> str:
+    """Case-folded, whitespace-normalised lookup key for a skill or role name."""
+    return ' '.join((name or '').split()).casefold()
+
+
+class _Snapshot:
+    """Immutable, fully indexed view of one generation of the data files."""
+
+    def __init__(self, raw: dict, version: int, digests: dict):
+        self.version = version
+        self.digests = digests
+        self.benchmarks = raw.get('industry_skills') or {}
+        self.careers = raw.get('career_paths') or []
+        self.swot = raw.get('swot_benchmark') or {}
+        self.resources = raw.get('learning_resources') or []
+
+        self.benchmark_by_role = {fold(role): data for role, data in self.benchmarks.items()}
+        self.career_by_id = {c.get('id'): c for c in self.careers}
+        self.career_by_title = {fold(c.get('title', '')): c for c in self.careers}
+
+        # Case-folded skill name -> canonical spelling, across every benchmark and career.
+        self.skill_index = {}
+        for role_data in self.benchmarks.values():
+            for skill in role_data.get('skills', []):
+                self.skill_index.setdefault(fold(skill), skill)
+        for career in self.careers:
+            for skill in career.get('requiredSkills', []):
+                self.skill_index.setdefault(fold(skill), skill)
+
+
+class DataRegistry:
+    """
+    Loads the benchmark files once and hot-reloads them on mtime change.
+
+    Args:
+        data_dir:       directory holding the JSON files
+        check_interval: minimum seconds between mtime checks
+    """
+
+    def __init__(self, data_dir: str = _DATA, check_interval: float = 2.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._raw = {}
+        self._mtimes = {}
+        self._digests = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.data_dir, FILES[key])
+
+    def load(self) -> '_Snapshot':
+        """(Re)load every file whose mtime changed and rebuild the indexes."""
+        with self._lock:
+            raw, mtimes, digests = dict(self._raw), dict(self._mtimes), dict(self._digests)
+            for key in FILES:
+                path = self._path(key)
+                mtime = os.stat(path).st_mtime_ns
+                if mtimes.get(key) == mtime:
+                    continue
+                with open(path, 'rb') as f:
+                    content = f.read()
+                raw[key] = json.loads(content)
+                digests[key] = hashlib.sha256(content).hexdigest()
+                mtimes[key] = mtime
+            if mtimes != self._mtimes or self._snapshot is None:
+                version = (self._snapshot.version + 1) if self._snapshot else 1
+                self._raw, self._mtimes, self._digests = raw, mtimes, digests
+                self._snapshot = _Snapshot(raw, version, digests)
+            self._last_check = time.monotonic()
+            return self._snapshot
+
+    def snapshot(self) -> '_Snapshot':
+        snap = self._snapshot
+        if snap is None or time.monotonic() - self._last_check >= self.check_interval:
+            try:
+                snap = self.load()
+            except (OSError, ValueError) as e:
+                if snap is None:
+                    raise
+                # Keep serving the last good generation while a file is mid-write.
+                print(f"⚠  Benchmark data reload failed: {e}")
+                self._last_check = time.monotonic()
+        return snap
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+    @property
+    def version(self) -> int:
+        """Reload counter of this process; use digest() for anything stored or shared."""
+        return self.snapshot().version
+
+    def digest(self, *keys) -> dict:
+        """{file key: sha256 of its content} for ``keys`` (every file when none are given)."""
+        digests = self.snapshot().digests
+        return {key: digests[key] for key in (keys or FILES)}
+
+    def careers(self) -> list:
+        return self.snapshot().careers
+
+    def career_by_id(self, career_id: str):
+        return self.snapshot().career_by_id.get(career_id)
+
+    def career_by_title(self, title: str):
+        return self.snapshot().career_by_title.get(fold(title))
+
+    def benchmark_for(self, role: str) -> dict:
+        """Benchmark for a role (case-insensitive), falling back to the first role in the file."""
+        snap = self.snapshot()
+        data = snap.benchmarks.get(role) or snap.benchmark_by_role.get(fold(role))
+        if data is None and snap.benchmarks:
+            data = next(iter(snap.benchmarks.values()))
+        return data or {}
+
+    def canonical_skill(self, name: str) -> str:
+        """Canonical spelling of a known skill, or the input unchanged."""
+        return self.snapshot().skill_index.get(fold(name), name)
+
+    def skill_vocabulary(self) -> list:
+        return list(self.snapshot().skill_index.values())
+
+    def swot_opportunities(self, role: str) -> list:
+        opportunities = self.snapshot().swot.get('opportunities', {})
+        return opportunities.get(role) or opportunities.get('default', [])
+
+    def swot_threats(self, role: str) -> list:
+        threats = self.snapshot().swot.get('threats', {})
+        return threats.get(role) or threats.get('default', [])
+
+
+registry = DataRegistry()
@@ -0,0 +1,120 @@
+"""
+Skill-gap engine — compares user skill levels with an industry benchmark.
+
+Scores are laid out as a (users × skills) matrix so radar data, gaps,
+severities, strengths and overallMatch for a whole cohort come out of one
+vectorised pass; the gap-analysis route is a single-user wrapper around it.
+"""
+
+import numpy as np
+
+from services.data_registry import registry, fold
+from services.skill_vector_builder import canonicalize
+
+LEVEL_SCORES = {'Beginner': 30, 'Intermediate': 60, 'Advanced': 90}
+UNKNOWN_LEVEL_SCORE = 40
+DEFAULT_INDUSTRY_SCORE = 70
+GAP_THRESHOLD = -20        # diff below this is a gap …
+CRITICAL_THRESHOLD = -40   # … and below this a critical one
+
+
+def level_to_score(level: str) -> int:
+    return LEVEL_SCORES.get(level, UNKNOWN_LEVEL_SCORE)
+
+
+class Benchmark:
+    """Required skills of one role and the industry score expected for each."""
+
+    def __init__(self, role: str, role_data: dict):
+        self.role = role
+        self.skills = list(role_data.get('skills', []))
+        levels = role_data.get('levels', {})
+        self.industry = np.array([levels.get(s, DEFAULT_INDUSTRY_SCORE) for s in self.skills], dtype=np.int64)
+        self.columns = {fold(s): i for i, s in enumerate(self.skills)}
+
+    @classmethod
+    def for_role(cls, role: str) -> 'Benchmark':
+        return cls(role, registry.benchmark_for(role))
+
+
+def skill_map(skills_raw: list) -> dict:
+    """[{name, level}] → {canonical name: score}, later entries winning like a dict literal."""
+    names = canonicalize([s.get('name', '') for s in skills_raw])
+    return {
+        name: level_to_score(s.get('level', 'Beginner'))
+        for name, s in zip(names, skills_raw)
+    }
+
+
+def user_matrix(skill_maps: list, benchmark: Benchmark) -> np.ndarray:
+    """Stack per-user {skill: score} maps into a (users × benchmark skills) score matrix."""
+    scores = np.zeros((len(skill_maps), len(benchmark.skills)), dtype=np.int64)
+    for row, skills in enumerate(skill_maps):
+        for name, score in skills.items():
+            col = benchmark.columns.get(fold(name))
+            if col is not None:
+                scores[row, col] = score
+    return scores
+
+
+def analyze(user_scores: np.ndarray, industry: np.ndarray) -> dict:
+    """
+    Vectorised gap computation.
+
+    Args:
+        user_scores: (users × skills) int matrix
+        industry:    (skills,) benchmark vector, or a (users × skills) matrix
+
+    Returns:
+        dict of arrays: diff, gap, critical, strength (users × skills bool) and overall (users,)
+    """
+    user_scores = np.atleast_2d(user_scores)
+    diff = user_scores - industry
+    gap = diff < GAP_THRESHOLD
+    n_skills = user_scores.shape[1]
+    overall = np.maximum(0, 100 - np.rint(gap.sum(axis=1) / max(n_skills, 1) * 100)).astype(np.int64)
+    return {
+        'diff': diff,
+        'gap': gap,
+        'critical': diff < CRITICAL_THRESHOLD,
+        'strength': diff >= 0,
+        'overall': overall,
+    }
+
+
+def reports(user_scores: np.ndarray, benchmark: Benchmark) -> list:
+    """Per-user {radarData, gaps, strengths, overallMatch} dicts for a score matrix."""
+    user_scores = np.atleast_2d(user_scores)
+    result = analyze(user_scores, benchmark.industry)
+    industry = benchmark.industry.tolist()
+    out = []
+    for row in range(user_scores.shape[0]):
+        scores = user_scores[row].tolist()
+        diff = result['diff'][row].tolist()
+        gap, critical, strength = result['gap'][row], result['critical'][row], result['strength'][row]
+        radar_data, gaps, strengths = [], [], []
+        for col, skill in enumerate(benchmark.skills):
+            radar_data.append({'skill': skill, 'user': scores[col], 'industry': industry[col]})
+            if gap[col]:
+                gaps.append({'skill': skill, 'user': scores[col], 'industry': industry[col],
+                             'severity': 'critical' if critical[col] else 'partial', 'gap': abs(diff[col])})
+            elif strength[col]:
+                strengths.append({'skill': skill, 'user': scores[col], 'industry': industry[col]})
+        out.append({
+            'radarData': radar_data,
+            'gaps': gaps,
+            'strengths': strengths,
+            'overallMatch': int(result['overall'][row]),
+        })
+    return out
+
+
+def analyze_users(skill_maps: list, role: str) -> list:
+    """Gap reports for many users targeting the same role."""
+    benchmark = Benchmark.for_role(role)
+    return reports(user_matrix(skill_maps, benchmark), benchmark)
+
+
+def analyze_user(user_skill_map: dict, role: str) -> dict:
+    """Gap report for a single user — the gap-analysis route's entry point."""
+    return analyze_users([user_skill_map], role)[0]
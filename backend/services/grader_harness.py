@@ -0,0 +1,59 @@
+"""
+Runs one test case of a code submission inside a fresh, isolated interpreter.
+
+Started by services.code_grader inside the bubblewrap sandbox as
+`python -I -c <this file>` (or, with GRADER_SANDBOX=none, as
+`python -I grader_harness.py` in an empty temporary directory). Reads {code, entryPoint, args, limits} as JSON from stdin,
+applies the resource limits to itself before touching the submission, calls the
+entry point and writes {status, result | error} as JSON to stdout. Anything the
+submission prints is captured and discarded.
+"""
+
+import io
+import sys
+import json
+import resource
+
+
+def _limit(kind, value):
+    if value:
+        resource.setrlimit(kind, (value, value))
+
+
+def main():
+    request = json.loads(sys.stdin.read())
+    limits = request.get('limits', {})
+    out = sys.stdout
+
+    cpu = limits.get('cpuSeconds')
+    if cpu:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    _limit(resource.RLIMIT_AS, limits.get('memoryBytes'))
+    _limit(resource.RLIMIT_FSIZE, limits.get('fileBytes'))
+    _limit(resource.RLIMIT_NOFILE, limits.get('openFiles'))
+    if hasattr(resource, 'RLIMIT_NPROC'):
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))   # no fork / subprocess
+
+    sys.stdout = sys.stderr = io.StringIO()
+    try:
+        namespace = {'__name__': '__submission__'}
+        exec(compile(request['code'], '<submission>', 'exec'), namespace)
+        fn = namespace.get(request['entryPoint'])
+        if not callable(fn):
+            reply = {'status': 'error', 'error': f"function '{request['entryPoint']}' is not defined"}
+        else:
+            result = fn(*request.get('args', []))
+            reply = {'status': 'ok', 'result': json.loads(json.dumps(result, default=repr))}
+    except MemoryError:
+        reply = {'status': 'memory', 'error': 'memory limit exceeded'}
+    except RecursionError:
+        reply = {'status': 'error', 'error': 'maximum recursion depth exceeded'}
+    except BaseException as e:      # SystemExit, KeyboardInterrupt etc. from user code too
+        reply = {'status': 'error', 'error': f"{type(e).__name__}: {e}"[:500]}
+
+    out.write(json.dumps(reply))
+    out.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Local background job queue backed by SQLite.
+
+Stands in for Redis/Celery: jobs are rows in a SQLite file, so every Flask
+worker process on the host shares one queue, and each process runs a small
+pool of worker threads that claim jobs, report progress and retry failures
+with exponential backoff. A job whose worker died mid-run is re-claimed once
+its lease expires. Worker processes record a heartbeat, so producers can tell
+whether anything is processing a queue at all (see stats()).
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils import tracing
+
+_BASE = os.path.dirname(os.path.dirname(__file__))
+DEFAULT_DB_PATH = os.getenv('JOB_QUEUE_DB', os.path.join(_BASE, 'instance', 'jobs.sqlite3'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    owner       TEXT,
+    status      TEXT NOT NULL,
+    progress    TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    payload     TEXT,
+    data        BLOB,
+    result      TEXT,
+    error       TEXT,
+    run_after   REAL NOT NULL,
+    lease_until REAL,
+    created_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (kind, status, run_after);
+CREATE TABLE IF NOT EXISTS workers (
+    kind    TEXT NOT NULL,
+    pid     INTEGER NOT NULL,
+    threads INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (kind, pid)
+);
+"""
+HEARTBEAT_INTERVAL = 10.0
+
+
+class QueueFull(RuntimeError):
+    """Raised by submit() when the queue already holds max_depth pending jobs."""
+
+
+class Job:
+    """A claimed job as seen by a handler."""
+
+    def __init__(self, queue, row):
+        self._queue = queue
+        self.id = row['id']
+        self.owner = row['owner']
+        self.attempts = row['attempts']
+        self.payload = json.loads(row['payload'] or '{}')
+        self.data = row['data']
+
+    @property
+    def last_attempt(self) -> bool:
+        """True when a failure now marks the job failed instead of retrying it."""
+        return self.attempts >= self._queue.max_attempts
+
+    def report(self, progress: str):
+        """Record a human-readable progress stage (e.g. 'extracting')."""
+        self._queue._update(self.id, progress=progress)
+
+
+class JobQueue:
+    """
+    A named queue of jobs of one kind, processed by ``handler(job) -> dict``.
+
+    Args:
+        kind:        job kind stored with each row; one JobQueue per kind
+        handler:     callable receiving a Job and returning a JSON-able result
+        workers:     worker threads started in this process (0: only submit, another process runs the jobs)
+        max_depth:   maximum queued + running jobs before submit() raises QueueFull
+        max_attempts: total tries per job before it is marked failed
+        backoff:     base seconds for exponential retry backoff
+        lease:       seconds a running job may go without finishing before it is re-claimed
+        retention:   seconds finished jobs are kept for status polling
+    """
+
+    def __init__(self, kind: str, handler, workers: int = 2, max_depth: int = 100,
+                 max_attempts: int = 3, backoff: float = 2.0, lease: float = 300,
+                 retention: float = 24 * 3600, db_path: str = None, poll_interval: float = 1.0):
+        self.kind = kind
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._last_beat = 0.0
+        self._init_db()
+
+    # ── Storage ──────────────────────────────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _update(self, job_id: str, **fields):
+        fields['updated_at'] = datetime.utcnow().isoformat()
+        cols = ', '.join(f'{k} = ?' for k in fields)
+        self._conn().execute(f'UPDATE jobs SET {cols} WHERE id = ?', (*fields.values(), job_id))
+
+    # ── Producer side ────────────────────────────────────────────────────────
+    def submit(self, payload: dict = None, data: bytes = None, owner: str = None) -> str:
+        """Enqueue a job and return its id. Raises QueueFull when the queue is at max_depth."""
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            (depth,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE kind = ? AND status IN ('queued', 'running')",
+                (self.kind,),
+            ).fetchone()
+            if depth >= self.max_depth:
+                raise QueueFull(f'{self.kind} queue is full ({depth} pending jobs)')
+            conn.execute(
+                'INSERT INTO jobs (id, kind, owner, status, progress, payload, data, run_after, created_at, updated_at) '
+                "VALUES (?, ?, ?, 'queued', 'queued', ?, ?, ?, ?, ?)",
+                (job_id, self.kind, owner, json.dumps(payload or {}), data, time.time(), now, now),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._wakeup.set()
+        return job_id
+
+    def has_pending(self, owner: str) -> bool:
+        """True if a job of this kind for ``owner`` is queued or running."""
+        row = self._conn().execute(
+            "SELECT 1 FROM jobs WHERE kind = ? AND owner = ? AND status IN ('queued', 'running') LIMIT 1",
+            (self.kind, owner),
+        ).fetchone()
+        return row is not None
+
+    def get(self, job_id: str) -> dict:
+        """Return the public status record of a job, or None if unknown/expired."""
+        row = self._conn().execute(
+            'SELECT id, owner, status, progress, attempts, result, error, created_at, updated_at '
+            'FROM jobs WHERE id = ? AND kind = ?', (job_id, self.kind),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'jobId': row['id'],
+            'owner': row['owner'],
+            'status': row['status'],
+            'progress': row['progress'],
+            'attempts': row['attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'createdAt': row['created_at'],
+            'updatedAt': row['updated_at'],
+        }
+
+    def stats(self, heartbeat_age: float = 3 * HEARTBEAT_INTERVAL) -> dict:
+        """Queued/running job counts and the worker threads (any process) seen within heartbeat_age seconds."""
+        conn = self._conn()
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE kind = ? AND status IN ('queued', 'running') GROUP BY status",
+            (self.kind,),
+        ).fetchall())
+        (workers,) = conn.execute(
+            'SELECT COALESCE(SUM(threads), 0) FROM workers WHERE kind = ? AND seen_at > ?',
+            (self.kind, time.time() - heartbeat_age),
+        ).fetchone()
+        return {'queued': counts.get('queued', 0), 'running': counts.get('running', 0), 'workers': workers}
+
+    # ── Worker side ──────────────────────────────────────────────────────────
+    def start(self):
+        """Start this process's worker threads (idempotent; restarts after fork)."""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._threads = [
+                threading.Thread(target=self._run, name=f'{self.kind}-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for t in self._threads:
+                t.start()
+            self._started_pid = os.getpid()
+
+    def _claim(self):
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE kind = ? AND ('
+                "  (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_until < ?)"
+                ') ORDER BY run_after LIMIT 1',
+                (self.kind, now, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', progress = 'started', attempts = attempts + 1, "
+                    'lease_until = ?, updated_at = ? WHERE id = ?',
+                    (now + self.lease, datetime.utcnow().isoformat(), row['id']),
+                )
+                row = dict(row, attempts=row['attempts'] + 1)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _prune(self):
+        self._conn().execute(
+            "DELETE FROM jobs WHERE kind = ? AND status IN ('done', 'failed') AND finished_at < ?",
+            (self.kind, time.time() - self.retention),
+        )
+        self._conn().execute('DELETE FROM workers WHERE kind = ? AND seen_at < ?', (self.kind, time.time() - 3600))
+
+    def _heartbeat(self):
+        now = time.time()
+        if now - self._last_beat < HEARTBEAT_INTERVAL:
+            return
+        self._last_beat = now
+        self._conn().execute(
+            'INSERT OR REPLACE INTO workers (kind, pid, threads, seen_at) VALUES (?, ?, ?, ?)',
+            (self.kind, os.getpid(), self.workers, now),
+        )
+
+    def _run(self):
+        last_prune = 0.0
+        while True:
+            try:
+                self._heartbeat()
+                if time.time() - last_prune > 600:
+                    self._prune()
+                    last_prune = time.time()
+                row = self._claim()
+                if row is not None:
+                    job = Job(self, row)
+                    if job.attempts > self.max_attempts:
+                        # Re-claimed after its lease expired on the final attempt.
+                        self._update(job.id, status='failed', progress='failed', data=None,
+                                     error='worker lease expired', finished_at=time.time())
+                    else:
+                        self._execute(job)
+                    continue
+            except Exception as e:
+                # Keep the worker alive; a job whose status could not be written is
+                # re-claimed when its lease expires.
+                print(f"⚠  {self.kind} queue error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _execute(self, job: Job):
+        try:
+            with tracing.trace(f'job {self.kind}', jobId=job.id, attempt=job.attempts):
+                result = self.handler(job)
+        except Exception as e:
+            if job.attempts < self.max_attempts:
+                self._update(job.id, status='queued', progress='retrying', error=str(e), lease_until=None,
+                             run_after=time.time() + self.backoff * (2 ** (job.attempts - 1)))
+            else:
+                self._update(job.id, status='failed', progress='failed', error=str(e), data=None,
+                             finished_at=time.time())
+            return
+        # The uploaded blob is no longer needed once the job succeeds.
+        self._update(job.id, status='done', progress='done', error=None, data=None,
+                     result=json.dumps(result), finished_at=time.time())
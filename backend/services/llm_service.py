@@ -0,0 +1,192 @@
+"""
+Shared Gemini client — one configured GenerativeModel per process, plus a
+content-addressed response cache so identical prompts are only sent once.
+
+The a*-prefixed coroutines are the awaitable counterparts used by the ASGI
+server (asgi.py); they share the same cache. Every call that reaches Gemini is
+timed under the caller's ``site`` label (dependency "gemini" in /api/metrics).
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+from utils import metrics
+from utils.ttl_cache import TTLCache
+
+DEFAULT_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+
+_cache = TTLCache(
+    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024')),
+    ttl=float(os.getenv('LLM_CACHE_TTL', '21600')),            # 6 hours
+    max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+)
+
+_models = {}
+_models_lock = threading.Lock()
+_configured_key = None
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised when no Gemini API key is configured."""
+
+
+def is_configured() -> bool:
+    return bool(os.getenv('GEMINI_API_KEY', ''))
+
+
+def get_model(model_name: str = DEFAULT_MODEL):
+    """Return the process-wide GenerativeModel, configuring the SDK on first use."""
+    global _configured_key
+    key = os.getenv('GEMINI_API_KEY', '')
+    if not key:
+        raise LLMUnavailable('GEMINI_API_KEY not set')
+
+    with _models_lock:
+        if key != _configured_key:
+            import google.generativeai as genai
+            genai.configure(api_key=key)
+            _configured_key = key
+            _models.clear()
+        model = _models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+        return model
+
+
+def cache_key(prompt: str, model_name: str = DEFAULT_MODEL) -> str:
+    return hashlib.sha256(f"{model_name}\x00{prompt}".encode('utf-8')).hexdigest()
+
+
+def generate_text(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                  site: str = 'default') -> str:
+    """
+    Send a prompt to Gemini and return the stripped response text.
+
+    Identical (model, prompt) pairs are served from the response cache unless
+    ``use_cache`` is False. Raises LLMUnavailable when no API key is set.
+    """
+    model = get_model(model_name)
+    key = cache_key(prompt, model_name)
+    if use_cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    with metrics.track('gemini', site):
+        response = model.generate_content(prompt)
+    text = response.text.strip()
+    if use_cache and text:
+        _cache.set(key, text)
+    return text
+
+
+def stream_text(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                site: str = 'default'):
+    """
+    Like generate_text() but yields the response in chunks as Gemini produces them.
+
+    A cached response is yielded as a single chunk; a completed stream is cached
+    for later generate_text()/stream_text() calls with the same prompt.
+    """
+    model = get_model(model_name)
+    key = cache_key(prompt, model_name)
+    if use_cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    with metrics.track('gemini', site):     # includes the time the consumer spends between chunks
+        for chunk in model.generate_content(prompt, stream=True):
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    full = ''.join(parts).strip()
+    if use_cache and full:
+        _cache.set(key, full)
+
+
+async def agenerate_text(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                         site: str = 'default') -> str:
+    """Awaitable generate_text(): the request does not hold a thread while Gemini works."""
+    model = get_model(model_name)
+    key = cache_key(prompt, model_name)
+    if use_cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    with metrics.track('gemini', site):
+        response = await model.generate_content_async(prompt)
+    text = response.text.strip()
+    if use_cache and text:
+        _cache.set(key, text)
+    return text
+
+
+async def astream_text(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                       site: str = 'default'):
+    """Async-iterator counterpart of stream_text()."""
+    model = get_model(model_name)
+    key = cache_key(prompt, model_name)
+    if use_cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    with metrics.track('gemini', site):
+        async for chunk in await model.generate_content_async(prompt, stream=True):
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    full = ''.join(parts).strip()
+    if use_cache and full:
+        _cache.set(key, full)
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a surrounding ```json ... ``` fence if the model added one."""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('```')[1]
+        if text.startswith('json'):
+            text = text[4:]
+    return text.strip()
+
+
+def generate_json(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                  site: str = 'default'):
+    """generate_text() + JSON decoding. Unparseable responses are evicted from the cache."""
+    text = generate_text(prompt, model_name, use_cache=use_cache, site=site)
+    try:
+        return json.loads(strip_code_fences(text))
+    except ValueError:
+        _cache.pop(cache_key(prompt, model_name))
+        raise
+
+
+async def agenerate_json(prompt: str, model_name: str = DEFAULT_MODEL, use_cache: bool = True,
+                         site: str = 'default'):
+    """Awaitable generate_json()."""
+    text = await agenerate_text(prompt, model_name, use_cache=use_cache, site=site)
+    try:
+        return json.loads(strip_code_fences(text))
+    except ValueError:
+        _cache.pop(cache_key(prompt, model_name))
+        raise
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+def clear_cache():
+    _cache.clear()
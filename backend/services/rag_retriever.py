@@ -0,0 +1,222 @@
+"""
+Retriever over the local learning-resource corpus (data/learning_resources.json,
+loaded and hot-reloaded by the data registry).
+
+Resources are tagged with canonical skills and a level. Retrieval for a gap
+skill first takes tag matches (ranked by level fit), then tops up from a FAISS
+index of the embedded corpus built offline and memory-mapped at runtime:
+
+    python -m services.rag_retriever build      # (re)embed the corpus
+    python -m services.rag_retriever query "Docker" --level Beginner
+
+Without the index (or without sentence-transformers/faiss) retrieval still
+works from the skill tags, so the no-LLM roadmap fallback gets real resources.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+
+from services.data_registry import registry, fold
+from services.skill_vector_builder import canonicalize
+from utils import embedding_utils, faiss_utils
+from utils.ttl_cache import TTLCache
+
+_BASE = os.path.dirname(os.path.dirname(__file__))
+CORPUS_PATH = os.path.join(_BASE, 'data', 'learning_resources.json')
+INDEX_DIR = os.getenv('RAG_INDEX_DIR', os.path.join(_BASE, 'instance', 'rag'))
+INDEX_PATH = os.path.join(INDEX_DIR, 'learning_resources.faiss')
+META_PATH = os.path.join(INDEX_DIR, 'learning_resources.meta.json')
+SIMILARITY_THRESHOLD = float(os.getenv('RAG_SIMILARITY_THRESHOLD', '0.45'))
+
+LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+# Gap severity → level of resource that fits best
+SEVERITY_LEVEL = {'critical': 'Beginner', 'partial': 'Intermediate'}
+
+
+def _corpus_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _resource_text(r: dict) -> str:
+    return f"{r['title']}. Skills: {', '.join(r.get('skills', []))}. Level: {r.get('level', '')}. {r.get('description', '')}"
+
+
+def build_index(corpus_path: str = CORPUS_PATH, index_path: str = INDEX_PATH, meta_path: str = META_PATH) -> int:
+    """Embed every resource and write the FAISS index plus a metadata file. Returns the count."""
+    with open(corpus_path) as f:
+        corpus = json.load(f)
+    vectors = embedding_utils.embed([_resource_text(r) for r in corpus])
+    faiss_utils.save_index(faiss_utils.build_index(vectors), index_path)
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'corpusSha256': _corpus_digest(corpus_path),
+            'ids': [r['id'] for r in corpus],
+            'model': embedding_utils.MODEL_NAME,
+        }, f)
+    return len(corpus)
+
+
+class ResourceRetriever:
+    """
+    Args:
+        corpus:        list of {id, title, url, type, skills, level, description};
+                       defaults to the data registry's learning_resources.json
+        corpus_digest: sha256 of the corpus file, matched against the index metadata
+        index_path:    FAISS index written by build_index(); optional
+    """
+
+    def __init__(self, corpus: list = None, corpus_digest: str = None, index_path: str = INDEX_PATH,
+                 meta_path: str = META_PATH, threshold: float = SIMILARITY_THRESHOLD):
+        if corpus is None:
+            snap = registry.snapshot()
+            corpus, corpus_digest = snap.resources, snap.digests['learning_resources']
+        self.corpus = corpus
+        self._corpus_digest = corpus_digest
+        self.threshold = threshold
+        self.by_skill = {}
+        for pos, r in enumerate(self.corpus):
+            for skill in canonicalize(r.get('skills', [])):
+                self.by_skill.setdefault(fold(skill), []).append(pos)
+        self._index = None
+        self._index_files = None    # (index, meta) mtimes the index was last checked against
+        self._index_lock = threading.Lock()
+        self._index_path, self._meta_path = index_path, meta_path
+        self._cache = TTLCache(max_entries=4096, ttl=0)
+
+    def _get_index(self):
+        """
+        Memory-mapped index, only if it was built from this corpus. Re-checked whenever
+        the index or its metadata changes on disk; a corpus change reloads the registry,
+        which replaces the retriever (see get_retriever()).
+        """
+        files = (_mtime(self._index_path), _mtime(self._meta_path))
+        if files == self._index_files:
+            return self._index
+        with self._index_lock:
+            if files != self._index_files:
+                self._index = None
+                try:
+                    if os.path.exists(self._index_path) and faiss_utils.is_available() \
+                            and embedding_utils.is_available():
+                        with open(self._meta_path) as f:
+                            meta = json.load(f)
+                        if meta.get('corpusSha256') == self._corpus_digest:
+                            self._index = faiss_utils.load_index(self._index_path, mmap=True)
+                        else:
+                            print("⚠  RAG index is stale — run `python -m services.rag_retriever build`")
+                except Exception as e:
+                    print(f"⚠  RAG index unavailable: {e}")
+                self._cache.clear()
+                self._index_files = files
+        return self._index
+
+    def warm(self):
+        """Open the index now rather than in the first lookup that needs it."""
+        self._get_index()
+
+    @staticmethod
+    def _level_distance(resource: dict, level: str) -> int:
+        if level not in LEVELS or resource.get('level') not in LEVELS:
+            return 0
+        return abs(LEVELS.index(resource['level']) - LEVELS.index(level))
+
+    def for_skill(self, skill: str, level: str = None, k: int = 3) -> list:
+        """Top-k resources for one skill, best level fit first."""
+        index = self._get_index()       # first, so a rebuilt index also drops cached answers
+        cache_key = (fold(skill), level, k)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        canonical = canonicalize([skill])[0]
+        tagged = self.by_skill.get(fold(canonical), [])
+        # Fewer tags = more focused resource; ties keep corpus order.
+        ranked = sorted(tagged, key=lambda p: (self._level_distance(self.corpus[p], level),
+                                               len(self.corpus[p].get('skills', []))))
+        picked = ranked[:k]
+
+        if len(picked) < k and index is not None:
+            query = embedding_utils.embed([f"Learn {canonical} ({level or 'any level'})"])
+            scores, ids = faiss_utils.search(index, query, k=k * 3)
+            for score, pos in zip(scores[0].tolist(), ids[0].tolist()):
+                if len(picked) >= k:
+                    break
+                if pos >= 0 and score >= self.threshold and pos not in picked:
+                    picked.append(pos)
+
+        result = [self.corpus[p] for p in picked]
+        self._cache.set(cache_key, result)
+        return result
+
+    def for_gaps(self, gaps: list, k: int = 2) -> dict:
+        """
+        Resources per gap. ``gaps`` may be skill names or gap dicts with skill/severity.
+
+        Returns:
+            {skill: [resource, ...]}
+        """
+        out = {}
+        for gap in gaps:
+            if isinstance(gap, dict):
+                skill, level = gap.get('skill', ''), SEVERITY_LEVEL.get(gap.get('severity'))
+            else:
+                skill, level = gap, None
+            if skill and skill not in out:
+                out[skill] = self.for_skill(skill, level, k)
+        return out
+
+
+def format_resource(resource: dict) -> str:
+    return f"{resource['title']} ({resource['url']})"
+
+
+_retriever = None
+_retriever_version = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> ResourceRetriever:
+    """Retriever over the corpus, rebuilt when the data registry (corpus or skill vocabulary) reloads."""
+    global _retriever, _retriever_version
+    version = registry.version
+    if _retriever is None or _retriever_version != version:
+        with _retriever_lock:
+            if _retriever is None or _retriever_version != version:
+                _retriever = ResourceRetriever()
+                _retriever_version = version
+    return _retriever
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Learning-resource retriever.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='embed the corpus into a FAISS index')
+    q = sub.add_parser('query', help='retrieve resources for a skill')
+    q.add_argument('skill')
+    q.add_argument('--level', choices=LEVELS)
+    q.add_argument('-k', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build_index()
+        print(f"✓ Indexed {count} resources → {INDEX_PATH}")
+    else:
+        for r in get_retriever().for_skill(args.skill, args.level, args.k):
+            print(f"[{r['level']:<12}] {format_resource(r)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
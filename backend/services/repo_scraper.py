@@ -1,90 +1,438 @@
 """
 Lightweight GitHub repo information scraper using the GitHub public API.
-Falls back to scraping the page with requests if the API rate-limits or fails.
+
+Requests go through one pooled keep-alive httpx client per process. Responses
+are kept in an on-disk ETag/Last-Modified cache so unchanged repos come back as
+304s (which do not count against the GitHub quota), and X-RateLimit-* headers
+are tracked so we stop calling the API before the quota runs out. Cache entries
+unused for GITHUB_CACHE_MAX_AGE_DAYS are evicted, as are the least recently used
+ones beyond GITHUB_CACHE_MAX_ENTRIES.
+
+The a*-prefixed coroutines do the same over an httpx.AsyncClient for the ASGI
+server (asgi.py), which closes it on shutdown with aclose(); both paths share
+the cache and the rate-limit state. Calls that reach GitHub are timed per
+endpoint kind (dependency "github" in /api/metrics).
 """
 
+import os
 import re
 import json
-import urllib.request
-import urllib.error
+import time
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics, tracing
+
+GITHUB_API = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+CACHE_DIR = os.getenv('GITHUB_CACHE_DIR', os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'instance', 'github_cache'))
+RATE_LIMIT_FLOOR = int(os.getenv('GITHUB_RATE_LIMIT_FLOOR', '5'))
+REQUEST_TIMEOUT = float(os.getenv('GITHUB_TIMEOUT', '10'))
+CACHE_MAX_AGE = float(os.getenv('GITHUB_CACHE_MAX_AGE_DAYS', '30')) * 86400
+CACHE_MAX_ENTRIES = int(os.getenv('GITHUB_CACHE_MAX_ENTRIES', '5000'))
+CACHE_EVICT_INTERVAL = 600      # seconds between eviction sweeps per process
+
+
+class RateLimited(RuntimeError):
+    """Raised when the GitHub quota is (nearly) exhausted and no cached copy exists."""
+
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        wait = max(0, int(reset_at - time.time()))
+        super().__init__(f'GitHub rate limit reached, resets in {wait}s')
+
+
+class GitHubError(RuntimeError):
+    """Non-2xx/304 response from the GitHub API."""
+
+    def __init__(self, status_code: int, url: str):
+        self.status_code = status_code
+        super().__init__(f'HTTP {status_code} for {url}')
+
+
+def _endpoint(path: str) -> str:
+    """Low-cardinality metrics label for an API path: '/repos/o/r/languages' → 'repo_languages'."""
+    parts = path.strip('/').split('/')
+    if parts[0] == 'repos':
+        return 'repo' if len(parts) <= 3 else f'repo_{parts[3]}'
+    if parts[0] == 'users' and len(parts) > 2:
+        return f'user_{parts[2]}'
+    return parts[0] or 'root'
+
+
+class GitHubClient:
+    """Pooled, conditional-request GitHub API client. Safe to share between threads."""
+
+    def __init__(self, base_url: str = GITHUB_API, cache_dir: str = CACHE_DIR,
+                 token: str = None, rate_limit_floor: int = RATE_LIMIT_FLOOR,
+                 max_connections: int = 20, fetch_workers: int = 8):
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.token = token if token is not None else os.getenv('GITHUB_TOKEN', '')
+        self.rate_limit_floor = rate_limit_floor
+        self.max_connections = max_connections
+        self.fetch_workers = fetch_workers
+        self._client = None
+        self._pool = None
+        self._pid = None
+        self._async_client = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+        self.remaining = None    # last seen X-RateLimit-Remaining
+        self.reset_at = 0.0      # last seen X-RateLimit-Reset (epoch seconds)
+
+    # ── Connection pool ──────────────────────────────────────────────────────
+    def _client_options(self) -> dict:
+        import httpx
+        headers = {
+            'User-Agent': 'SkillBridge/1.0',
+            'Accept': 'application/vnd.github.v3+json',
+        }
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return {
+            'base_url': self.base_url,
+            'headers': headers,
+            'timeout': REQUEST_TIMEOUT,
+            'limits': httpx.Limits(max_connections=self.max_connections,
+                                   max_keepalive_connections=self.max_connections),
+        }
+
+    def _ensure(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            import httpx
+            self._client = httpx.Client(**self._client_options())
+            self._pool = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='github-fetch')
+            self._pid = os.getpid()
+
+    def _ensure_async(self):
+        """One AsyncClient per event loop (an AsyncClient cannot be shared across loops)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is loop:
+            return self._async_client
+        with self._lock:
+            if self._async_loop is not loop:
+                import httpx
+                # A client left from another loop cannot be closed from this one; that loop
+                # is gone (aclose() was not awaited on it), so its connections are dropped.
+                self._async_client = httpx.AsyncClient(**self._client_options())
+                self._async_loop = loop
+            return self._async_client
+
+    async def aclose(self):
+        """Close this event loop's AsyncClient (ASGI shutdown)."""
+        with self._lock:
+            client = self._async_client if self._async_loop is asyncio.get_running_loop() else None
+            if client is not None:
+                self._async_client, self._async_loop = None, None
+        if client is not None:
+            await client.aclose()
 
+    def close(self):
+        """Close this process's sync client and fetch pool."""
+        with self._lock:
+            client, pool = self._client, self._pool
+            self._client, self._pool, self._pid = None, None, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        if client is not None:
+            client.close()
 
-def scrape_github_repo(url: str) -> dict:
+    # ── On-disk conditional-request cache ────────────────────────────────────
+    def _cache_path(self, path: str) -> str:
+        digest = hashlib.sha1(f'{self.base_url}{path}'.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.json')
+
+    def _cache_load(self, path: str):
+        try:
+            with open(self._cache_path(path)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_store(self, path: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = self._cache_path(path)
+        tmp = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp, target)
+        except OSError:
+            pass  # the cache is an optimisation; never fail a scrape because of it
+        self._cache_evict()
+
+    def _cache_touch(self, path: str):
+        """Mark an entry as used (a 304 or a rate-limited read), so eviction keeps it."""
+        try:
+            os.utime(self._cache_path(path))
+        except OSError:
+            pass
+
+    def _cache_evict(self, force: bool = False):
+        """Drop entries unused for CACHE_MAX_AGE and the least recently used beyond CACHE_MAX_ENTRIES."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_evict < CACHE_EVICT_INTERVAL:
+                return
+            self._last_evict = now
+        try:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for e in it:
+                    if e.is_file() and e.name.endswith('.json'):
+                        entries.append((e.stat().st_mtime, e.path))
+        except OSError:
+            return
+        entries.sort(reverse=True)          # most recently used first
+        for i, (mtime, entry_path) in enumerate(entries):
+            if i >= CACHE_MAX_ENTRIES or now - mtime > CACHE_MAX_AGE:
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+
+    # ── Rate limiting ────────────────────────────────────────────────────────
+    def _track_rate_limit(self, headers):
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        with self._lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def _near_limit(self) -> bool:
+        if self.remaining is None or self.remaining > self.rate_limit_floor:
+            return False
+        return time.time() < self.reset_at
+
+    def rate_limit(self) -> dict:
+        return {'remaining': self.remaining, 'resetAt': self.reset_at}
+
+    # ── Requests ─────────────────────────────────────────────────────────────
+    def _prepare(self, path: str, params: dict):
+        """
+        (cache_id, cached entry, conditional headers) for a request. Near the rate
+        limit the headers are None (serve the cached body) or RateLimited is raised.
+        """
+        cache_id = path if not params else f'{path}?{sorted(params.items())}'
+        cached = self._cache_load(cache_id)
+        if self._near_limit():
+            if cached is not None:
+                self._cache_touch(cache_id)
+                return cache_id, cached, None
+            raise RateLimited(self.reset_at)
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('lastModified'):
+                headers['If-Modified-Since'] = cached['lastModified']
+        return cache_id, cached, headers
+
+    def _finish(self, resp, path: str, cache_id: str, cached):
+        """Decode a response (or fall back to the cached body) and refresh the cache."""
+        self._track_rate_limit(resp.headers)
+
+        if resp.status_code == 304 and cached is not None:
+            self._cache_touch(cache_id)
+            return cached['body']
+        if resp.status_code in (403, 429) and self.remaining == 0:
+            if cached is not None:
+                return cached['body']
+            raise RateLimited(self.reset_at)
+        if resp.status_code >= 400:
+            raise GitHubError(resp.status_code, path)
+
+        body = resp.json()
+        if resp.headers.get('ETag') or resp.headers.get('Last-Modified'):
+            self._cache_store(cache_id, {
+                'etag': resp.headers.get('ETag'),
+                'lastModified': resp.headers.get('Last-Modified'),
+                'body': body,
+                'fetchedAt': datetime.utcnow().isoformat(),
+            })
+        return body
+
+    def get_json(self, path: str, params: dict = None):
+        """
+        GET an API path (e.g. '/repos/o/r') and return decoded JSON.
+
+        Sends If-None-Match / If-Modified-Since from the disk cache and serves the
+        cached body on 304. Near the rate limit, serves the cached body without
+        calling GitHub, or raises RateLimited if there is none.
+        """
+        self._ensure()
+        cache_id, cached, headers = self._prepare(path, params)
+        if headers is None:
+            return cached['body']
+        with metrics.track('github', _endpoint(path)):
+            resp = self._client.get(path, params=params, headers=headers)
+            return self._finish(resp, path, cache_id, cached)
+
+    async def aget_json(self, path: str, params: dict = None):
+        """Awaitable get_json()."""
+        client = self._ensure_async()
+        cache_id, cached, headers = self._prepare(path, params)
+        if headers is None:
+            return cached['body']
+        with metrics.track('github', _endpoint(path)):
+            resp = await client.get(path, params=params, headers=headers)
+            return self._finish(resp, path, cache_id, cached)
+
+    def get_many(self, paths: list) -> list:
+        """Fetch several API paths concurrently; results are in the same order."""
+        self._ensure()
+        futures = [tracing.submit(self._pool, self.get_json, p) for p in paths]
+        return [f.result() for f in futures]
+
+    async def aget_many(self, paths: list) -> list:
+        """Awaitable get_many(): the paths are fetched concurrently on the event loop."""
+        return list(await asyncio.gather(*(self.aget_json(p) for p in paths)))
+
+
+_client = GitHubClient()
+
+
+def get_client() -> GitHubClient:
+    return _client
+
+
+def _parse_repo_url(url: str):
+    match = re.search(r'github\.com/([^/]+)/([^/]+)', url)
+    if not match:
+        raise ValueError(f"Cannot parse GitHub URL: {url}")
+    owner, repo = match.group(1), match.group(2)
+    if repo.endswith('.git'):
+        repo = repo[:-4]
+    return owner, repo
+
+
+def _partial_result(url, owner, repo, description):
+    return {
+        'url': url,
+        'name': f"{owner}/{repo}",
+        'description': description,
+        'techStack': [],
+        'stars': 0,
+        'language': 'Unknown',
+        'lastCommit': '',
+        'scrapedAt': datetime.utcnow().isoformat(),
+        'partial': True,
+    }
+
+
+def _user_repos_request(username: str, limit: int):
+    if not re.fullmatch(r'[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})', username or ''):
+        raise ValueError(f"Invalid GitHub username: {username}")
+    return f"/users/{username}/repos", {
+        'per_page': min(max(limit, 1), 100),
+        'sort': 'pushed',
+        'type': 'owner',
+    }
+
+
+def _repo_urls(repos: list, limit: int, include_forks: bool) -> list:
+    urls = [r['html_url'] for r in repos if include_forks or not r.get('fork')]
+    return urls[:limit]
+
+
+def list_user_repos(username: str, limit: int = 30, include_forks: bool = False) -> list:
+    """
+    List a GitHub user's public repositories, most recently pushed first.
+
+    Returns:
+        list of repo URLs (at most ``limit``)
+    """
+    path, params = _user_repos_request(username, limit)
+    return _repo_urls(_client.get_json(path, params=params), limit, include_forks)
+
+
+async def alist_user_repos(username: str, limit: int = 30, include_forks: bool = False) -> list:
+    """Awaitable list_user_repos()."""
+    path, params = _user_repos_request(username, limit)
+    return _repo_urls(await _client.aget_json(path, params=params), limit, include_forks)
+
+
+def _repo_paths(owner: str, repo: str) -> list:
+    return [f"/repos/{owner}/{repo}", f"/repos/{owner}/{repo}/languages"]
+
+
+def _repo_result(url, owner, repo, repo_data, langs_data) -> dict:
+    tech_stack = list(langs_data.keys())[:6]
+    # Add topics as extra tech indicators
+    topics = repo_data.get('topics', [])
+    for t in topics[:4]:
+        if t not in tech_stack:
+            tech_stack.append(t)
+
+    return {
+        'url': url,
+        'name': repo_data.get('full_name', f"{owner}/{repo}"),
+        'description': repo_data.get('description') or 'No description provided',
+        'techStack': tech_stack,
+        'stars': repo_data.get('stargazers_count', 0),
+        'language': repo_data.get('language', 'Unknown'),
+        'lastCommit': repo_data.get('pushed_at', ''),
+        'scrapedAt': datetime.utcnow().isoformat(),
+    }
+
+
+def scrape_github_repo(url: str, raise_errors: bool = False) -> dict:
     """
     Fetch public metadata for a GitHub repository.
 
     Args:
         url: GitHub repo URL, e.g. https://github.com/user/repo
+        raise_errors: raise instead of returning a partial result when the API call fails
 
     Returns:
         dict with keys: url, name, description, techStack, stars, lastCommit, language
+        (plus ``partial: True`` when the API call failed and only the URL parts are known)
     """
     url = url.rstrip('/')
 
     # Parse owner/repo from URL
-    match = re.search(r'github\.com/([^/]+)/([^/]+)', url)
-    if not match:
-        raise ValueError(f"Cannot parse GitHub URL: {url}")
-
-    owner, repo = match.group(1), match.group(2)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}"
-    langs_url = f"https://api.github.com/repos/{owner}/{repo}/languages"
+    owner, repo = _parse_repo_url(url)
 
     try:
-        # Fetch repo info
-        req = urllib.request.Request(api_url, headers={
-            'User-Agent': 'SkillBridge/1.0',
-            'Accept': 'application/vnd.github.v3+json',
-        })
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            repo_data = json.loads(resp.read().decode())
+        # Repo info and languages are fetched concurrently over the shared pool
+        repo_data, langs_data = _client.get_many(_repo_paths(owner, repo))
+        return _repo_result(url, owner, repo, repo_data, langs_data)
 
-        # Fetch languages
-        req2 = urllib.request.Request(langs_url, headers={
-            'User-Agent': 'SkillBridge/1.0',
-            'Accept': 'application/vnd.github.v3+json',
-        })
-        with urllib.request.urlopen(req2, timeout=10) as resp2:
-            langs_data = json.loads(resp2.read().decode())
+    except Exception as e:
+        if raise_errors:
+            raise
+        # Return partial data if API fails
+        return _partial_result(url, owner, repo, _describe_error(e))
 
-        tech_stack = list(langs_data.keys())[:6]
-        # Add topics as extra tech indicators
-        topics = repo_data.get('topics', [])
-        for t in topics[:4]:
-            if t not in tech_stack:
-                tech_stack.append(t)
 
-        return {
-            'url': url,
-            'name': repo_data.get('full_name', f"{owner}/{repo}"),
-            'description': repo_data.get('description') or 'No description provided',
-            'techStack': tech_stack,
-            'stars': repo_data.get('stargazers_count', 0),
-            'language': repo_data.get('language', 'Unknown'),
-            'lastCommit': repo_data.get('pushed_at', ''),
-            'scrapedAt': __import__('datetime').datetime.utcnow().isoformat(),
-        }
-
-    except urllib.error.HTTPError as e:
-        # Return partial data if API fails
-        return {
-            'url': url,
-            'name': f"{owner}/{repo}",
-            'description': f'Could not fetch repo details (HTTP {e.code})',
-            'techStack': [],
-            'stars': 0,
-            'language': 'Unknown',
-            'lastCommit': '',
-            'scrapedAt': __import__('datetime').datetime.utcnow().isoformat(),
-        }
+async def ascrape_github_repo(url: str, raise_errors: bool = False) -> dict:
+    """Awaitable scrape_github_repo()."""
+    url = url.rstrip('/')
+    owner, repo = _parse_repo_url(url)
+    try:
+        repo_data, langs_data = await _client.aget_many(_repo_paths(owner, repo))
+        return _repo_result(url, owner, repo, repo_data, langs_data)
     except Exception as e:
-        return {
-            'url': url,
-            'name': f"{owner}/{repo}",
-            'description': f'Error fetching repo: {str(e)}',
-            'techStack': [],
-            'stars': 0,
-            'language': 'Unknown',
-            'lastCommit': '',
-            'scrapedAt': __import__('datetime').datetime.utcnow().isoformat(),
-        }
+        if raise_errors:
+            raise
+        return _partial_result(url, owner, repo, _describe_error(e))
+
+
+def _describe_error(e: Exception) -> str:
+    if isinstance(e, GitHubError):
+        return f'Could not fetch repo details (HTTP {e.status_code})'
+    if isinstance(e, RateLimited):
+        return f'Could not fetch repo details ({e})'
+    return f'Error fetching repo: {str(e)}'
@@ -2,26 +2,39 @@
 Resume parser — extracts structured info from a PDF resume using PyMuPDF + Gemini.
 """
 
-import os
-import io
+from services import llm_service
+from utils import metrics, tracing
 
-def parse_resume(pdf_bytes: bytes, filename: str = 'resume.pdf') -> dict:
+def parse_resume(pdf_bytes: bytes, filename: str = 'resume.pdf', on_progress=None,
+                 fallback: bool = True) -> dict:
     """
     Parse a PDF resume and return structured data.
 
+    Args:
+        on_progress: optional callback receiving the current stage name
+                     ('extracting', 'structuring') — used by the background job queue
+        fallback:    on a Gemini error, fall back to keyword extraction; when False
+                     the error is raised so the job queue can retry
+
     Returns:
         { skills, achievements, experience, publications, summary }
     """
+    report = on_progress or (lambda stage: None)
+
     # ── Step 1: Extract raw text with PyMuPDF ──────────────────────────────
+    report('extracting')
     raw_text = ''
-    try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(stream=pdf_bytes, filetype='pdf')
-        for page in doc:
-            raw_text += page.get_text()
-        doc.close()
-    except Exception as e:
-        raw_text = f'[PDF text extraction failed: {e}]'
+    with tracing.span('resume.extract', bytes=len(pdf_bytes)):
+        try:
+            import fitz  # PyMuPDF
+            with metrics.track('pymupdf', 'extract_text'):
+                doc = fitz.open(stream=pdf_bytes, filetype='pdf')
+                for page in doc:
+                    raw_text += page.get_text()
+                doc.close()
+        except (ImportError, RuntimeError) as e:
+            # PyMuPDF missing, or a damaged / non-PDF upload (fitz.FileDataError): retrying will not help.
+            raw_text = f'[PDF text extraction failed: {e}]'
 
     if not raw_text.strip():
         return {
@@ -33,13 +46,9 @@ def parse_resume(pdf_bytes: bytes, filename: str = 'resume.pdf') -> dict:
         }
 
     # ── Step 2: Call Gemini to structure the text ──────────────────────────
-    gemini_key = os.getenv('GEMINI_API_KEY', '')
-    if gemini_key:
+    report('structuring')
+    if llm_service.is_configured():
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=gemini_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-
             prompt = f"""You are a resume parser. Extract structured information from the resume text below.
 
 Return ONLY a valid JSON object with these keys:
@@ -56,18 +65,13 @@ Resume Text:
 
 JSON only, no markdown:"""
 
-            response = model.generate_content(prompt)
-            text = response.text.strip()
-            # Remove markdown code fences if present
-            if text.startswith('```'):
-                text = text.split('```')[1]
-                if text.startswith('json'):
-                    text = text[4:]
-            import json
-            parsed = json.loads(text.strip())
+            with tracing.span('resume.structure', chars=min(len(raw_text), 4000)):
+                parsed = llm_service.generate_json(prompt, site='resume_structuring')
             return parsed
-        except Exception as e:
-            pass  # fall back to simple extraction below
+        except Exception:
+            if not fallback:
+                raise
+            # fall back to simple extraction below
 
     # ── Step 3: Fallback — simple keyword extraction ─────────────────────
     tech_keywords = [
@@ -76,7 +80,8 @@ JSON only, no markdown:"""
         'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Linux',
         'HTML', 'CSS', 'Express', 'Spring', 'Kubernetes', 'Redis',
     ]
-    found_skills = [kw for kw in tech_keywords if kw.lower() in raw_text.lower()]
+    with tracing.span('resume.fallback'):
+        found_skills = [kw for kw in tech_keywords if kw.lower() in raw_text.lower()]
 
     return {
         'skills': found_skills,
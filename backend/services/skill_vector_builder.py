@@ -0,0 +1,152 @@
+"""
+Skill-name canonicalisation — maps free-text skill names ("ReactJS", "react.js",
+"k8s") onto the canonical vocabulary used by the benchmark data.
+
+Resolution order:
+  1. memoised alias table (every previous answer, so repeats never touch the model)
+  2. punctuation/suffix-insensitive exact match and a small static alias list
+  3. nearest neighbour in a FAISS index of the embedded vocabulary, accepted only
+     above a cosine-similarity threshold
+
+Step 3 is skipped when sentence-transformers or faiss are not installed.
+"""
+
+import os
+import re
+import threading
+
+from services.data_registry import registry, fold
+from utils import embedding_utils, faiss_utils
+from utils.ttl_cache import TTLCache
+
+SIMILARITY_THRESHOLD = float(os.getenv('SKILL_MATCH_THRESHOLD', '0.8'))
+SEMANTIC_MATCHING = os.getenv('SKILL_SEMANTIC_MATCHING', '1') != '0'
+
+# Common abbreviations the embedding model cannot be expected to know.
+STATIC_ALIASES = {
+    'js': 'JavaScript', 'ecmascript': 'JavaScript',
+    'ts': 'TypeScript',
+    'k8s': 'Kubernetes',
+    'ml': 'Machine Learning', 'dl': 'Deep Learning',
+    'html': 'HTML/CSS', 'css': 'HTML/CSS', 'html5': 'HTML/CSS', 'css3': 'HTML/CSS',
+    'rest': 'REST APIs', 'restapi': 'REST APIs', 'restfulapis': 'REST APIs',
+    'postgres': 'PostgreSQL', 'mongo': 'MongoDB',
+    'dsa': 'DSA', 'datastructures': 'DSA', 'datastructuresandalgorithms': 'DSA',
+    'amazonwebservices': 'AWS',
+}
+
+
+def normalize(name: str) -> str:
+    """Lookup key ignoring case, spaces and punctuation, and a trailing 'js' ('react.js' → 'react')."""
+    key = re.sub(r'[\s._\-]+', '', fold(name))
+    if key.endswith('js') and len(key) > 4:
+        key = key[:-2]
+    return key
+
+
+class SkillCanonicalizer:
+    """
+    Args:
+        vocabulary: canonical skill names
+        threshold:  minimum cosine similarity for a semantic match
+        semantic:   allow the embedding/FAISS fallback
+    """
+
+    def __init__(self, vocabulary: list, threshold: float = SIMILARITY_THRESHOLD,
+                 semantic: bool = SEMANTIC_MATCHING, memo_size: int = 20000):
+        self.vocabulary = list(dict.fromkeys(vocabulary))
+        self.threshold = threshold
+        self.semantic = semantic
+        self._exact = {normalize(v): v for v in self.vocabulary}
+        for alias, target in STATIC_ALIASES.items():
+            if target in self.vocabulary:
+                self._exact.setdefault(alias, target)
+        self._memo = TTLCache(max_entries=memo_size, ttl=0)
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    # ── Semantic fallback ────────────────────────────────────────────────────
+    def _semantic_ready(self) -> bool:
+        if not self.semantic:
+            return False
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    try:
+                        if not (embedding_utils.is_available() and faiss_utils.is_available()):
+                            raise ImportError('sentence-transformers / faiss not installed')
+                        self._index = faiss_utils.build_index(embedding_utils.embed(self.vocabulary))
+                    except Exception as e:
+                        print(f"⚠  Semantic skill matching disabled: {e}")
+                        self.semantic = False
+                        return False
+        return True
+
+    def _nearest(self, names: list) -> list:
+        if not names or not self._semantic_ready():
+            return [None] * len(names)
+        try:
+            scores, ids = faiss_utils.search(self._index, embedding_utils.embed(names), k=1)
+        except Exception as e:
+            print(f"⚠  Semantic skill lookup failed: {e}")
+            return [None] * len(names)
+        return [
+            self.vocabulary[i] if i >= 0 and score >= self.threshold else None
+            for score, i in zip(scores[:, 0].tolist(), ids[:, 0].tolist())
+        ]
+
+    # ── Public API ───────────────────────────────────────────────────────────
+    def resolve_many(self, names: list) -> list:
+        """Canonical name for each input, or the input itself when nothing is close enough."""
+        out, pending = [], {}
+        for pos, name in enumerate(names):
+            key = fold(name)
+            hit = self._memo.get(key)
+            if hit is None:
+                hit = self._exact.get(normalize(name))
+                if hit is None:
+                    pending.setdefault(key, []).append(pos)
+                else:
+                    self._memo.set(key, hit)
+            out.append(hit)
+
+        if pending:
+            keys = list(pending)
+            originals = [names[pending[k][0]] for k in keys]
+            for key, original, match in zip(keys, originals, self._nearest(originals)):
+                resolved = match or original.strip()
+                self._memo.set(key, resolved)
+                for pos in pending[key]:
+                    out[pos] = resolved
+        return out
+
+    def warm(self) -> bool:
+        """Load the embedding model and build the vocabulary index now; False if semantic matching is off."""
+        return self._semantic_ready()
+
+    def resolve(self, name: str) -> str:
+        return self.resolve_many([name])[0]
+
+    def stats(self) -> dict:
+        return {'vocabulary': len(self.vocabulary), 'semantic': self.semantic, 'memo': self._memo.stats()}
+
+
+_canonicalizer = None
+_canonicalizer_version = None
+_canonicalizer_lock = threading.Lock()
+
+
+def get_canonicalizer() -> SkillCanonicalizer:
+    """Canonicaliser over the registry's skill vocabulary, rebuilt when the data files reload."""
+    global _canonicalizer, _canonicalizer_version
+    version = registry.version
+    if _canonicalizer is None or _canonicalizer_version != version:
+        with _canonicalizer_lock:
+            if _canonicalizer is None or _canonicalizer_version != version:
+                _canonicalizer = SkillCanonicalizer(registry.skill_vocabulary())
+                _canonicalizer_version = version
+    return _canonicalizer
+
+
+def canonicalize(names: list) -> list:
+    return get_canonicalizer().resolve_many(names)
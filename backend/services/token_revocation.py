@@ -0,0 +1,153 @@
+"""
+JWT revocation store — revoked token ids (JTIs) persisted in Firestore, checked in memory.
+
+    token_blacklist/{jti}    {jti, type, owner, expiresAt, revokedAt}
+
+Every worker keeps the set of revoked, not-yet-expired JTIs in a dict, so the
+check flask-jwt-extended runs on each @jwt_required request is a dict lookup and
+never a Firestore read. The set is loaded once per process on the first check
+and then kept current by a background thread that pulls entries revoked since
+its last sync (``revokedAt``) every SYNC_SECONDS. A token revoked on one worker
+is rejected there immediately and by the others within one sync interval.
+
+Entries are only needed until the token would have expired anyway: expired JTIs
+are dropped from memory on each sync, and every COMPACT_SECONDS a worker deletes
+expired documents from Firestore.
+"""
+
+import os
+import time
+import random
+import threading
+
+from utils import metrics
+from utils.firebase_config import get_db
+
+COLLECTION = 'token_blacklist'
+SYNC_SECONDS = float(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '10'))
+COMPACT_SECONDS = float(os.getenv('TOKEN_REVOCATION_COMPACT_SECONDS', '3600'))
+COMPACT_BATCH = 400
+CLOCK_SKEW = 60     # seconds of overlap between syncs, for revokedAt stamped by other hosts
+
+
+class RevocationStore:
+    def __init__(self, db_factory=get_db, sync_seconds: float = SYNC_SECONDS,
+                 compact_seconds: float = COMPACT_SECONDS):
+        self._db = db_factory
+        self.sync_seconds = sync_seconds
+        self.compact_seconds = compact_seconds
+        self._revoked = {}           # jti -> expiresAt (epoch seconds)
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()   # held through the initial load
+        self._loaded_pid = None
+        self._last_sync = 0.0        # revokedAt high-water mark of the last successful sync
+        self._next_compact = 0.0
+        self._wakeup = threading.Event()
+
+    def _collection(self):
+        return self._db().collection(COLLECTION)
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+    def revoke(self, jti: str, expires_at: float, token_type: str = 'access', owner: str = None):
+        """Persist a revoked JTI until ``expires_at`` and reject it in this worker right away."""
+        if not jti or expires_at <= time.time():
+            return
+        with metrics.track('firestore', 'set'):
+            self._collection().document(jti).set({
+                'jti': jti,
+                'type': token_type,
+                'owner': owner,
+                'expiresAt': float(expires_at),
+                'revokedAt': time.time(),
+            })
+        with self._lock:
+            self._revoked[jti] = float(expires_at)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+    def is_revoked(self, jti: str) -> bool:
+        self.start()
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def stats(self) -> dict:
+        return {
+            'revoked': len(self._revoked),
+            'lastSync': self._last_sync,
+            'syncSeconds': self.sync_seconds,
+        }
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+    def start(self):
+        """
+        Load the full set and start the sync thread once per process (restarts after fork).
+        Concurrent callers block until the initial load has finished.
+        """
+        if self._loaded_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._loaded_pid == os.getpid():
+                return
+            with self._lock:
+                self._revoked = {}
+                self._last_sync = 0.0
+                self._next_compact = time.time() + random.uniform(0, self.compact_seconds)
+            self.sync()
+            self._loaded_pid = os.getpid()
+        threading.Thread(target=self._run, name='token-revocation-sync', daemon=True).start()
+
+    def sync(self):
+        """Pull JTIs revoked since the last sync and drop expired ones from memory."""
+        started = time.time()
+        try:
+            query = self._collection()
+            if self._last_sync:
+                query = query.where('revokedAt', '>=', self._last_sync - CLOCK_SKEW)
+            fetched = {}
+            with metrics.track('firestore', 'query'):
+                for snap in query.stream():
+                    entry = snap.to_dict() or {}
+                    fetched[snap.id] = float(entry.get('expiresAt') or 0)
+        except Exception as e:
+            # Keep serving from the last known set; the next sync retries.
+            print(f"⚠  Token revocation sync failed: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            self._revoked.update(fetched)
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._last_sync = started
+
+    def compact(self) -> int:
+        """Delete expired revocation documents; returns how many were removed."""
+        removed = 0
+        while True:
+            with metrics.track('firestore', 'query'):
+                expired = list(self._collection().where('expiresAt', '<', time.time())
+                               .limit(COMPACT_BATCH).stream())
+            if not expired:
+                return removed
+            batch = self._db().batch()
+            for snap in expired:
+                batch.delete(snap.reference)
+            with metrics.track('firestore', 'batch_commit'):
+                batch.commit()
+            removed += len(expired)
+            if len(expired) < COMPACT_BATCH:
+                return removed
+
+    def _run(self):
+        pid = os.getpid()
+        while self._loaded_pid == pid:
+            self._wakeup.wait(self.sync_seconds)
+            self._wakeup.clear()
+            self.sync()
+            if time.time() >= self._next_compact:
+                # Jittered so the workers of a deployment do not all compact at once.
+                self._next_compact = time.time() + self.compact_seconds * random.uniform(0.8, 1.2)
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"⚠  Token revocation compaction failed: {e}")
+
+
+revocation_store = RevocationStore()
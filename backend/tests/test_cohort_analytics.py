@@ -0,0 +1,49 @@
+"""Cohort aggregation run end to end against the in-memory Firestore stand-in."""
+
+from services import cohort_analytics
+from utils.local_firestore import LocalFirestore
+
+
+def _user(college, career, skills):
+    return {
+        'profile': {'college': college, 'branch': 'CSE', 'careerInterest': career},
+        'dashboard': {'skills': [{'name': name, 'score': score} for name, score in skills]},
+    }
+
+
+def _db():
+    users = {f'big{i}@example.com': _user('Big College', 'Full Stack Developer',
+                                          [('JavaScript', 80), ('React', 40 + i)])
+             for i in range(6)}
+    users['solo@example.com'] = _user('Tiny College', 'Data Scientist', [('Python', 90)])
+    return LocalFirestore().load_dict({'users': users})
+
+
+def test_run_pages_through_every_user():
+    summaries = cohort_analytics.run(_db(), page_size=2)
+
+    assert set(summaries) == set(cohort_analytics.DIMENSIONS) | {'overall'}
+    overall = summaries['overall']
+    assert overall['usersProcessed'] == 7
+    assert overall['groups'][0]['users'] == 7
+    assert sum(overall['groups'][0]['overallMatchHistogram'].values()) == 7
+
+
+def test_small_groups_are_withheld():
+    summaries = cohort_analytics.run(_db(), page_size=3, min_group_size=1)
+
+    colleges = {g['key']: g for g in summaries['college']['groups']}
+    assert set(colleges) == {'Big College'}
+    assert colleges['Big College']['users'] == 6
+    assert summaries['college']['minGroupSize'] == cohort_analytics.MIN_GROUP_SIZE
+    careers = {g['key'] for g in summaries['careerInterest']['groups']}
+    assert 'Data Scientist' not in careers
+
+
+def test_summaries_round_trip_through_the_summary_collection():
+    db = _db()
+    summaries = cohort_analytics.run(db)
+    cohort_analytics.write_summaries(db, summaries)
+
+    stored = {doc.id: doc.to_dict() for doc in db.collection(cohort_analytics.SUMMARY_COLLECTION).stream()}
+    assert stored == summaries
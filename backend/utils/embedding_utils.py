@@ -0,0 +1,43 @@
+"""
+Sentence-embedding helpers (sentence-transformers), loaded lazily once per process.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+MODEL_NAME = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def is_available() -> bool:
+    try:
+        import sentence_transformers  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_model(model_name: str = MODEL_NAME):
+    """Return the process-wide SentenceTransformer, loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(model_name)
+    return _model
+
+
+def embed(texts: list, batch_size: int = 64) -> np.ndarray:
+    """Embed texts into L2-normalised float32 vectors (rows), ready for inner-product search."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    vectors = get_model().encode(
+        list(texts), batch_size=batch_size,
+        normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False,
+    )
+    return np.ascontiguousarray(vectors, dtype=np.float32)
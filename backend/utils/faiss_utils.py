@@ -0,0 +1,48 @@
+"""
+FAISS index helpers — inner-product (cosine, on normalised vectors) search.
+"""
+
+import os
+
+import numpy as np
+
+
+def is_available() -> bool:
+    try:
+        import faiss  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_index(vectors: np.ndarray):
+    """Exact inner-product index over the rows of ``vectors`` (row i has id i)."""
+    import faiss
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def search(index, queries: np.ndarray, k: int = 1):
+    """
+    Returns:
+        (scores, ids) arrays of shape (len(queries), k); ids are -1 where fewer than k hits
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    return index.search(queries, min(k, max(index.ntotal, 1)))
+
+
+def save_index(index, path: str):
+    import faiss
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    faiss.write_index(index, path)
+
+
+def load_index(path: str, mmap: bool = True):
+    """Load an index from disk, memory-mapped by default so workers share the pages."""
+    import faiss
+    # IO_FLAG_MMAP_IFC memory-maps flat (IndexFlatCodes) indexes; older faiss only has IO_FLAG_MMAP.
+    mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+    flags = (mmap_flag | faiss.IO_FLAG_READ_ONLY) if mmap else 0
+    return faiss.read_index(path, flags)
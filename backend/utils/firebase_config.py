@@ -1,8 +1,80 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+"""
+Lazy, fork-aware Firebase Admin / Firestore initialisation.
+
+Nothing is created at import time. get_db() initialises the Firebase app and the
+Firestore client on first use in each process; a client created before a fork
+(e.g. in a preloading server master) is discarded in the child and rebuilt,
+because its gRPC channel cannot be shared across processes.
+"""
+
 import os
+import threading
+
+_BASE = os.path.dirname(os.path.dirname(__file__))
+SERVICE_ACCOUNT_PATH = os.getenv(
+    "FIREBASE_CREDENTIALS", os.path.join(_BASE, "firebase", "serviceAccountKey.json"))
+
+_db = None
+_db_pid = None
+_lock = threading.Lock()
+
+
+def set_credentials_path(path: str):
+    """Use this service-account file for clients created from now on (app config)."""
+    global SERVICE_ACCOUNT_PATH
+    SERVICE_ACCOUNT_PATH = path
+
+
+def init_firebase(credentials_path: str = None):
+    """Initialise the default Firebase app once per process (no-op if already done)."""
+    import firebase_admin
+    from firebase_admin import credentials
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(credentials_path or SERVICE_ACCOUNT_PATH)
+        firebase_admin.initialize_app(cred)
+    return firebase_admin.get_app()
+
+
+def get_db():
+    """Process-wide Firestore client, created on first use."""
+    global _db, _db_pid
+    if _db is not None and _db_pid == os.getpid():
+        return _db
+    with _lock:
+        if _db is None or _db_pid != os.getpid():
+            import firebase_admin
+            from firebase_admin import firestore
+            if _db is not None:
+                # Inherited from the parent process: drop the app (and its cached client).
+                firebase_admin.delete_app(firebase_admin.get_app())
+            init_firebase()
+            _db, _db_pid = firestore.client(), os.getpid()
+    return _db
+
+
+# ── Write transforms ─────────────────────────────────────────────────────────
+try:
+    from google.cloud.firestore import Increment, ArrayUnion, ArrayRemove, DELETE_FIELD
+except ImportError:
+    # Without the SDK (local stand-in, benchmarks) use look-alikes; utils.local_firestore
+    # recognises transforms by class name.
+    class Increment:
+        def __init__(self, value):
+            self.value = value
+
+    class ArrayUnion:
+        def __init__(self, values):
+            self.values = list(values)
+
+    class ArrayRemove:
+        def __init__(self, values):
+            self.values = list(values)
+
+    class Sentinel:
+        def __init__(self, description):
+            self.description = description
 
-cred = credentials.Certificate("firebase/serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
+        def __repr__(self):
+            return f"Sentinel: {self.description}"
 
-db = firestore.client()
\ No newline at end of file
+    DELETE_FIELD = Sentinel("Value used to delete a field in a document.")
@@ -0,0 +1,88 @@
+"""
+Incremental parser for a streamed top-level JSON array.
+
+Feed it text chunks as they arrive (e.g. from a streaming LLM response) and it
+returns each array element as soon as its closing brace/bracket has been seen,
+without waiting for the rest of the array. Anything before the opening '['
+(such as a ```json fence) is skipped.
+
+    parser = JSONArrayStream()
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            ...
+"""
+
+import json
+
+
+class JSONArrayStream:
+    def __init__(self):
+        self._buf = ''
+        self._pos = 0            # next character of _buf to scan
+        self._started = False    # seen the opening '['
+        self._finished = False   # seen the closing ']'
+        self._depth = 0          # nesting depth inside the current element
+        self._in_string = False
+        self._escape = False
+        self._start = None       # index in _buf where the current element begins
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> list:
+        """Consume a chunk; return the elements completed by it (decoded)."""
+        self._buf += chunk
+        items = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self._finished:
+            c = buf[i]
+            if not self._started:
+                if c == '[':
+                    self._started = True
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+                if self._start is None:
+                    self._start = i
+            elif c in '{[':
+                if self._start is None:
+                    self._start = i
+                self._depth += 1
+            elif c in '}]':
+                if self._depth == 0:                 # closing bracket of the array itself
+                    self._emit_scalar(buf, i, items)
+                    self._finished = True
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        items.append(json.loads(buf[self._start:i + 1]))
+                        self._start = None
+            elif c == ',' and self._depth == 0:
+                self._emit_scalar(buf, i, items)
+            elif self._start is None and not c.isspace():
+                self._start = i                     # number / true / false / null
+            i += 1
+
+        # Drop what has been fully consumed so the buffer stays small.
+        keep = self._start if self._start is not None else i
+        self._buf = buf[keep:]
+        self._pos = i - keep
+        if self._start is not None:
+            self._start = 0
+        return items
+
+    def _emit_scalar(self, buf: str, end: int, items: list):
+        """Emit a top-level scalar element ending just before ``end``."""
+        if self._start is not None and self._depth == 0:
+            text = buf[self._start:end].strip()
+            if text:
+                items.append(json.loads(text))
+            self._start = None
@@ -0,0 +1,441 @@
+"""
+In-memory stand-in for the Firestore client used by firebase_admin.
+
+Implements the subset of the google-cloud-firestore API this backend uses —
+collections/documents/subcollections, set (with merge), update with dotted
+paths, field-path projections, where/order_by/limit/start_after queries,
+get_all, batches and the Increment / ArrayUnion / ArrayRemove / DELETE_FIELD
+transforms — so routes, the cohort pipeline and the benchmarks can run
+without credentials or network access.
+"""
+
+import copy
+import json
+import threading
+import uuid
+from datetime import datetime
+
+DOCUMENT_ID = '__name__'
+
+
+class AlreadyExists(Exception):
+    """Raised by create() like google.api_core.exceptions.AlreadyExists (matched by name)."""
+
+
+# ── Value helpers ────────────────────────────────────────────────────────────
+def _split(path: str) -> list:
+    return path.split('.') if path else []
+
+
+def _get_path(data: dict, path: str):
+    cur = data
+    for part in _split(path):
+        if not isinstance(cur, dict) or part not in cur:
+            raise KeyError(path)
+        cur = cur[part]
+    return cur
+
+
+def _transform(current, value):
+    """Apply a Firestore transform sentinel (matched by class name) to a current value."""
+    kind = type(value).__name__
+    if kind == 'Increment':
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if kind == 'ArrayUnion':
+        out = list(current) if isinstance(current, list) else []
+        out.extend(v for v in value.values if v not in out)
+        return out
+    if kind == 'ArrayRemove':
+        return [v for v in (current if isinstance(current, list) else []) if v not in value.values]
+    if kind == 'Sentinel' and 'timestamp' in repr(value).lower():
+        return datetime.utcnow()
+    return copy.deepcopy(value)
+
+
+def _is_delete(value) -> bool:
+    return type(value).__name__ == 'Sentinel' and 'delete' in repr(value).lower()
+
+
+def _set_path(data: dict, path: str, value):
+    parts = _split(path)
+    cur = data
+    for part in parts[:-1]:
+        if not isinstance(cur.get(part), dict):
+            cur[part] = {}
+        cur = cur[part]
+    if _is_delete(value):
+        cur.pop(parts[-1], None)
+    else:
+        cur[parts[-1]] = _transform(cur.get(parts[-1]), value)
+
+
+def _merge(target: dict, source: dict):
+    for key, value in source.items():
+        if isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value)
+        elif _is_delete(value):
+            target.pop(key, None)
+        else:
+            target[key] = _transform(target.get(key), value)
+
+
+def _project(data: dict, field_paths) -> dict:
+    out = {}
+    for path in field_paths:
+        try:
+            value = _get_path(data, path)
+        except KeyError:
+            continue
+        _set_path(out, path, copy.deepcopy(value))
+    return out
+
+
+class _Node:
+    """Storage for one document: its fields plus its subcollections."""
+
+    def __init__(self):
+        self.data = None          # None = document does not exist
+        self.collections = {}     # name -> {doc_id: _Node}
+
+
+# ── Snapshots & references ───────────────────────────────────────────────────
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str):
+        if self._data is None:
+            return None
+        return copy.deepcopy(_get_path(self._data, field_path))
+
+
+class DocumentReference:
+    def __init__(self, client, path: tuple):
+        self._client = client
+        self._path = path
+        self.id = path[-1]
+
+    @property
+    def path(self) -> str:
+        return '/'.join(self._path)
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self._path[:-1])
+
+    def _node(self, create=False):
+        return self._client._node(self._path, create)
+
+    def collection(self, name: str):
+        return CollectionReference(self._client, self._path + (name,))
+
+    def get(self, field_paths=None, transaction=None):
+        with self._client._lock:
+            node = self._node()
+            data = node.data if node else None
+            if data is not None:
+                data = _project(data, field_paths) if field_paths else copy.deepcopy(data)
+        return DocumentSnapshot(self, data)
+
+    def set(self, document_data: dict, merge=False):
+        with self._client._lock:
+            node = self._node(create=True)
+            if merge and node.data is not None:
+                _merge(node.data, document_data)
+            else:
+                node.data = {}
+                _merge(node.data, document_data)
+
+    def create(self, document_data: dict):
+        with self._client._lock:
+            node = self._node(create=True)
+            if node.data is not None:
+                raise AlreadyExists(f'Document already exists: {self.path}')
+            node.data = {}
+            _merge(node.data, document_data)
+
+    def update(self, field_updates: dict):
+        with self._client._lock:
+            node = self._node()
+            if node is None or node.data is None:
+                raise KeyError(f'No document to update: {self.path}')
+            for path, value in field_updates.items():
+                _set_path(node.data, path, value)
+
+    def delete(self):
+        with self._client._lock:
+            node = self._node()
+            if node is not None:
+                node.data = None
+
+    def collections(self):
+        node = self._node()
+        return [self.collection(name) for name in (node.collections if node else {})]
+
+
+class Query:
+    def __init__(self, client, path: tuple, filters=(), orders=(), limit=None,
+                 start_after=None, projection=None):
+        self._client = client
+        self._path = path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._start_after = start_after
+        self._projection = projection
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     start_after=self._start_after, projection=self._projection)
+        state.update(changes)
+        return Query(self._client, self._path, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        if not isinstance(field_path, str):
+            field_path = DOCUMENT_ID   # FieldPath.document_id()
+        return self._copy(orders=self._orders + ((field_path, str(direction).upper()),))
+
+    def limit(self, count: int):
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start_after=document_fields_or_snapshot)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    @staticmethod
+    def _value(doc_id, data, field_path):
+        if field_path == DOCUMENT_ID:
+            return doc_id
+        try:
+            return _get_path(data, field_path)
+        except KeyError:
+            return None
+
+    def _matches(self, doc_id, data) -> bool:
+        for field_path, op, expected in self._filters:
+            value = self._value(doc_id, data, field_path)
+            if op == '==' and value != expected:
+                return False
+            if op == '!=' and (value is None or value == expected):
+                return False
+            if op in ('<', '<=', '>', '>=') and value is None:
+                return False
+            if op == '<' and not value < expected:
+                return False
+            if op == '<=' and not value <= expected:
+                return False
+            if op == '>' and not value > expected:
+                return False
+            if op == '>=' and not value >= expected:
+                return False
+            if op == 'in' and value not in expected:
+                return False
+            if op == 'array_contains' and (not isinstance(value, list) or expected not in value):
+                return False
+        return True
+
+    @staticmethod
+    def _key(value):
+        # Firestore sorts null before every other value.
+        return (value is not None, value)
+
+    def _after_cursor(self, doc_id, data, orders, cursor_values) -> bool:
+        for (field, direction), cursor_value in zip(orders, cursor_values):
+            a, b = self._key(self._value(doc_id, data, field)), self._key(cursor_value)
+            if a == b:
+                continue
+            return a < b if direction.startswith('DESC') else a > b
+        return False
+
+    def stream(self, transaction=None):
+        with self._client._lock:
+            docs = self._client._collection(self._path)
+            # Ordering by a field excludes documents that lack it, as in Firestore;
+            # the document id is always the final tie-breaker.
+            orders = self._orders
+            if not orders or orders[-1][0] != DOCUMENT_ID:
+                orders = orders + ((DOCUMENT_ID, orders[-1][1] if orders else 'ASCENDING'),)
+            rows = []
+            for doc_id, node in docs.items():
+                if node.data is None or not self._matches(doc_id, node.data):
+                    continue
+                try:
+                    for field, _ in orders:
+                        if field != DOCUMENT_ID:
+                            _get_path(node.data, field)
+                except KeyError:
+                    continue
+                rows.append((doc_id, node.data))
+            for field, direction in reversed(orders):
+                rows.sort(key=lambda r: self._key(self._value(r[0], r[1], field)),
+                          reverse=direction.startswith('DESC'))
+
+            if self._start_after is not None:
+                cursor = self._start_after
+                if isinstance(cursor, DocumentSnapshot):
+                    node = docs.get(cursor.id)
+                    cursor_data = node.data if node is not None and node.data is not None else (cursor._data or {})
+                    cursor_values = [self._value(cursor.id, cursor_data, f) for f, _ in orders]
+                else:
+                    cursor_values = [cursor.get(f) for f, _ in orders]
+                rows = [r for r in rows if self._after_cursor(r[0], r[1], orders, cursor_values)]
+
+            if self._limit is not None:
+                rows = rows[:self._limit]
+            out = []
+            for doc_id, data in rows:
+                data = _project(data, self._projection) if self._projection else copy.deepcopy(data)
+                out.append(DocumentSnapshot(DocumentReference(self._client, self._path + (doc_id,)), data))
+        return iter(out)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client, path: tuple):
+        super().__init__(client, path)
+        self.id = path[-1]
+
+    def document(self, document_id: str = None):
+        return DocumentReference(self._client, self._path + (document_id or uuid.uuid4().hex[:20],))
+
+    def add(self, document_data: dict, document_id: str = None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return datetime.utcnow(), ref
+
+    def list_documents(self):
+        with self._client._lock:
+            return [DocumentReference(self._client, self._path + (doc_id,))
+                    for doc_id in self._client._collection(self._path)]
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def create(self, reference, document_data):
+        self._ops.append(('create', reference, lambda: reference.create(document_data)))
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(('set', reference, lambda: reference.set(document_data, merge=merge)))
+
+    def update(self, reference, field_updates):
+        self._ops.append(('update', reference, lambda: reference.update(field_updates)))
+
+    def delete(self, reference):
+        self._ops.append(('delete', reference, reference.delete))
+
+    def commit(self):
+        with self._client._lock:
+            # All-or-nothing like Firestore: check preconditions before applying anything.
+            for kind, reference, _ in self._ops:
+                node = reference._node()
+                exists = node is not None and node.data is not None
+                if kind == 'create' and exists:
+                    raise AlreadyExists(f'Document already exists: {reference.path}')
+                if kind == 'update' and not exists:
+                    raise KeyError(f'No document to update: {reference.path}')
+            for _, _, op in self._ops:
+                op()
+        self._ops = []
+
+
+class LocalFirestore:
+    """Thread-safe in-memory Firestore client."""
+
+    def __init__(self):
+        self._root = {}            # collection name -> {doc_id: _Node}
+        self._lock = threading.RLock()
+
+    def _collection(self, path: tuple) -> dict:
+        if len(path) == 1:
+            return self._root.setdefault(path[0], {})
+        parent = self._node(path[:-1], create=True)
+        return parent.collections.setdefault(path[-1], {})
+
+    def _node(self, path: tuple, create=False):
+        docs = self._collection(path[:-1]) if create else self._lookup(path[:-1])
+        if docs is None:
+            return None
+        node = docs.get(path[-1])
+        if node is None and create:
+            node = docs[path[-1]] = _Node()
+        return node
+
+    def _lookup(self, path: tuple):
+        docs = self._root.get(path[0])
+        for i in range(1, len(path), 2):
+            if docs is None or path[i] not in docs:
+                return None
+            docs = docs[path[i]].collections.get(path[i + 1])
+        return docs
+
+    def collection(self, name: str):
+        return CollectionReference(self, tuple(name.split('/')))
+
+    def document(self, path: str):
+        return DocumentReference(self, tuple(path.split('/')))
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get(field_paths=field_paths)
+
+    def collections(self):
+        return [self.collection(name) for name in self._root]
+
+    # ── Fixtures ─────────────────────────────────────────────────────────────
+    def load_dict(self, data: dict):
+        """
+        Load ``{collection: {doc_id: fields}}``. A ``__collections__`` key inside a
+        document's fields holds its subcollections in the same shape.
+        """
+        def load(path, collections):
+            for name, docs in collections.items():
+                for doc_id, fields in docs.items():
+                    fields = dict(fields)
+                    sub = fields.pop('__collections__', {})
+                    self.document('/'.join(path + (name, doc_id))).set(fields)
+                    load(path + (name, doc_id), sub)
+        load((), data)
+        return self
+
+    def dump_dict(self) -> dict:
+        def dump(docs):
+            out = {}
+            for doc_id, node in docs.items():
+                fields = copy.deepcopy(node.data) if node.data is not None else {}
+                if node.collections:
+                    fields['__collections__'] = {n: dump(d) for n, d in node.collections.items()}
+                out[doc_id] = fields
+            return out
+        with self._lock:
+            return {name: dump(docs) for name, docs in self._root.items()}
+
+    @classmethod
+    def from_json(cls, path: str) -> 'LocalFirestore':
+        with open(path) as f:
+            return cls().load_dict(json.load(f))
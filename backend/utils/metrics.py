@@ -0,0 +1,202 @@
+"""
+In-process metrics — counters and histograms rendered in the Prometheus text format.
+
+Recording is lock-free on the hot path: every thread writes into its own shard
+(a plain dict only that thread mutates), and the shards are merged when
+/api/metrics is scraped. Shards of threads that have exited are folded into a
+retired total at collection time, so thread-per-request servers do not grow the
+shard list without bound. Each process keeps its own registry; with several
+worker processes, scrape each one (or aggregate in Prometheus).
+
+    with metrics.track('firestore', 'get'):
+        snap = ref.get()
+
+    metrics.HTTP_LATENCY.observe(0.12, 'roadmap', 'GET')
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import tracing
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []         # [(thread, shard)]
+        self._retired = {}        # merged shards of exited threads
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _collect(self) -> dict:
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            total = {}
+            self._merge(total, self._retired)
+            for _, shard in live:
+                self._merge(total, shard)
+        return total
+
+    def _merge(self, target: dict, source: dict):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self._collect().items()):
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, target, source):
+        for labels, value in list(source.items()):
+            target[labels] = target.get(labels, 0) + value
+
+    def _render_series(self, labels, value):
+        return [f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}']
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, seconds: float, *labels):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]   # counts, sum, count
+        series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def _merge(self, target, source):
+        for labels, (counts, total, count) in list(source.items()):
+            merged = target.get(labels)
+            if merged is None:
+                merged = target[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+
+    def _render_series(self, labels, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            le = _labels(self.labelnames, labels, 'le="%s"' % bound)
+            lines.append(f'{self.name}_bucket{le} {cumulative}')
+        le = _labels(self.labelnames, labels, 'le="+Inf"')
+        lines.append(f'{self.name}_bucket{le} {count}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {repr(float(total))}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def histogram(name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ── Built-in series ──────────────────────────────────────────────────────────
+HTTP_LATENCY = histogram('skillbridge_http_request_duration_seconds',
+                         'Time to produce a response, by blueprint', ['blueprint', 'method'])
+HTTP_REQUESTS = counter('skillbridge_http_requests_total',
+                        'Responses by blueprint and status code', ['blueprint', 'method', 'status'])
+DEPENDENCY_LATENCY = histogram('skillbridge_dependency_duration_seconds',
+                               'Outbound call latency (Firestore, Gemini, GitHub, PyMuPDF)',
+                               ['dependency', 'operation'])
+DEPENDENCY_ERRORS = counter('skillbridge_dependency_errors_total',
+                            'Outbound calls that raised', ['dependency', 'operation'])
+
+
+def observe_request(blueprint: str, method: str, status: int, seconds: float):
+    HTTP_LATENCY.observe(seconds, blueprint, method)
+    HTTP_REQUESTS.inc(blueprint, method, str(status))
+
+
+@contextmanager
+def track(dependency: str, operation: str):
+    """Time an outbound call, count it as an error if it raises, and trace it as a span."""
+    start = time.perf_counter()
+    try:
+        with tracing.span(f'{dependency}.{operation}'):
+            yield
+    except Exception:
+        DEPENDENCY_ERRORS.inc(dependency, operation)
+        raise
+    finally:
+        DEPENDENCY_LATENCY.observe(time.perf_counter() - start, dependency, operation)
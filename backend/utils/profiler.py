@@ -0,0 +1,213 @@
+"""
+On-demand request profiler — per-route cProfile stats and flame-graph stacks.
+
+A request is profiled when it carries the admin header
+``X-Profile-Token: <PROFILER_TOKEN>`` or when it is picked by the random
+PROFILER_SAMPLE_RATE (0..1). Two things are recorded for it:
+
+* cProfile stats of the request thread, merged per route (``GET /api/roadmap``)
+  and downloadable as a .pstats file for `python -m pstats`, snakeviz, etc.
+* Wall-clock stacks of the request thread, sampled every SAMPLE_INTERVAL_MS by
+  one background thread and kept as collapsed stacks ("a;b;c 42"), the input
+  format of flamegraph.pl and speedscope. Because they are wall-clock, time
+  spent waiting on Firestore, Gemini or GitHub shows up next to CPU time in
+  JSON parsing or PDF text extraction.
+
+Only the request thread is profiled; work handed to job-queue or pool threads
+is not. On Python 3.12+ cProfile hooks into sys.monitoring, which is
+process-wide: only one profile can be active at a time, and it also records
+functions that other threads run meanwhile. Profiled requests therefore take
+turns (a request waits up to PROFILER_WAIT_SECONDS for the running one, then
+gets stack samples only), and their cProfile stats can still include work of
+unprofiled requests served concurrently; the stack samples are always per thread.
+Requests that are not profiled pay for one header lookup (and one random()
+call when a sample rate is set).
+"""
+
+import os
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+SAMPLE_INTERVAL_MS = float(os.getenv('PROFILER_SAMPLE_INTERVAL_MS', '5'))
+WAIT_SECONDS = float(os.getenv('PROFILER_WAIT_SECONDS', '5'))
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 10
+
+_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# cProfile is process-wide on 3.12+ (sys.monitoring): one profiled request at a time.
+_PROCESS_WIDE = sys.version_info >= (3, 12)
+_cprofile_lock = threading.Lock()
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_BASE):
+        return filename[len(_BASE):]
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _collapse(frame) -> str:
+    """Root-first 'func (file:line);...' for one thread's current stack."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class RouteProfile:
+    """Everything recorded for one route."""
+
+    def __init__(self):
+        self.requests = 0
+        self.total_ms = 0.0
+        self.stats = None          # pstats.Stats, merged across requests
+        self.stacks = Counter()    # collapsed stack -> samples
+
+    def top(self, n: int = TOP_FUNCTIONS) -> list:
+        if self.stats is None:
+            return []
+        rows = sorted(self.stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:n]
+        return [{
+            'function': f'{name} ({_short_path(filename)}:{line})',
+            'calls': nc,
+            'ownMs': round(tt * 1000, 1),
+            'cumulativeMs': round(ct * 1000, 1),
+        } for (filename, line, name), (cc, nc, tt, ct, callers) in rows]
+
+
+class Session:
+    """One profiled request, between Profiler.begin() and Profiler.end()."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.thread_id = threading.get_ident()
+        self.profile = None
+        self.locked = _PROCESS_WIDE and _cprofile_lock.acquire(timeout=WAIT_SECONDS)
+        if self.locked or not _PROCESS_WIDE:
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:
+                self.profile = None     # a profiler started outside this module is active
+        self.started = time.perf_counter()
+
+    def close(self):
+        """Stop the cProfile and let the next profiled request start its own."""
+        if self.profile is not None:
+            self.profile.disable()
+        if self.locked:
+            self.locked = False
+            _cprofile_lock.release()
+
+
+class Profiler:
+    def __init__(self, sample_interval_ms: float = SAMPLE_INTERVAL_MS):
+        self.sample_interval = sample_interval_ms / 1000
+        self._routes = {}
+        self._active = {}           # thread id -> route, read by the sampler
+        self._lock = threading.Lock()
+        self._has_active = threading.Event()
+        self._sampler_pid = None
+
+    # ── Request hooks ────────────────────────────────────────────────────────
+    def begin(self, route: str) -> Session:
+        self._ensure_sampler()
+        session = Session(route)
+        with self._lock:
+            self._active[session.thread_id] = route
+            self._has_active.set()
+        return session
+
+    def end(self, session: Session):
+        session.close()
+        elapsed_ms = (time.perf_counter() - session.started) * 1000
+        stats = pstats.Stats(session.profile) if session.profile is not None else None
+        with self._lock:
+            self._active.pop(session.thread_id, None)
+            if not self._active:
+                self._has_active.clear()
+            route = self._routes.setdefault(session.route, RouteProfile())
+            route.requests += 1
+            route.total_ms += elapsed_ms
+            if stats is not None:
+                if route.stats is None:
+                    route.stats = stats
+                else:
+                    route.stats.add(stats)
+
+    # ── Stack sampler ────────────────────────────────────────────────────────
+    def _ensure_sampler(self):
+        if self._sampler_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sampler_pid == os.getpid():
+                return
+            self._sampler_pid = os.getpid()
+        threading.Thread(target=self._sample, name='request-profiler', daemon=True).start()
+
+    def _sample(self):
+        pid = os.getpid()
+        while self._sampler_pid == pid:
+            self._has_active.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, route in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self._routes.setdefault(route, RouteProfile()).stacks[_collapse(frame)] += 1
+            del frames
+            time.sleep(self.sample_interval)
+
+    # ── Reports ──────────────────────────────────────────────────────────────
+    def summary(self) -> list:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            return [{
+                'route': name,
+                'requests': r.requests,
+                'avgMs': round(r.total_ms / r.requests, 1) if r.requests else None,
+                'samples': sum(r.stacks.values()),
+                'top': r.top(),
+            } for name, r in routes]
+
+    def _select(self, route: str = None) -> list:
+        if route:
+            return [self._routes[route]] if route in self._routes else []
+        return list(self._routes.values())
+
+    def pstats_bytes(self, route: str = None):
+        """Merged stats in the marshal format of pstats.Stats.dump_stats(), or None."""
+        with self._lock:
+            selected = [r.stats for r in self._select(route) if r.stats is not None]
+            if not selected:
+                return None
+            merged = pstats.Stats()
+            merged.add(*selected)
+            return marshal.dumps(merged.stats)
+
+    def collapsed_stacks(self, route: str = None):
+        """Collapsed-stack text ("frame;frame;frame count" per line), or None."""
+        with self._lock:
+            stacks = Counter()
+            for r in self._select(route):
+                stacks.update(r.stacks)
+        if not stacks:
+            return None
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+
+profiler = Profiler()
@@ -0,0 +1,105 @@
+"""
+Vectorised career matching.
+
+Every career's requiredSkills is encoded as a row of a (careers × vocabulary)
+matrix, so scoring a user against all careers is one matrix-vector product
+followed by a heap-based top-k instead of a Python loop per career and skill.
+"""
+
+import heapq
+import threading
+
+import numpy as np
+
+from services.data_registry import registry, fold
+
+LEVEL_WEIGHTS = {'Beginner': 0.3, 'Intermediate': 0.6, 'Advanced': 0.9}
+
+
+class CareerMatcher:
+    """
+    Match users against a fixed list of careers.
+
+    Args:
+        careers: career dicts with at least 'title' and 'requiredSkills'
+    """
+
+    def __init__(self, careers: list):
+        self.careers = careers
+        self.vocab = {}
+        for career in careers:
+            for skill in career.get('requiredSkills', []):
+                self.vocab.setdefault(fold(skill), len(self.vocab))
+
+        # Counts rather than 0/1 so a skill listed twice weighs like the original per-item loop.
+        self.matrix = np.zeros((len(careers), len(self.vocab)), dtype=np.float64)
+        for row, career in enumerate(careers):
+            for skill in career.get('requiredSkills', []):
+                self.matrix[row, self.vocab[fold(skill)]] += 1
+        self.required_counts = self.matrix.sum(axis=1)
+
+    def user_vector(self, user_skills, levels: dict = None) -> np.ndarray:
+        """
+        Encode a user over the vocabulary: 1.0 per known skill, or the level weight
+        (Beginner 0.3 … Advanced 0.9) when ``levels`` maps skill name → level.
+        """
+        vec = np.zeros(len(self.vocab), dtype=np.float64)
+        for name in user_skills:
+            col = self.vocab.get(fold(name))
+            if col is None:
+                continue
+            weight = LEVEL_WEIGHTS.get(levels.get(name), 0.3) if levels is not None else 1.0
+            vec[col] = max(vec[col], weight)
+        return vec
+
+    def scores(self, user_skills, levels: dict = None) -> np.ndarray:
+        """Match percentage (0-100 ints) of the user against every career."""
+        if not self.careers:
+            return np.zeros(0, dtype=np.int64)
+        hits = self.matrix @ self.user_vector(user_skills, levels)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(self.required_counts > 0, hits / self.required_counts * 100, 0.0)
+        return np.rint(pct).astype(np.int64)
+
+    def score_matrix(self, user_matrix: np.ndarray) -> np.ndarray:
+        """Score many users at once: (users × vocab) → (users × careers) percentages."""
+        hits = user_matrix @ self.matrix.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(self.required_counts > 0, hits / self.required_counts * 100, 0.0)
+        return np.rint(pct).astype(np.int64)
+
+    def gaps(self, index: int, user_skills) -> list:
+        """Required skills of career ``index`` the user does not have, in file order."""
+        have = {fold(s) for s in user_skills}
+        return [s for s in self.careers[index].get('requiredSkills', []) if fold(s) not in have]
+
+    def top_k(self, user_skills, k: int = 3, levels: dict = None) -> list:
+        """
+        Best ``k`` careers for the user, highest match first (ties keep file order).
+
+        Returns:
+            list of career dicts extended with matchPct and gaps
+        """
+        pct = self.scores(user_skills, levels)
+        best = heapq.nlargest(k, range(len(pct)), key=pct.__getitem__)
+        return [
+            {**self.careers[i], 'matchPct': int(pct[i]), 'gaps': self.gaps(i, user_skills)}
+            for i in best
+        ]
+
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = threading.Lock()
+
+
+def get_career_matcher() -> CareerMatcher:
+    """Matcher over the registry's careers, rebuilt whenever the data files reload."""
+    global _matcher, _matcher_version
+    version = registry.version
+    if _matcher is None or _matcher_version != version:
+        with _matcher_lock:
+            if _matcher is None or _matcher_version != version:
+                _matcher = CareerMatcher(registry.careers())
+                _matcher_version = version
+    return _matcher
@@ -0,0 +1,284 @@
+"""
+In-process request tracing — a span tree per request, slow requests to a JSONL log.
+
+Every request (and every background job) runs under a root span. Outbound calls
+timed with ``metrics.track()`` — Firestore reads/writes, each Gemini call site,
+GitHub fetches, PDF text extraction — open a child span automatically, and code
+can add its own with ``tracing.span('name')``. The current span lives in a
+ContextVar, so nesting follows the call stack across ``await``s and into
+``asyncio.to_thread``; work handed to a thread pool must be submitted with
+``tracing.submit(pool, fn, ...)`` to run under the submitting request's span.
+
+A finished trace that took at least TRACE_SLOW_MS is appended as one JSON line
+to TRACE_SLOW_LOG (rotated at TRACE_SLOW_LOG_MB, TRACE_SLOW_LOG_BACKUPS kept).
+Faster traces are dropped, so tracing costs a few small objects per request.
+Each process rotates its own handle; give workers separate files via
+TRACE_SLOW_LOG if they must never interleave a rotation.
+
+    python -m utils.tracing summarize [--log PATH] [--limit N]
+
+summarizes the slow log by route and by the span that dominated each request.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import contextvars
+import logging
+import logging.handlers
+from contextlib import contextmanager
+
+_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SLOW_MS = float(os.getenv('TRACE_SLOW_MS', '1000'))
+SLOW_LOG = os.getenv('TRACE_SLOW_LOG', os.path.join(_BASE, 'instance', 'slow_requests.jsonl'))
+SLOW_LOG_BYTES = int(float(os.getenv('TRACE_SLOW_LOG_MB', '10')) * 1024 * 1024)
+SLOW_LOG_BACKUPS = int(os.getenv('TRACE_SLOW_LOG_BACKUPS', '5'))
+MAX_SPANS = 1000        # per trace; further spans are counted, not kept
+
+_current = contextvars.ContextVar('skillbridge_span', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'attrs', 'start', 'ms', 'error', 'children', 'root')
+
+    def __init__(self, name: str, attrs: dict, root=None):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.ms = None
+        self.error = None
+        self.children = []
+        self.root = root or self
+
+    def finish(self):
+        self.ms = (time.perf_counter() - self.start) * 1000
+
+    def to_dict(self, origin: float) -> dict:
+        node = {'name': self.name, 'startMs': round((self.start - origin) * 1000, 1),
+                'ms': round(self.ms, 1) if self.ms is not None else None}
+        if self.attrs:
+            node['attrs'] = self.attrs
+        if self.error:
+            node['error'] = self.error
+        if self.children:
+            node['children'] = [c.to_dict(origin) for c in self.children]
+        return node
+
+
+class Trace(Span):
+    """The root span of one request or job."""
+    __slots__ = ('count', 'dropped', 'token')
+
+    def __init__(self, name: str, attrs: dict):
+        super().__init__(name, attrs)
+        self.count = 1
+        self.dropped = 0
+        self.token = None
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+def start_trace(name: str, **attrs) -> Trace:
+    """Open a root span and make it current (pair with finish_trace)."""
+    trace = Trace(name, attrs)
+    trace.token = _current.set(trace)
+    return trace
+
+
+def finish_trace(trace: Trace, discard: bool = False, **attrs):
+    """
+    Close a root span and restore the previous context. The trace is logged if it
+    was slow, unless ``discard`` is set.
+    """
+    if trace is None or trace.ms is not None:
+        return
+    trace.finish()
+    trace.attrs.update(attrs)
+    try:
+        _current.reset(trace.token)
+    except ValueError:
+        _current.set(None)      # finished from a different context
+    if trace.ms >= SLOW_MS and not discard:
+        _write_slow(trace)
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Root span for work outside a request, e.g. a background job."""
+    root = start_trace(name, **attrs)
+    try:
+        yield root
+    except Exception as e:
+        root.error = str(e)[:200]
+        raise
+    finally:
+        finish_trace(root)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Child span of the current span; a no-op outside a trace."""
+    parent = _current.get()
+    if parent is None or parent.root.ms is not None:
+        yield None
+        return
+    root = parent.root
+    if root.count >= MAX_SPANS:
+        root.dropped += 1
+        yield None
+        return
+    root.count += 1
+    child = Span(name, attrs, root)
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = f'{type(e).__name__}: {str(e)[:200]}'
+        raise
+    finally:
+        child.finish()
+        try:
+            _current.reset(token)
+        except ValueError:
+            pass                # a stream closed from another context
+
+
+def submit(pool, fn, *args, **kwargs):
+    """``pool.submit(fn, ...)`` with the caller's context, so spans opened by fn join the current trace."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def current_trace():
+    current = _current.get()
+    return current.root if current is not None else None
+
+
+# ── Slow log ──────────────────────────────────────────────────────────────────
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                os.makedirs(os.path.dirname(SLOW_LOG) or '.', exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    SLOW_LOG, maxBytes=SLOW_LOG_BYTES, backupCount=SLOW_LOG_BACKUPS, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger = logging.getLogger('skillbridge.slow_requests')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _write_slow(trace: Trace):
+    record = {
+        'ts': time.time(),
+        'pid': os.getpid(),
+        'name': trace.name,
+        'ms': round(trace.ms, 1),
+        'spans': trace.to_dict(trace.start),
+    }
+    if trace.dropped:
+        record['droppedSpans'] = trace.dropped
+    try:
+        _get_logger().info(json.dumps(record, default=str))
+    except Exception as e:
+        print(f"⚠  Could not write slow-request log: {e}")
+
+
+# ── Summary CLI ───────────────────────────────────────────────────────────────
+def read_log(path: str = SLOW_LOG):
+    """Records of the slow log and its rotated backups, oldest file first."""
+    paths = [f'{path}.{i}' for i in range(SLOW_LOG_BACKUPS, 0, -1)] + [path]
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        with open(p, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def _self_times(node: dict, totals: dict):
+    """Add each span's own time (its duration minus its children's) to totals by name."""
+    children = node.get('children', [])
+    own = (node.get('ms') or 0) - sum(c.get('ms') or 0 for c in children)
+    totals[node['name']] = totals.get(node['name'], 0) + max(own, 0)
+    for c in children:
+        _self_times(c, totals)
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(records) -> list:
+    """Per route: count, p50/p95/max ms, and the spans that took the most of its time."""
+    routes = {}
+    for rec in records:
+        route = routes.setdefault(rec.get('name', '?'), {'ms': [], 'spans': {}, 'dominant': {}})
+        route['ms'].append(rec.get('ms') or 0)
+        root = rec.get('spans') or {}
+        totals = {}
+        children = root.get('children', [])
+        totals['(own code)'] = max((root.get('ms') or 0) - sum(c.get('ms') or 0 for c in children), 0)
+        for c in children:
+            _self_times(c, totals)
+        for name, ms in totals.items():
+            route['spans'][name] = route['spans'].get(name, 0) + ms
+        dominant = max(totals, key=totals.get)
+        route['dominant'][dominant] = route['dominant'].get(dominant, 0) + 1
+
+    rows = []
+    for name, r in routes.items():
+        total = sum(r['spans'].values()) or 1
+        top = sorted(r['spans'].items(), key=lambda kv: kv[1], reverse=True)[:3]
+        dominant = max(r['dominant'], key=r['dominant'].get)
+        rows.append({
+            'route': name,
+            'count': len(r['ms']),
+            'p50': _percentile(r['ms'], 0.5),
+            'p95': _percentile(r['ms'], 0.95),
+            'max': max(r['ms']),
+            'dominant': dominant,
+            'dominantIn': r['dominant'][dominant],
+            'top': [(span_name, round(ms / total * 100)) for span_name, ms in top],
+        })
+    return sorted(rows, key=lambda row: row['count'] * row['p50'], reverse=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m utils.tracing', description='Slow-request log tools.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    summary = sub.add_parser('summarize', help='summarize the slow log by route and dominant span')
+    summary.add_argument('--log', default=SLOW_LOG, help='slow log path (rotated backups are read too)')
+    summary.add_argument('--limit', type=int, default=20, help='routes to show')
+    args = parser.parse_args(argv)
+
+    rows = summarize(read_log(args.log))
+    if not rows:
+        print(f"No slow requests in {args.log}")
+        return 0
+    print(f"{'route':<40} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}  dominant span")
+    for row in rows[:args.limit]:
+        top = ', '.join(f'{name} {pct}%' for name, pct in row['top'])
+        print(f"{row['route'][:40]:<40} {row['count']:>6} {row['p50']:>9.0f} {row['p95']:>9.0f} {row['max']:>9.0f}  "
+              f"{row['dominant']} ({row['dominantIn']}/{row['count']} requests)")
+        print(f"{'':<40} {'':>6} {'':>9} {'':>9} {'':>9}  time: {top}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
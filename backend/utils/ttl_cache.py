@@ -0,0 +1,109 @@
+"""
+Thread-safe in-memory cache with per-entry TTL, LRU eviction and hit/miss counters.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def utf8_size(value) -> int:
+    """Size in bytes of a str encoded as UTF-8 (len() of bytes-like values)."""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(value)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Args:
+        max_entries: evict least-recently-used entries beyond this count
+        ttl:         seconds an entry stays valid (0 or None = never expires)
+        max_bytes:   optional cap on the summed ``sizeof(value)`` of all entries
+        sizeof:      size function used with ``max_bytes`` (defaults to utf8_size(): bytes, not characters)
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300,
+                 max_bytes: int = 0, sizeof=utf8_size):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl or 0
+        self.max_bytes = int(max_bytes or 0)
+        self._sizeof = sizeof
+        self._data = OrderedDict()   # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, size, value = entry
+            if expires_at and expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return  # never cache a single value larger than the whole budget
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
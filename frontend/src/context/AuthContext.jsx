@@ -78,6 +78,14 @@ export const AuthProvider = ({ children }) => {
   }, []);
 
   const logout = useCallback(() => {
+    // Revoke both tokens server-side; the local session ends regardless of the outcome
+    const accessToken = localStorage.getItem('access_token');
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (accessToken) {
+      api.post('/auth/logout', { refresh_token: refreshToken }, {
+        headers: { Authorization: `Bearer ${accessToken}` },
+      }).catch(() => {});
+    }
     localStorage.removeItem('access_token');
     localStorage.removeItem('refresh_token');
     setToken(null);
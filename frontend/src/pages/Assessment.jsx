@@ -11,6 +11,8 @@ const SKILLS = [
     'SQL', 'DSA', 'Machine Learning', 'System Design', 'C++',
 ];
 const TIMER_MINUTES = 30;
+const GRADING_POLL_MS = 2000;
+const GRADING_POLL_LIMIT = 90;   // stop after ~3 minutes; the server reports 'stale' after its own deadline
 
 export default function Assessment() {
     const { isAuthenticated } = useAuth();
@@ -59,6 +61,25 @@ export default function Assessment() {
         return () => clearInterval(timerRef.current);
     }, [phase]);
 
+    // Code answers are graded in the background — poll until the score is in, for a bounded time
+    useEffect(() => {
+        if (phase !== 'result' || result?.gradingStatus !== 'queued') return;
+        let cancelled = false;
+        let polls = 0;
+        const poll = setInterval(async () => {
+            if (++polls > GRADING_POLL_LIMIT) {
+                clearInterval(poll);
+                setResult(prev => ({ ...prev, gradingStatus: 'stale' }));
+                return;
+            }
+            try {
+                const res = await api.get(`/assessment/${assessmentId}/result`);
+                if (!cancelled && res.data.gradingStatus !== 'queued') setResult(prev => ({ ...prev, ...res.data }));
+            } catch (e) { /* keep showing the MCQ score */ }
+        }, GRADING_POLL_MS);
+        return () => { cancelled = true; clearInterval(poll); };
+    }, [phase, result?.gradingStatus, assessmentId]);
+
     const startAssessment = async () => {
         if (!selectedSkill) return;
         setLoading(true);
@@ -253,6 +274,20 @@ export default function Assessment() {
                                         borderRadius: 99, transition: 'width 1s ease',
                                     }} />
                                 </div>
+                                <p style={{ color: 'rgba(240,255,223,0.5)', fontSize: '0.85rem', marginTop: 14 }}>
+                                    {result.gradingStatus === 'queued'
+                                        ? '⏳ Running your code against the test cases…'
+                                        : result.gradingStatus === 'stale' || result.gradingStatus === 'failed'
+                                            ? '⚠ Your code answers could not be graded right now — check back later.'
+                                        : [
+                                            result.codeTotal
+                                                ? `Code: ${result.codeScore}/${result.codeTotal} tests passed · Overall ${result.overallPercentage}%`
+                                                : null,
+                                            result.codeUngraded
+                                                ? `${result.codeUngraded} code answer${result.codeUngraded > 1 ? 's' : ''} ungraded (language not supported by the grader)`
+                                                : null,
+                                        ].filter(Boolean).join(' · ') || null}
+                                </p>
                             </div>
                         )}
 
@@ -18,6 +18,9 @@ const LEVELS = ['Beginner', 'Intermediate', 'Advanced'];
 const TAB_ICONS = ['🎯', '🐙', '📄'];
 const TAB_LABELS = ['Skills', 'GitHub Repos', 'Resume'];
 
+const RESUME_POLL_MS = 1500;
+const RESUME_POLL_LIMIT = 80;   // ~2 minutes before giving up
+
 export default function Dashboard() {
     const { user, isAuthenticated } = useAuth();
     const navigate = useNavigate();
@@ -41,11 +44,24 @@ export default function Dashboard() {
     const [resumeResult, setResumeResult] = useState(null);
     const [resumeError, setResumeError] = useState('');
     const fileInputRef = useRef();
+    const mountedRef = useRef(true);
+
+    useEffect(() => {
+        mountedRef.current = true;
+        return () => { mountedRef.current = false; };
+    }, []);
 
     useEffect(() => {
         if (!isAuthenticated) navigate('/login');
     }, [isAuthenticated, navigate]);
 
+    useEffect(() => {
+        if (!isAuthenticated) return;
+        api.get('/dashboard/repos')
+            .then(res => setRepos(res.data.repos || []))
+            .catch(() => {});
+    }, [isAuthenticated]);
+
     /* ── Skills ── */
     const toggleSkill = (skill) => {
         setSelectedSkills(prev =>
@@ -81,7 +97,8 @@ export default function Dashboard() {
         setRepoError('');
         try {
             const res = await api.post('/dashboard/repo', { url: repoUrl.trim() });
-            setRepos(prev => [res.data.repo, ...prev]);
+            const repo = res.data.repo;
+            setRepos(prev => [repo, ...prev.filter(r => r.name?.toLowerCase() !== repo.name?.toLowerCase())]);
             setRepoUrl('');
         } catch (e) {
             setRepoError(e.response?.data?.error || 'Failed to scrape repo.');
@@ -101,11 +118,30 @@ export default function Dashboard() {
             const res = await api.post('/dashboard/resume', formData, {
                 headers: { 'Content-Type': 'multipart/form-data' },
             });
-            setResumeResult(res.data.parsed);
+            // Parsing runs in a background job — poll until it finishes,
+            // giving up after RESUME_POLL_LIMIT polls or once we unmount.
+            const { jobId } = res.data;
+            for (let i = 0; i < RESUME_POLL_LIMIT; i++) {
+                await new Promise(r => setTimeout(r, RESUME_POLL_MS));
+                if (!mountedRef.current) return;
+                const { data: job } = await api.get(`/dashboard/resume/jobs/${jobId}`);
+                if (!mountedRef.current) return;
+                if (job.status === 'done') {
+                    setResumeResult(job.parsed);
+                    return;
+                }
+                if (job.status === 'failed') {
+                    setResumeError(job.error || 'Failed to parse resume.');
+                    return;
+                }
+            }
+            setResumeError('Resume parsing is taking longer than expected. Please try again later.');
         } catch (e) {
-            setResumeError(e.response?.data?.error || 'Failed to parse resume.');
+            if (mountedRef.current) {
+                setResumeError(e.response?.data?.error || 'Failed to parse resume.');
+            }
         } finally {
-            setUploading(false);
+            if (mountedRef.current) setUploading(false);
         }
     };
 
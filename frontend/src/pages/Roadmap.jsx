@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import Sidebar from '../components/Sidebar';
 import api from '../api/authApi';
+import { streamEvents } from '../api/streamEvents';
 
 export default function Roadmap() {
     const { isAuthenticated } = useAuth();
@@ -15,9 +16,22 @@ export default function Roadmap() {
 
     useEffect(() => {
         if (!isAuthenticated) { navigate('/login'); return; }
-        api.get('/roadmap')
-            .then(r => setData(r.data))
-            .catch(e => setError(e.response?.data?.error || 'Failed to load roadmap'))
+        // Weeks render as they stream in; fall back to the plain endpoint if streaming fails.
+        streamEvents('/roadmap/stream', (event, payload) => {
+            if (event === 'meta') {
+                setData({ career: payload.career, weeks: [] });
+                setLoading(false);
+            } else if (event === 'week') {
+                setData(prev => ({ ...prev, weeks: [...(prev?.weeks || []), payload] }));
+            } else if (event === 'done') {
+                setData(prev => ({ ...prev, ...payload }));
+            } else if (event === 'error') {
+                setError(payload?.error || 'Failed to load roadmap');
+            }
+        })
+            .catch(() => api.get('/roadmap')
+                .then(r => setData(r.data))
+                .catch(e => setError(e.response?.data?.error || 'Failed to load roadmap')))
             .finally(() => setLoading(false));
     }, [isAuthenticated, navigate]);
 